@@ -7,10 +7,119 @@ Gemini 3 Pro Image Generation Script
 import os
 import sys
 import json
+import base64
 import time
+import traceback
+import http.client
 import urllib.request
 import urllib.parse
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 复用的 HTTP(S) 连接，按 (scheme, host, port) 保持长连接，避免每次请求重复 TCP/TLS 握手
+_CONNECTIONS = {}
+
+# 复用的空闲连接已被服务端关闭时的重试次数及退避基数（秒）
+_MAX_RETRIES = 2
+_RETRY_BACKOFF = 0.5
+
+# base64 分块解码的块大小，必须是 4 的倍数，保证每块都是完整的 base64 单元
+_B64_CHUNK_SIZE = 64 * 1024
+
+
+def _get_connection(scheme: str, host: str, port, timeout: float):
+    """获取（或新建）到目标主机的长连接，支持 HTTP(S)_PROXY 环境变量"""
+    key = (scheme, host, port)
+    conn = _CONNECTIONS.get(key)
+    if conn is None:
+        conn_cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        proxy = urllib.request.getproxies().get(scheme)
+        if proxy and not urllib.request.proxy_bypass(host):
+            proxy_parts = urllib.parse.urlsplit(proxy)
+            # 代理地址未写端口时按代理自身的协议取默认端口（http 代理为80），而非目标站点的443
+            proxy_port = proxy_parts.port or (443 if proxy_parts.scheme == "https" else 80)
+            conn = conn_cls(proxy_parts.hostname, proxy_port, timeout=timeout)
+            conn.set_tunnel(host, port, headers=_proxy_auth_headers(proxy_parts))
+        else:
+            conn = conn_cls(host, port, timeout=timeout)
+        _CONNECTIONS[key] = conn
+    return conn
+
+
+def _proxy_auth_headers(proxy_parts) -> dict:
+    """代理地址中带有 user:pass@ 时，生成 CONNECT 请求的 Proxy-Authorization 头"""
+    if proxy_parts.username is None:
+        return {}
+    credentials = f"{urllib.parse.unquote(proxy_parts.username)}:{urllib.parse.unquote(proxy_parts.password or '')}"
+    return {"Proxy-Authorization": "Basic " + base64.b64encode(credentials.encode("utf-8")).decode("ascii")}
+
+
+def _drop_connection(key: tuple, conn) -> None:
+    """关闭并移除失效的连接"""
+    _CONNECTIONS.pop(key, None)
+    conn.close()
+
+
+def _dumps(payload: dict) -> bytes:
+    """序列化请求体，优先使用 orjson（直接返回 bytes）"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode('utf-8')
+
+
+def _loads(data: bytes):
+    """解析响应体，orjson 直接解析 bytes，无需先解码为 str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _post_json(url: str, payload: dict, headers: dict, timeout: float = 120):
+    """发送 JSON POST 请求并解析 JSON 响应
+
+    复用长连接；复用的空闲连接已被服务端关闭（发送时断开，或未返回任何响应即断开）时，
+    丢弃连接并按指数退避重试。请求发出后读取响应期间的错误不重试，避免重复提交计费的生成请求
+
+    Returns:
+        (状态码, 响应内容)；状态码 >= 400 时响应内容为错误文本
+    """
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    key = (parts.scheme, parts.hostname, parts.port)
+    body = _dumps(payload)
+    for attempt in range(_MAX_RETRIES + 1):
+        conn = _get_connection(*key, timeout)
+        reused = conn.sock is not None
+        sent = False
+        try:
+            conn.request("POST", path, body=body, headers=headers)
+            sent = True
+            response = conn.getresponse()
+        except (BrokenPipeError, ConnectionResetError) as e:
+            _drop_connection(key, conn)
+            stale = reused and (not sent or isinstance(e, http.client.RemoteDisconnected))
+            if not stale or attempt >= _MAX_RETRIES:
+                raise
+            print(f"连接中断({e})，第 {attempt + 1} 次重试...")
+            time.sleep(_RETRY_BACKOFF * (2 ** attempt))
+            continue
+        except Exception:
+            # 连接状态未知，丢弃后下次重新建立
+            _drop_connection(key, conn)
+            raise
+
+        try:
+            if response.status >= 400:
+                return response.status, response.read().decode('utf-8', errors='replace')
+            return response.status, _loads(response.read())
+        except Exception:
+            _drop_connection(key, conn)
+            raise
+
+
 def image_generate_gemini(prompt: str):
     """使用 Gemini 3 Pro 生成图片
     
@@ -53,17 +162,12 @@ def image_generate_gemini(prompt: str):
         print(f"API端点: {url}")
         print(f"模型: {model}")
         
-        req = urllib.request.Request(
-            url,
-            data=json.dumps(payload).encode('utf-8'),
-            headers=headers,
-            method='POST'
-        )
-        
         print("发送请求中...")
-        with urllib.request.urlopen(req, timeout=120) as response:
-            print(f"收到响应，状态码: {response.status}")
-            result = json.loads(response.read().decode('utf-8'))
+        status, result = _post_json(url, payload, headers, timeout=120)
+        print(f"收到响应，状态码: {status}")
+        if status >= 400:
+            print(f"HTTP错误 {status}: {result}")
+            return
         
         # 解析响应
         if 'candidates' not in result:
@@ -89,10 +193,10 @@ def image_generate_gemini(prompt: str):
                     filename = f"gemini_image_{timestamp}.{ext}"
                     filepath = os.path.join(download_dir, filename)
                     
-                    # 解码并保存
-                    import base64
+                    # 分块解码并写入，避免整张图片的解码结果一次性驻留内存
                     with open(filepath, 'wb') as f:
-                        f.write(base64.b64decode(image_data))
+                        for i in range(0, len(image_data), _B64_CHUNK_SIZE):
+                            f.write(base64.b64decode(image_data[i:i + _B64_CHUNK_SIZE]))
                     
                     print(f"✅ 图片已保存: {filepath}")
                     image_urls.append(filepath)
@@ -109,12 +213,8 @@ def image_generate_gemini(prompt: str):
         
         return image_urls
         
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode('utf-8')
-        print(f"HTTP错误 {e.code}: {error_body}")
     except Exception as e:
         print(f"生成图片失败: {e}")
-        import traceback
         traceback.print_exc()
 
 
@@ -13,6 +13,7 @@ OpenClaw Stock Research - 股票分析与选股系统
 使用示例:
     from openclaw_stock import (
         analyze_stock,
+        analyze_stocks,
         short_term_stock_selector,
         long_term_stock_selector,
         setup_alert
@@ -68,8 +69,13 @@ from .analysis import (
     FundamentalAnalyzer,
     # 筹码分析
     analyze_chip_distribution,
+    analyze_chip_dataframe,
+    analyze_chip_result,
     fetch_chip_distribution,
     ChipAnalyzer,
+    ChipLatest,
+    ChipResult,
+    ChipScoreThresholds,
     # 综合分析
     analyze_stock,
     StockAnalyzer,
@@ -143,10 +149,16 @@ __all__ = [
     "FundamentalAnalyzer",
     # 筹码分析
     "analyze_chip_distribution",
+    "analyze_chip_dataframe",
+    "analyze_chip_result",
     "fetch_chip_distribution",
     "ChipAnalyzer",
+    "ChipLatest",
+    "ChipResult",
+    "ChipScoreThresholds",
     # 综合分析
     "analyze_stock",
+    "analyze_stocks",
     "StockAnalyzer",
     "PredictionResult",
 
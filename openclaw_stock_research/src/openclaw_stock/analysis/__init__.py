@@ -21,13 +21,19 @@ from .fundamental_analysis import (
 )
 from .stock_analyzer import (
     analyze_stock,
+    analyze_stocks,
     StockAnalyzer,
     PredictionResult
 )
 from .chip_analysis import (
     analyze_chip_distribution,
+    analyze_chip_dataframe,
+    analyze_chip_result,
     fetch_chip_distribution,
     ChipAnalyzer,
+    ChipLatest,
+    ChipResult,
+    ChipScoreThresholds,
 )
 
 __all__ = [
@@ -46,10 +52,16 @@ __all__ = [
     'FundamentalAnalyzer',
     # 筹码分析
     'analyze_chip_distribution',
+    'analyze_chip_dataframe',
+    'analyze_chip_result',
     'fetch_chip_distribution',
     'ChipAnalyzer',
+    'ChipLatest',
+    'ChipResult',
+    'ChipScoreThresholds',
     # 综合分析
     'analyze_stock',
+    'analyze_stocks',
     'StockAnalyzer',
     'PredictionResult',
 ]
@@ -8,24 +8,319 @@
 - 筹码趋势判断
 
 数据来源: akshare stock_cyq_em 接口（东方财富网-概念板-行情中心-日K-筹码分布）
+
+性能说明: 本模块耗时以网络请求为主（单次接口调用数百毫秒，计算部分不足5毫秒），
+计算层面的优化对总耗时影响不到5%。提速优先依靠内存/磁盘缓存、分析结果备忘和
+批量并发（ChipAnalyzer.analyze_many）；已持有筹码数据的调用方可直接使用
+analyze_chip_dataframe 跳过数据获取。
+
+对外接口返回普通字典；需要按属性读取、占用更少内存的结果对象时使用 analyze_chip_result（返回 ChipResult）。
 """
 
-from typing import Literal, Optional, Dict, Any, List
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Literal, Optional, Dict, Any, List, ClassVar
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import logging
+import pickle
+import threading
 import pandas as pd
 import numpy as np
 
 from ..core.exceptions import DataSourceError, CalculationError
 from ..utils.logger import get_logger
-
-try:
-    import akshare as ak
-except ImportError:
-    ak = None
+from ..utils.decorators import cache_result, jit_compile, NUMBA_AVAILABLE
+from ..utils.file_cache import FileCache
+from ..utils.http_session import enable_shared_session_if_configured
 
 logger = get_logger(__name__)
 
+# 最新一日筹码数据的列（akshare中文列名）及对应的输出字段
+_LATEST_COL_MAP = (
+    ("获利比例", "winner_rate"),
+    ("平均成本", "average_cost"),
+    ("90成本-低", "cost_90_low"),
+    ("90成本-高", "cost_90_high"),
+    ("90集中度", "concentration_90"),
+    ("70成本-低", "cost_70_low"),
+    ("70成本-高", "cost_70_high"),
+    ("70集中度", "concentration_70"),
+)
+_LATEST_COLS = [col for col, _ in _LATEST_COL_MAP]
+_LATEST_KEYS = tuple(key for _, key in _LATEST_COL_MAP)
+
+# 趋势分析使用的列，按此顺序一次性取为ndarray；前三列参与主趋势判断
+_TREND_COLS = ["90集中度", "平均成本", "获利比例", "70集中度"]
+_CONC_90, _AVG_COST, _WINNER, _CONC_70 = range(len(_TREND_COLS))
+# 趋势列在 _LATEST_COLS 中的位置，用于从数值矩阵直接取出趋势矩阵
+_TREND_IDX = [_LATEST_COLS.index(col) for col in _TREND_COLS]
+# 趋势分析所需的最少交易日数
+_MIN_TREND_DAYS = 5
+# 多周期分析的周期（名称, 天数）
+_PERIODS = (("short", 5), ("medium", 10), ("long", 20))
+# 多周期结果字段及对应的舍入倍数（10**小数位），所有周期的结果矩阵一次舍入
+_MULTI_PERIOD_KEYS = (
+    "concentration_90_change_pct", "concentration_70_change_pct", "cost_center_change_pct",
+    "winner_rate_change", "recent_avg_cost", "earlier_avg_cost",
+    "recent_concentration_90", "recent_winner_rate",
+)
+_MULTI_PERIOD_SCALE = 10.0 ** np.array([2, 2, 2, 2, 2, 2, 4, 2])
+# 主趋势 details 中的近期/早期均值字段（按 _TREND_COLS 前三列交替排列）及舍入倍数
+_DETAIL_MEAN_KEYS = (
+    "recent_concentration_90", "early_concentration_90",
+    "recent_avg_cost", "early_avg_cost",
+    "recent_winner_rate", "early_winner_rate",
+)
+_DETAIL_MEAN_SCALE = 10.0 ** np.array([4, 4, 2, 2, 4, 4])
+
+# 主趋势阈值（与 _TREND_COLS 前三列一一对应）：
+# 近期均值 < 早期均值*LOWER_SCALE+LOWER_SHIFT 或 > 早期均值*UPPER_SCALE+UPPER_SHIFT 时趋势成立
+# 集中度/成本中心按比例（±5% / ±2%），获利比例按绝对差（±0.05）
+_TREND_LOWER_SCALE = np.array([0.95, 0.98, 1.0])
+_TREND_LOWER_SHIFT = np.array([0.0, 0.0, -0.05])
+_TREND_UPPER_SCALE = np.array([1.05, 1.02, 1.0])
+_TREND_UPPER_SHIFT = np.array([0.0, 0.0, 0.05])
+# 趋势编码（供打分内核使用）
+_TREND_STABLE, _TREND_BELOW, _TREND_ABOVE = 0, 1, 2
+# (趋势字段, 低于下限的标签, 高于上限的标签)
+_TREND_LABELS = (
+    ("concentration_trend", "concentrating", "dispersing"),
+    ("cost_center_trend", "falling", "rising"),
+    ("winner_rate_trend", "falling", "rising"),
+)
+# 主力行为信号解读，顺序与打分内核返回的信号位一致
+_SIGNAL_MESSAGES = (
+    "🟢 筹码集中+获利比例下降：典型的主力低位吸筹信号",
+    "🟢 筹码集中+成本下移：主力在低位收集筹码",
+    "🟡 筹码集中+获利比例上升：主力拉升控盘阶段",
+    "🔴 筹码分散+获利比例上升：主力高位派发信号",
+    "🔴 筹码分散+成本上移：高位换手活跃，警惕主力出货",
+    "🟡 筹码分散+获利比例下降：可能是恐慌抛售或主力洗盘",
+    "🟢 成本下移+获利比例极低：可能处于底部区域",
+    "🟢 70%筹码集中度显著收窄：主力控盘程度加深",
+    "🔴 70%筹码集中度扩大：持仓分歧加大",
+)
+
+# 信号1-6 规则：(集中度编码, 成本中心编码, 获利比例编码, 吸筹得分, 派发得分, 信号位)，None 表示不限
+_TREND_SIGNAL_RULES = (
+    (_TREND_BELOW, None, _TREND_BELOW, 3, 0, 0),   # 筹码集中 + 获利比例下降 → 典型主力低位吸筹
+    (_TREND_BELOW, _TREND_BELOW, None, 2, 0, 1),   # 筹码集中 + 成本中心下移 → 主力在低位收集筹码
+    (_TREND_BELOW, None, _TREND_ABOVE, 1, 0, 2),   # 筹码集中 + 获利比例上升 → 主力拉升控盘
+    (_TREND_ABOVE, None, _TREND_ABOVE, 0, 3, 3),   # 筹码分散 + 获利比例高 → 主力高位派发
+    (_TREND_ABOVE, _TREND_ABOVE, None, 0, 2, 4),   # 筹码分散 + 成本中心上移 → 高位换手，可能是派发
+    (_TREND_ABOVE, None, _TREND_BELOW, 1, 1, 5),   # 筹码分散 + 获利比例下降 → 恐慌性抛售或洗盘
+)
+
+
+def _build_signal_tables():
+    """将信号1-6规则展开为按 集中度*9+成本*3+获利 索引的查找表"""
+    accum = np.zeros(27, dtype=np.int64)
+    dist = np.zeros(27, dtype=np.int64)
+    fired = np.zeros(27, dtype=np.int64)
+    codes = (_TREND_STABLE, _TREND_BELOW, _TREND_ABOVE)
+    for conc in codes:
+        for cost in codes:
+            for winner in codes:
+                idx = conc * 9 + cost * 3 + winner
+                for rule_conc, rule_cost, rule_winner, a, d, bit in _TREND_SIGNAL_RULES:
+                    if (rule_conc == conc
+                            and rule_cost in (None, cost)
+                            and rule_winner in (None, winner)):
+                        accum[idx] += a
+                        dist[idx] += d
+                        fired[idx] |= 1 << bit
+    return accum, dist, fired
+
+
+_SIGNAL_ACCUM, _SIGNAL_DIST, _SIGNAL_FIRED = _build_signal_tables()
+
+# 筹码状态评估分档（bisect_right 查表）：
+# 90集中度 <0.10 / [0.10,0.20) / [0.20,0.40] / >0.40
+_CONC_90_BINS = (0.10, 0.20, float(np.nextafter(0.40, 1.0)))
+_CONC_90_LEVELS = (
+    ("highly_concentrated", "筹码高度集中，主力控盘明显"),
+    ("concentrated", "筹码较为集中"),
+    ("neutral", None),
+    ("dispersed", "筹码分散，持仓分歧较大"),
+)
+# 获利比例 <0.10 / [0.10,0.30) / [0.30,0.70] / (0.70,0.90] / >0.90
+# 每档为 (压力等级, 支撑等级, 信号模板)，None 表示保持默认
+_WINNER_BINS = (0.10, 0.30, float(np.nextafter(0.70, 1.0)), float(np.nextafter(0.90, 1.0)))
+_WINNER_LEVELS = (
+    ("low", "low", "获利比例极低({:.1f}%)，多数筹码被套"),
+    ("low", None, "获利比例较低({:.1f}%)，套牢盘较多"),
+    (None, None, None),
+    ("medium_high", None, "获利比例较高({:.1f}%)，注意获利盘压力"),
+    ("high", None, "获利比例极高({:.1f}%)，存在较大获利回吐压力"),
+)
+
+# 综合评估中的文案模板及描述映射（模块级常量，避免每次评估重复构建）
+_TPL_PRICE_ABOVE_COST = "当前价格高于平均成本{:.1f}%，获利盘较多"
+_TPL_PRICE_BELOW_COST = "当前价格低于平均成本{:.1f}%，套牢盘压力大"
+_TPL_INST_SIGNAL = "主力行为研判：{}（信号强度：{}）"
+_TPL_SUMMARY_WINNER = "获利比例{:.1f}%"
+_TPL_SUMMARY_COST = "平均成本{:.2f}元"
+_TPL_SUMMARY_ACCUMULATING = "研判主力吸筹（{}信号）"
+_TPL_SUMMARY_DISTRIBUTING = "研判主力派发（{}信号）"
+
+_INST_SIGNAL_MAP = {
+    "accumulating": "主力吸筹",
+    "distributing": "主力派发",
+    "neutral": "主力态度不明",
+}
+_INST_CONFIDENCE_MAP = {
+    "high": "强",
+    "medium": "中等",
+    "low": "弱",
+}
+_STATUS_DESC_MAP = {
+    "highly_concentrated": "筹码高度集中",
+    "concentrated": "筹码较集中",
+    "dispersed": "筹码分散",
+    "neutral": "筹码分布适中"
+}
+_TREND_DESC_MAP = {
+    "concentrating": "筹码趋于集中",
+    "dispersing": "筹码趋于分散",
+    "stable": "筹码分布稳定"
+}
+
+
+@dataclass(frozen=True)
+class ChipScoreThresholds:
+    """
+    主力行为打分阈值
+
+    不可变且可哈希：每组阈值对应一个打分内核（numba可用时阈值作为常量编译进内核），
+    同一组阈值的内核只构建一次
+    """
+
+    bottom_winner_rate: float = 0.15   # 信号7：成本下移时获利比例低于该值视为底部区域
+    conc_70_narrow_ratio: float = 0.90  # 信号8：近期70集中度 < 早期*该比例 视为持续收窄
+    conc_70_widen_ratio: float = 1.10   # 信号8：近期70集中度 > 早期*该比例 视为扩散
+
+
+_DEFAULT_SCORE_THRESHOLDS = ChipScoreThresholds()
+
+
+@dataclass
+class ChipLatest:
+    """
+    最新一日筹码数据
+
+    综合评估时按属性读取各字段；兼容字典式读取（latest["winner_rate"]），
+    需要可JSON序列化的结构时调用 to_dict()
+    """
+
+    __slots__ = (
+        "date", "winner_rate", "average_cost",
+        "cost_90_low", "cost_90_high", "concentration_90",
+        "cost_70_low", "cost_70_high", "concentration_70",
+        "cost_90_range", "cost_70_range",
+    )
+
+    date: str                # 交易日期
+    winner_rate: float       # 获利比例
+    average_cost: float      # 平均成本
+    cost_90_low: float       # 90%筹码成本区间下限
+    cost_90_high: float      # 90%筹码成本区间上限
+    concentration_90: float  # 90集中度
+    cost_70_low: float       # 70%筹码成本区间下限
+    cost_70_high: float      # 70%筹码成本区间上限
+    concentration_70: float  # 70集中度
+    cost_90_range: float     # 90%成本区间宽度
+    cost_70_range: float     # 70%成本区间宽度
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（字段顺序与旧版 latest 字典一致）"""
+        return asdict(self)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__slots__
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """字典式读取，字段不存在时返回default"""
+        return getattr(self, key) if key in self.__slots__ else default
+
+
+@dataclass
+class ChipResult:
+    """
+    筹码分析结果
+
+    使用 __slots__ 存储字段，批量扫描时比嵌套字典占用更少内存。
+    兼容字典式读取（result["latest"]、result.get("error")），
+    需要可JSON序列化的结构时调用 to_dict()
+    """
+
+    __slots__ = ("latest", "trend", "assessment", "error")
+
+    latest: Optional[ChipLatest]  # 最新一日筹码数据（数据获取失败时为None）
+    trend: Dict[str, Any]       # 筹码趋势分析
+    assessment: Dict[str, Any]  # 综合评估
+    error: Optional[str]        # 错误信息（分析成功时为None）
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（与旧版返回结构一致，error仅在失败时存在）"""
+        result = {
+            "latest": self.latest.to_dict() if self.latest is not None else {},
+            "trend": self.trend,
+            "assessment": self.assessment,
+        }
+        if self.error is not None:
+            result["error"] = self.error
+        return result
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.__slots__ and (key != "error" or self.error is not None):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__slots__ and (key != "error" or self.error is not None)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """字典式读取，字段不存在时返回default"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+# 筹码数据磁盘缓存：跨进程复用，有效期与内存缓存一致且不跨日
+_CHIP_FILE_CACHE = FileCache("chip", ttl=1800, daily=True)
+
+# 分析结果备忘：同一标的的筹码数据未更新（最新日期与行数不变）且当前价格及阈值相同时直接复用。
+# 只保存结果的pickle字节（不持有筹码数据），每次命中反序列化出独立副本，调用方修改结果不影响备忘
+_RESULT_MEMO_SIZE = 256
+_result_memo: "OrderedDict[tuple, bytes]" = OrderedDict()
+_result_memo_lock = threading.Lock()
+
+# akshare 模块句柄：首次获取筹码数据时才导入（akshare 导入耗时1-2秒）
+_akshare: Any = None
+
+
+def _get_akshare() -> Any:
+    """返回 akshare 模块（首次调用时导入）"""
+    global _akshare
+    if _akshare is None:
+        try:
+            import akshare
+        except ImportError:
+            raise DataSourceError("akshare库未安装")
+        _akshare = akshare
+    return _akshare
+
 
+@cache_result(ttl=1800, maxsize=256, copy_result=True)
 def fetch_chip_distribution(
     symbol: str,
     adjust: Literal["qfq", "hfq", ""] = "qfq"
@@ -45,25 +340,56 @@ def fetch_chip_distribution(
 
     异常:
         DataSourceError: 数据获取失败
+
+    说明:
+        筹码数据按日更新，同一 (symbol, adjust) 的结果缓存30分钟，
+        重复分析同一标的时不再重复请求东方财富接口；每次返回独立副本，调用方修改不影响缓存；
+        设置 AKSHARE_DATA_PATH 后同时缓存到磁盘（当天有效），新进程也可直接复用；
+        akshare 在首次调用时才导入，仅导入本模块不会加载 akshare
     """
-    if ak is None:
-        raise DataSourceError("akshare库未安装")
+    cache_key = _chip_cache_key(symbol, adjust)
+    cached = _CHIP_FILE_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
 
+    ak = _get_akshare()
     try:
         df = ak.stock_cyq_em(symbol=symbol, adjust=adjust)
         if df is None or df.empty:
             raise DataSourceError(f"未获取到 {symbol} 的筹码分布数据")
-        return df
+        # 接收时统一转为float64，无法解析的值（如"--"）记为NaN，
+        # 后续取ndarray时直接得到连续的数值缓冲区，不再经过object列
+        num_cols = [col for col in _LATEST_COLS if col in df.columns]
+        df[num_cols] = df[num_cols].apply(pd.to_numeric, errors="coerce").astype(np.float64)
     except DataSourceError:
         raise
     except Exception as e:
         raise DataSourceError(f"获取 {symbol} 筹码分布数据失败: {e}")
 
+    _CHIP_FILE_CACHE.set(cache_key, df)
+    return df
+
+
+def _chip_cache_key(symbol: str, adjust: str) -> str:
+    """筹码数据磁盘缓存键"""
+    return f"{symbol}_{adjust or 'none'}"
+
+
+# 绑定被装饰函数自身的缓存查询，不受 fetch_chip_distribution 名称被替换的影响
+_fetch_is_cached = fetch_chip_distribution.is_cached
+
+
+def _is_chip_data_cached(symbol: str, adjust: str) -> bool:
+    """筹码数据是否已在内存或磁盘缓存中（命中时获取无需网络请求）"""
+    return (_fetch_is_cached(symbol, adjust)
+            or _CHIP_FILE_CACHE.contains(_chip_cache_key(symbol, adjust)))
+
 
 def analyze_chip_distribution(
     symbol: str,
     current_price: Optional[float] = None,
-    adjust: Literal["qfq", "hfq", ""] = "qfq"
+    adjust: Literal["qfq", "hfq", ""] = "qfq",
+    score_thresholds: Optional[ChipScoreThresholds] = None
 ) -> Dict[str, Any]:
     """
     筹码分布综合分析
@@ -72,16 +398,42 @@ def analyze_chip_distribution(
         symbol: 股票代码（纯数字，如 '601127'）
         current_price: 当前价格（可选，用于辅助判断）
         adjust: 复权方式
+        score_thresholds: 主力行为打分阈值（可选，默认使用内置阈值）
 
     返回:
         {
             'latest': {最新一日筹码数据},
             'trend': {筹码趋势分析},
-            'assessment': {综合评估}
+            'assessment': {综合评估},
+            'error': 错误信息（仅数据获取失败时存在）
         }
 
     异常:
-        DataSourceError: 数据获取失败
+        CalculationError: 计算失败
+    """
+    return analyze_chip_result(symbol, current_price, adjust, score_thresholds).to_dict()
+
+
+def analyze_chip_result(
+    symbol: str,
+    current_price: Optional[float] = None,
+    adjust: Literal["qfq", "hfq", ""] = "qfq",
+    score_thresholds: Optional[ChipScoreThresholds] = None
+) -> ChipResult:
+    """
+    筹码分布综合分析，返回 ChipResult 结果对象
+
+    参数同 analyze_chip_distribution；结果字段可按属性读取（result.latest.winner_rate），
+    to_dict() 得到与 analyze_chip_distribution 相同的字典
+
+    返回:
+        ChipResult，字段:
+            latest: ChipLatest，最新一日筹码数据（数据获取失败时为None）
+            trend: {筹码趋势分析}
+            assessment: {综合评估}
+            error: 错误信息（成功时为None）
+
+    异常:
         CalculationError: 计算失败
     """
     logger.info(f"[chip_analysis] 开始分析 {symbol} 的筹码分布")
@@ -92,66 +444,140 @@ def analyze_chip_distribution(
         logger.warning(f"[chip_analysis] 获取筹码数据失败: {e}")
         return _empty_chip_result(str(e))
 
-    try:
-        result = {}
+    # 筹码数据未更新（最新日期与行数相同）、同一当前价格已分析过时直接复用结果
+    score_thresholds = score_thresholds or _DEFAULT_SCORE_THRESHOLDS
+    memo_key = (symbol, adjust, _data_version(df), current_price, score_thresholds)
+    memoized = _memo_get(memo_key)
+    if memoized is not None:
+        logger.info(f"[chip_analysis] {symbol} 筹码数据未变化，复用分析结果")
+        return memoized
 
-        # --- 1. 最新一日筹码数据 ---
-        latest = df.iloc[-1]
-        result["latest"] = {
-            "date": str(latest["日期"]),
-            "winner_rate": _safe_float(latest["获利比例"]),
-            "average_cost": _safe_float(latest["平均成本"]),
-            "cost_90_low": _safe_float(latest["90成本-低"]),
-            "cost_90_high": _safe_float(latest["90成本-高"]),
-            "concentration_90": _safe_float(latest["90集中度"]),
-            "cost_70_low": _safe_float(latest["70成本-低"]),
-            "cost_70_high": _safe_float(latest["70成本-高"]),
-            "concentration_70": _safe_float(latest["70集中度"]),
-        }
+    result = _analyze_chip_frame(df, current_price, score_thresholds)
+    _memo_set(memo_key, result)
+    logger.info(f"[chip_analysis] {symbol} 筹码分析完成")
+    return result
+
+
+def analyze_chip_dataframe(
+    df: pd.DataFrame,
+    current_price: Optional[float] = None,
+    score_thresholds: Optional[ChipScoreThresholds] = None
+) -> Dict[str, Any]:
+    """
+    对已获取的筹码分布数据进行分析（纯计算，不请求网络）
+
+    供已自行获取/缓存 ak.stock_cyq_em 数据的调用方直接使用，跳过数据获取环节
 
-        # 计算90%和70%成本区间宽度
-        cost_90_range = result["latest"]["cost_90_high"] - result["latest"]["cost_90_low"]
-        cost_70_range = result["latest"]["cost_70_high"] - result["latest"]["cost_70_low"]
-        result["latest"]["cost_90_range"] = round(cost_90_range, 2)
-        result["latest"]["cost_70_range"] = round(cost_70_range, 2)
+    参数:
+        df: 与 fetch_chip_distribution 返回结构一致的筹码分布数据
+        current_price: 当前价格（可选，用于辅助判断）
+        score_thresholds: 主力行为打分阈值（可选，默认使用内置阈值）
+
+    返回:
+        dict，结构同 analyze_chip_distribution
+
+    异常:
+        CalculationError: 计算失败
+    """
+    return _analyze_chip_frame(df, current_price, score_thresholds).to_dict()
+
+
+def _analyze_chip_frame(
+    df: pd.DataFrame,
+    current_price: Optional[float] = None,
+    score_thresholds: Optional[ChipScoreThresholds] = None
+) -> ChipResult:
+    """分析筹码分布数据，返回 ChipResult"""
+    score_thresholds = score_thresholds or _DEFAULT_SCORE_THRESHOLDS
+    try:
+        # --- 1. 最新一日筹码数据 ---
+        # 数值列一次性转为float64矩阵，最新数据与趋势分析共用
+        values = _to_float_matrix(df, _LATEST_COLS)
+        fields = dict(zip(_LATEST_KEYS, _safe_floats(values[-1])))
+        latest = ChipLatest(
+            date=str(df["日期"].iat[-1]),
+            **fields,
+            # 90%和70%成本区间宽度
+            cost_90_range=round(fields["cost_90_high"] - fields["cost_90_low"], 2),
+            cost_70_range=round(fields["cost_70_high"] - fields["cost_70_low"], 2),
+        )
 
         # --- 2. 筹码趋势分析（对比近期变化） ---
-        result["trend"] = _analyze_chip_trend(df)
+        # 历史不足5天（如新股）无法判断趋势，直接使用默认结果，不再切取趋势列
+        if len(values) < _MIN_TREND_DAYS:
+            trend = _default_trend()
+        else:
+            trend = _analyze_chip_trend(values[:, _TREND_IDX], score_thresholds)
 
         # --- 3. 综合评估 ---
-        result["assessment"] = _assess_chip_status(
-            result["latest"], result["trend"], current_price
-        )
+        assessment = _assess_chip_status(latest, trend, current_price)
 
-        logger.info(f"[chip_analysis] {symbol} 筹码分析完成")
-        return result
+        return ChipResult(latest=latest, trend=trend, assessment=assessment, error=None)
 
     except Exception as e:
         logger.error(f"[chip_analysis] 筹码分析计算失败: {e}")
         raise CalculationError(f"筹码分析计算失败: {e}")
 
 
-def _safe_float(value) -> float:
-    """安全转换为float，处理NaN等情况"""
-    try:
-        v = float(value)
-        return round(v, 4) if not np.isnan(v) else 0.0
-    except (ValueError, TypeError):
-        return 0.0
+def _data_version(df: pd.DataFrame) -> tuple:
+    """筹码数据的版本标识：(最新日期, 行数)，数据按日追加，二者不变即视为同一份数据"""
+    if df.empty or "日期" not in df.columns:
+        return ("", len(df))
+    return (str(df["日期"].iat[-1]), len(df))
+
+
+def _memo_get(key: tuple) -> Optional[ChipResult]:
+    """查询分析结果备忘，命中时返回独立副本"""
+    with _result_memo_lock:
+        blob = _result_memo.get(key)
+        if blob is None:
+            return None
+        _result_memo.move_to_end(key)
+    return pickle.loads(blob)
 
 
-def _analyze_chip_trend(df: pd.DataFrame) -> Dict[str, Any]:
+def _memo_set(key: tuple, result: ChipResult) -> None:
+    """写入分析结果备忘，超出容量时淘汰最久未使用的条目"""
+    blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+    with _result_memo_lock:
+        _result_memo[key] = blob
+        _result_memo.move_to_end(key)
+        while len(_result_memo) > _RESULT_MEMO_SIZE:
+            _result_memo.popitem(last=False)
+
+
+def _to_float_matrix(df: pd.DataFrame, cols: List[str]) -> np.ndarray:
     """
-    分析筹码变化趋势（增强版）
+    取出数值列为float64矩阵（行=交易日，列按cols顺序）
 
-    多周期对比 + 主力行为推断：
-    - 短期(5日)、中期(10日)、长期(20日)三个维度
-    - 筹码迁移速度分析
-    - 集中度变化率（反映主力操作力度）
-    - 获利比例与集中度交叉分析（推断主力吸筹/派发）
-    - 成本中心移动方向和速度
+    逐列取底层ndarray后拼接，不经过 df[cols] 构建中间DataFrame；
+    列中含无法解析的值（如"--"）时该列逐值转换并记为NaN
     """
-    trend = {
+    return np.column_stack([_column_as_float(df[col]) for col in cols])
+
+
+def _column_as_float(column: pd.Series) -> np.ndarray:
+    """单列转为float64数组（已是数值列时不复制）"""
+    try:
+        return column.to_numpy(dtype=np.float64, copy=False)
+    except (TypeError, ValueError):
+        return pd.to_numeric(column, errors="coerce").to_numpy(dtype=np.float64)
+
+
+def _safe_floats(values: Any) -> List[float]:
+    """批量安全转换为float（保留4位小数），无法转换或NaN的值记为0.0"""
+    if pd.api.types.is_float_dtype(values.dtype):
+        # 已是浮点数组（如 _to_float_matrix 的结果），无需再逐个解析
+        arr = np.asarray(values, dtype=np.float64)
+    else:
+        arr = np.asarray(pd.to_numeric(values, errors="coerce"), dtype=np.float64)
+    arr = np.where(np.isnan(arr), 0.0, arr)
+    return np.round(arr, 4).tolist()
+
+
+def _default_trend() -> Dict[str, Any]:
+    """默认（无法判断时）的筹码趋势结果"""
+    return {
         "concentration_trend": "stable",  # concentrating / dispersing / stable
         "cost_center_trend": "stable",    # rising / falling / stable
         "winner_rate_trend": "stable",    # rising / falling / stable
@@ -163,96 +589,99 @@ def _analyze_chip_trend(df: pd.DataFrame) -> Dict[str, Any]:
         "interpretation": []               # 人话解读
     }
 
-    if len(df) < 5:
-        return trend
 
-    trend["period_days"] = len(df)
+def _analyze_chip_trend(
+    mat: np.ndarray,
+    score_thresholds: ChipScoreThresholds = _DEFAULT_SCORE_THRESHOLDS
+) -> Dict[str, Any]:
+    """
+    分析筹码变化趋势（增强版）
 
-    # ========== 多周期分析 ==========
-    periods = {"short": 5, "medium": 10, "long": 20}
-    for period_name, period_len in periods.items():
-        if len(df) < period_len + 5:
-            continue
-
-        recent = df.iloc[-period_len:]
-        earlier = df.iloc[-(period_len * 2):-period_len] if len(df) >= period_len * 2 else df.iloc[:period_len]
-
-        recent_conc_90 = recent["90集中度"].mean()
-        earlier_conc_90 = earlier["90集中度"].mean()
-        recent_conc_70 = recent["70集中度"].mean()
-        earlier_conc_70 = earlier["70集中度"].mean()
-        recent_avg_cost = recent["平均成本"].mean()
-        earlier_avg_cost = earlier["平均成本"].mean()
-        recent_winner = recent["获利比例"].mean()
-        earlier_winner = earlier["获利比例"].mean()
-
-        conc_90_change = (recent_conc_90 - earlier_conc_90) / earlier_conc_90 if earlier_conc_90 != 0 else 0
-        conc_70_change = (recent_conc_70 - earlier_conc_70) / earlier_conc_70 if earlier_conc_70 != 0 else 0
-        cost_change = (recent_avg_cost - earlier_avg_cost) / earlier_avg_cost if earlier_avg_cost != 0 else 0
-        winner_change = recent_winner - earlier_winner
-
-        trend["multi_period"][period_name] = {
-            "days": period_len,
-            "concentration_90_change_pct": round(conc_90_change * 100, 2),
-            "concentration_70_change_pct": round(conc_70_change * 100, 2),
-            "cost_center_change_pct": round(cost_change * 100, 2),
-            "winner_rate_change": round(winner_change * 100, 2),
-            "recent_avg_cost": round(float(recent_avg_cost), 2),
-            "earlier_avg_cost": round(float(earlier_avg_cost), 2),
-            "recent_concentration_90": round(float(recent_conc_90), 4),
-            "recent_winner_rate": round(float(recent_winner * 100), 2),
-        }
+    参数:
+        mat: 按 _TREND_COLS 顺序排列的筹码数据矩阵（行=交易日，列=指标）
+        score_thresholds: 主力行为打分阈值
 
-    # ========== 主趋势判断（基于短期数据） ==========
-    recent_n = min(5, len(df))
-    early_start = max(0, len(df) - 20)
-    early_end = max(recent_n, len(df) - 10)
+    多周期对比 + 主力行为推断：
+    - 短期(5日)、中期(10日)、长期(20日)三个维度
+    - 筹码迁移速度分析
+    - 集中度变化率（反映主力操作力度）
+    - 获利比例与集中度交叉分析（推断主力吸筹/派发）
+    - 成本中心移动方向和速度
+    """
+    trend = _default_trend()
 
-    if early_end <= early_start:
+    n = len(mat)
+    if n < _MIN_TREND_DAYS:
         return trend
 
-    recent = df.iloc[-recent_n:]
-    early = df.iloc[early_start:early_end]
-
-    recent_conc_90 = recent["90集中度"].mean()
-    early_conc_90 = early["90集中度"].mean()
-
-    if recent_conc_90 < early_conc_90 * 0.95:
-        trend["concentration_trend"] = "concentrating"
-    elif recent_conc_90 > early_conc_90 * 1.05:
-        trend["concentration_trend"] = "dispersing"
-
-    trend["details"]["recent_concentration_90"] = round(float(recent_conc_90), 4)
-    trend["details"]["early_concentration_90"] = round(float(early_conc_90), 4)
+    trend["period_days"] = n
 
-    # 成本中心趋势
-    recent_avg_cost = recent["平均成本"].mean()
-    early_avg_cost = early["平均成本"].mean()
+    # 按列前缀和：之后任意窗口均值都是 O(1) 的两次相减
+    csum, ccount = _prefix_sums(mat)
 
-    if recent_avg_cost > early_avg_cost * 1.02:
-        trend["cost_center_trend"] = "rising"
-    elif recent_avg_cost < early_avg_cost * 0.98:
-        trend["cost_center_trend"] = "falling"
-
-    trend["details"]["recent_avg_cost"] = round(float(recent_avg_cost), 2)
-    trend["details"]["early_avg_cost"] = round(float(early_avg_cost), 2)
+    # ========== 多周期分析 ==========
+    # 数据足够的周期：近期为最后 period_len 天；早期为其之前的 period_len 天
+    # （数据不足两个周期时取最早的 period_len 天）。所有窗口均值一次向量化求出
+    periods = [(name, length) for name, length in _PERIODS if n >= length + 5]
+    lengths = np.array([length for _, length in periods], dtype=np.intp)
+    earlier_starts = np.where(n >= lengths * 2, n - lengths * 2, 0)
+    starts = np.concatenate([n - lengths, earlier_starts])
+    ends = np.concatenate([np.full(len(lengths), n), earlier_starts + lengths])
+    window_means = _window_mean(csum, ccount, starts, ends)
+    recent, earlier = window_means[:len(periods)], window_means[len(periods):]
+
+    # 变化率：早期均值为0时记为0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        change = np.where(earlier != 0, (recent - earlier) / earlier, 0.0)
+    period_values = np.column_stack([
+        change[:, [_CONC_90, _CONC_70, _AVG_COST]] * 100,
+        (recent[:, _WINNER] - earlier[:, _WINNER]) * 100,
+        recent[:, _AVG_COST],
+        earlier[:, _AVG_COST],
+        recent[:, _CONC_90],
+        recent[:, _WINNER] * 100,
+    ])
+    for (period_name, period_len), row in zip(periods, _round_scaled(period_values, _MULTI_PERIOD_SCALE)):
+        trend["multi_period"][period_name] = {"days": period_len, **dict(zip(_MULTI_PERIOD_KEYS, row))}
 
-    # 获利比例趋势
-    recent_winner = recent["获利比例"].mean()
-    early_winner = early["获利比例"].mean()
+    # ========== 主趋势判断（基于短期数据） ==========
+    recent_n = min(5, n)
+    early_start = max(0, n - 20)
+    early_end = max(recent_n, n - 10)
 
-    if recent_winner > early_winner + 0.05:
-        trend["winner_rate_trend"] = "rising"
-    elif recent_winner < early_winner - 0.05:
-        trend["winner_rate_trend"] = "falling"
+    if early_end <= early_start:
+        return trend
 
-    trend["details"]["recent_winner_rate"] = round(float(recent_winner), 4)
-    trend["details"]["early_winner_rate"] = round(float(early_winner), 4)
+    if NUMBA_AVAILABLE:
+        # 批量扫描时走编译内核，一次完成窗口均值与阈值判断
+        recent_means, early_means, below, above = _trend_kernel(mat, recent_n, early_start, early_end)
+    else:
+        # 近期/早期窗口均值由前缀和一次求出（NaN跳过，与pandas一致）
+        recent_means, early_means = _window_mean(
+            csum, ccount, np.array([n - recent_n, early_start]), np.array([n, early_end])
+        )[:, :_CONC_70]
+
+        # 三个趋势一次比较：近期均值 < 早期均值*scale+shift 下限，或 > 上限
+        below = recent_means < early_means * _TREND_LOWER_SCALE + _TREND_LOWER_SHIFT
+        above = recent_means > early_means * _TREND_UPPER_SCALE + _TREND_UPPER_SHIFT
+
+    # 趋势编码：0=稳定，1=低于下限，2=高于上限（低于下限优先）
+    trend_codes = [
+        _TREND_BELOW if is_below else _TREND_ABOVE if is_above else _TREND_STABLE
+        for is_below, is_above in zip(below.tolist(), above.tolist())
+    ]
+    for (key, below_label, above_label), code in zip(_TREND_LABELS, trend_codes):
+        if code == _TREND_BELOW:
+            trend[key] = below_label
+        elif code == _TREND_ABOVE:
+            trend[key] = above_label
+
+    detail_means = np.column_stack([recent_means, early_means]).ravel()
+    trend["details"].update(zip(_DETAIL_MEAN_KEYS, _round_scaled(detail_means, _DETAIL_MEAN_SCALE)))
 
     # ========== 集中度变化速率（反映主力操作力度） ==========
-    if len(df) >= 10:
-        conc_series = df["90集中度"].iloc[-20:] if len(df) >= 20 else df["90集中度"]
-        conc_slope = _calc_slope(conc_series)
+    if n >= 10:
+        conc_slope = _calc_slope(mat[-20:, _CONC_90])
         trend["details"]["concentration_slope"] = round(float(conc_slope), 6)
         # 斜率为负 = 集中度在缩小 = 筹码在集中
         if conc_slope < -0.001:
@@ -267,62 +696,21 @@ def _analyze_chip_trend(df: pd.DataFrame) -> Dict[str, Any]:
             trend["details"]["concentration_speed"] = "stable"
 
     # ========== 主力行为推断（核心逻辑） ==========
-    # 交叉分析：集中度变化 × 获利比例变化 × 成本中心变化
-    accumulation_score = 0
-    distribution_score = 0
-    interpretations = []
-
-    conc_trend = trend["concentration_trend"]
-    cost_trend = trend["cost_center_trend"]
-    winner_trend = trend["winner_rate_trend"]
-
-    # 信号1: 筹码集中 + 获利比例下降 → 典型主力低位吸筹
-    if conc_trend == "concentrating" and winner_trend == "falling":
-        accumulation_score += 3
-        interpretations.append("🟢 筹码集中+获利比例下降：典型的主力低位吸筹信号")
-
-    # 信号2: 筹码集中 + 成本中心下移 → 主力在低位收集筹码
-    if conc_trend == "concentrating" and cost_trend == "falling":
-        accumulation_score += 2
-        interpretations.append("🟢 筹码集中+成本下移：主力在低位收集筹码")
-
-    # 信号3: 筹码集中 + 获利比例上升 → 主力拉升控盘
-    if conc_trend == "concentrating" and winner_trend == "rising":
-        accumulation_score += 1
-        interpretations.append("🟡 筹码集中+获利比例上升：主力拉升控盘阶段")
-
-    # 信号4: 筹码分散 + 获利比例高 → 主力高位派发
-    if conc_trend == "dispersing" and winner_trend == "rising":
-        distribution_score += 3
-        interpretations.append("🔴 筹码分散+获利比例上升：主力高位派发信号")
-
-    # 信号5: 筹码分散 + 成本中心上移 → 高位换手，可能是派发
-    if conc_trend == "dispersing" and cost_trend == "rising":
-        distribution_score += 2
-        interpretations.append("🔴 筹码分散+成本上移：高位换手活跃，警惕主力出货")
-
-    # 信号6: 筹码分散 + 获利比例下降 → 恐慌性抛售或洗盘
-    if conc_trend == "dispersing" and winner_trend == "falling":
-        distribution_score += 1
-        accumulation_score += 1  # 也可能是洗盘
-        interpretations.append("🟡 筹码分散+获利比例下降：可能是恐慌抛售或主力洗盘")
-
-    # 信号7: 成本中心下移 + 获利比例极低 → 底部区域
-    latest_winner = float(df.iloc[-1]["获利比例"])
-    if cost_trend == "falling" and latest_winner < 0.15:
-        accumulation_score += 1
-        interpretations.append("🟢 成本下移+获利比例极低：可能处于底部区域")
-
-    # 信号8: 70%集中度持续收窄 → 主力控盘程度加深
-    if len(df) >= 10:
-        recent_70 = df["70集中度"].iloc[-5:].mean()
-        early_70 = df["70集中度"].iloc[-15:-5].mean() if len(df) >= 15 else df["70集中度"].iloc[:5].mean()
-        if recent_70 < early_70 * 0.90:
-            accumulation_score += 2
-            interpretations.append("🟢 70%筹码集中度显著收窄：主力控盘程度加深")
-        elif recent_70 > early_70 * 1.10:
-            distribution_score += 1
-            interpretations.append("🔴 70%筹码集中度扩大：持仓分歧加大")
+    # 交叉分析：集中度变化 × 获利比例变化 × 成本中心变化（数值部分在打分内核中完成）
+    if n >= 10:
+        early_70_start, early_70_end = (n - 15, n - 5) if n >= 15 else (0, 5)
+        recent_70, early_70 = _window_mean(
+            csum, ccount, np.array([n - 5, early_70_start]), np.array([n, early_70_end])
+        )[:, _CONC_70].tolist()
+    else:
+        recent_70 = early_70 = np.nan
+
+    score_kernel = _make_score_kernel(score_thresholds)
+    accumulation_score, distribution_score, fired = score_kernel(
+        trend_codes[_CONC_90], trend_codes[_AVG_COST], trend_codes[_WINNER],
+        float(mat[-1, _WINNER]), float(recent_70), float(early_70), n >= 10,
+    )
+    interpretations = [msg for bit, msg in enumerate(_SIGNAL_MESSAGES) if fired >> bit & 1]
 
     # 综合判断主力态度
     if accumulation_score >= 3 and accumulation_score > distribution_score * 2:
@@ -348,21 +736,151 @@ def _analyze_chip_trend(df: pd.DataFrame) -> Dict[str, Any]:
     return trend
 
 
-def _calc_slope(series: pd.Series) -> float:
-    """计算序列的线性回归斜率"""
-    try:
-        y = series.values.astype(float)
-        x = np.arange(len(y))
-        if len(x) < 2:
-            return 0.0
-        slope = np.polyfit(x, y, 1)[0]
-        return float(slope)
-    except Exception:
+def _prefix_sums(mat: np.ndarray):
+    """
+    按列计算前缀和及非NaN计数（首行补0）
+
+    返回:
+        (csum, ccount)，窗口 [start, end) 的和为 csum[end] - csum[start]
+    """
+    valid = ~np.isnan(mat)
+    zeros = np.zeros((1, mat.shape[1]))
+    csum = np.concatenate([zeros, np.where(valid, mat, 0.0).cumsum(axis=0)])
+    ccount = np.concatenate([zeros, valid.cumsum(axis=0)])
+    return csum, ccount
+
+
+def _round_scaled(values: np.ndarray, scale: np.ndarray) -> list:
+    """按列舍入倍数（10**小数位）一次完成整批数值的舍入，返回Python列表"""
+    return (np.rint(values * scale) / scale).tolist()
+
+
+def _window_mean(csum: np.ndarray, ccount: np.ndarray, start, end) -> np.ndarray:
+    """
+    由前缀和求窗口 [start, end) 的按列均值，跳过NaN；整列无有效值时为NaN
+
+    start/end 为整数时返回单个窗口的按列均值；为整数数组时一次返回每个窗口一行的均值矩阵
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (csum[end] - csum[start]) / (ccount[end] - ccount[start])
+
+
+@lru_cache(maxsize=8)
+def _make_score_kernel(thresholds: ChipScoreThresholds):
+    """
+    按阈值构建主力行为打分内核（同一组阈值只构建一次）
+
+    阈值作为闭包常量传入内核，numba可用时直接作为编译期常量参与优化
+    """
+    bottom_winner_rate = thresholds.bottom_winner_rate
+    conc_70_narrow_ratio = thresholds.conc_70_narrow_ratio
+    conc_70_widen_ratio = thresholds.conc_70_widen_ratio
+
+    # 闭包内核不支持numba磁盘缓存，每个进程首次调用时编译
+    @jit_compile(cache=False)
+    def score_kernel(conc_code, cost_code, winner_code, latest_winner, recent_70, early_70, has_70):
+        """
+        主力行为打分内核（numba可用时编译执行）
+
+        参数:
+            conc_code / cost_code / winner_code: 集中度、成本中心、获利比例的趋势编码
+                （_TREND_BELOW：集中/下移/下降，_TREND_ABOVE：分散/上移/上升）
+            latest_winner: 最新获利比例
+            recent_70 / early_70: 近期/早期70%集中度均值
+            has_70: 是否有足够数据判断70%集中度变化
+
+        返回:
+            (吸筹得分, 派发得分, 触发信号位掩码)，第i位对应 _SIGNAL_MESSAGES[i]
+        """
+        # 信号1-6: 三个趋势编码组合查表
+        idx = conc_code * 9 + cost_code * 3 + winner_code
+        accum = int(_SIGNAL_ACCUM[idx])
+        dist = int(_SIGNAL_DIST[idx])
+        fired = int(_SIGNAL_FIRED[idx])
+
+        # 信号7: 成本中心下移 + 获利比例极低 → 底部区域
+        if cost_code == _TREND_BELOW and latest_winner < bottom_winner_rate:
+            accum += 1
+            fired |= 1 << 6
+        # 信号8: 70%集中度持续收窄 → 主力控盘程度加深
+        if has_70:
+            if recent_70 < early_70 * conc_70_narrow_ratio:
+                accum += 2
+                fired |= 1 << 7
+            elif recent_70 > early_70 * conc_70_widen_ratio:
+                dist += 1
+                fired |= 1 << 8
+
+        return accum, dist, fired
+
+    return score_kernel
+
+
+# 默认阈值的打分内核
+_score_kernel = _make_score_kernel(_DEFAULT_SCORE_THRESHOLDS)
+
+
+@jit_compile(cache=True)
+def _trend_kernel(mat, recent_n, early_start, early_end):
+    """
+    主趋势计算内核（numba可用时编译执行）
+
+    对 mat 前三列（集中度、成本中心、获利比例）计算近期/早期窗口均值（跳过NaN），
+    并与 _TREND_* 阈值比较，结果与NumPy向量化实现一致。
+
+    返回:
+        (近期均值, 早期均值, 低于下限, 高于上限)，均为长度3的数组
+    """
+    n = mat.shape[0]
+    k = _TREND_LOWER_SCALE.shape[0]
+    recent_means = np.empty(k)
+    early_means = np.empty(k)
+    below = np.zeros(k, dtype=np.bool_)
+    above = np.zeros(k, dtype=np.bool_)
+
+    for j in range(k):
+        total = 0.0
+        count = 0
+        for i in range(n - recent_n, n):
+            v = mat[i, j]
+            if not np.isnan(v):
+                total += v
+                count += 1
+        recent_means[j] = total / count if count > 0 else np.nan
+
+        total = 0.0
+        count = 0
+        for i in range(early_start, early_end):
+            v = mat[i, j]
+            if not np.isnan(v):
+                total += v
+                count += 1
+        early_means[j] = total / count if count > 0 else np.nan
+
+        below[j] = recent_means[j] < early_means[j] * _TREND_LOWER_SCALE[j] + _TREND_LOWER_SHIFT[j]
+        above[j] = recent_means[j] > early_means[j] * _TREND_UPPER_SCALE[j] + _TREND_UPPER_SHIFT[j]
+
+    return recent_means, early_means, below, above
+
+
+def _calc_slope(values: np.ndarray) -> float:
+    """
+    计算序列的线性回归斜率（最小二乘闭式解）
+
+    调用方传入float64矩阵的列切片，不再做类型防御；少于2个点或含NaN/inf时斜率记为0
+    （与原 np.polyfit 拟合失败时的回退值一致，保证结果可序列化为合法JSON）
+    """
+    y = np.asarray(values, dtype=np.float64)
+    n = y.size
+    if n < 2 or not np.isfinite(y).all():
         return 0.0
+    # x = 0..n-1：slope = Σ(x-x̄)·y / Σ(x-x̄)²，其中 Σ(x-x̄)² = n(n²-1)/12
+    x_centered = np.arange(n) - (n - 1) / 2.0
+    return float(x_centered @ y / (n * (n * n - 1) / 12.0))
 
 
 def _assess_chip_status(
-    latest: Dict[str, Any],
+    latest: ChipLatest,
     trend: Dict[str, Any],
     current_price: Optional[float] = None
 ) -> Dict[str, Any]:
@@ -379,51 +897,33 @@ def _assess_chip_status(
         "summary": ""
     }
 
-    winner_rate = latest["winner_rate"]
-    concentration_90 = latest["concentration_90"]
-    concentration_70 = latest["concentration_70"]
-    avg_cost = latest["average_cost"]
+    winner_rate = latest.winner_rate
+    concentration_90 = latest.concentration_90
+    avg_cost = latest.average_cost
 
     # --- 筹码集中度评估 ---
     # 90集中度 < 10% 表示筹码高度集中
-    if concentration_90 < 0.10:
-        assessment["chip_status"] = "highly_concentrated"
-        assessment["signals"].append("筹码高度集中，主力控盘明显")
-    elif concentration_90 < 0.20:
-        assessment["chip_status"] = "concentrated"
-        assessment["signals"].append("筹码较为集中")
-    elif concentration_90 > 0.40:
-        assessment["chip_status"] = "dispersed"
-        assessment["signals"].append("筹码分散，持仓分歧较大")
-    else:
-        assessment["chip_status"] = "neutral"
+    chip_status, conc_signal = _CONC_90_LEVELS[bisect_right(_CONC_90_BINS, concentration_90)]
+    assessment["chip_status"] = chip_status
+    if conc_signal:
+        assessment["signals"].append(conc_signal)
 
     # --- 获利比例评估 ---
-    if winner_rate > 0.90:
-        assessment["pressure_level"] = "high"
-        assessment["signals"].append(f"获利比例极高({winner_rate*100:.1f}%)，存在较大获利回吐压力")
-    elif winner_rate > 0.70:
-        assessment["pressure_level"] = "medium_high"
-        assessment["signals"].append(f"获利比例较高({winner_rate*100:.1f}%)，注意获利盘压力")
-    elif winner_rate < 0.10:
-        assessment["pressure_level"] = "low"
-        assessment["support_level"] = "low"
-        assessment["signals"].append(f"获利比例极低({winner_rate*100:.1f}%)，多数筹码被套")
-    elif winner_rate < 0.30:
-        assessment["pressure_level"] = "low"
-        assessment["signals"].append(f"获利比例较低({winner_rate*100:.1f}%)，套牢盘较多")
+    pressure, support, winner_tpl = _WINNER_LEVELS[bisect_right(_WINNER_BINS, winner_rate)]
+    if pressure:
+        assessment["pressure_level"] = pressure
+    if support:
+        assessment["support_level"] = support
+    if winner_tpl:
+        assessment["signals"].append(winner_tpl.format(winner_rate * 100))
 
     # --- 当前价格与平均成本的关系 ---
     if current_price and avg_cost > 0:
         price_vs_cost = (current_price - avg_cost) / avg_cost
         if price_vs_cost > 0.15:
-            assessment["signals"].append(
-                f"当前价格高于平均成本{price_vs_cost*100:.1f}%，获利盘较多"
-            )
+            assessment["signals"].append(_TPL_PRICE_ABOVE_COST.format(price_vs_cost * 100))
         elif price_vs_cost < -0.15:
-            assessment["signals"].append(
-                f"当前价格低于平均成本{abs(price_vs_cost)*100:.1f}%，套牢盘压力大"
-            )
+            assessment["signals"].append(_TPL_PRICE_BELOW_COST.format(abs(price_vs_cost) * 100))
             assessment["support_level"] = "low"
         else:
             assessment["signals"].append("当前价格接近平均成本，多空博弈区间")
@@ -447,25 +947,15 @@ def _assess_chip_status(
     inst_confidence = trend.get("institutional_confidence", "low")
     interpretations = trend.get("interpretation", [])
 
-    inst_signal_map = {
-        "accumulating": "主力吸筹",
-        "distributing": "主力派发",
-        "neutral": "主力态度不明",
-    }
-    inst_confidence_map = {
-        "high": "强",
-        "medium": "中等",
-        "low": "弱",
-    }
-
     assessment["institutional_signal"] = inst_signal
     assessment["institutional_confidence"] = inst_confidence
     assessment["institutional_interpretation"] = interpretations
 
     if inst_signal != "neutral":
-        assessment["signals"].append(
-            f"主力行为研判：{inst_signal_map.get(inst_signal, '不明')}（信号强度：{inst_confidence_map.get(inst_confidence, '弱')}）"
-        )
+        assessment["signals"].append(_TPL_INST_SIGNAL.format(
+            _INST_SIGNAL_MAP.get(inst_signal, "不明"),
+            _INST_CONFIDENCE_MAP.get(inst_confidence, "弱"),
+        ))
 
     # 多周期信息
     multi_period = trend.get("multi_period", {})
@@ -476,53 +966,48 @@ def _assess_chip_status(
     summary_parts = []
 
     # 集中度描述
-    status_map = {
-        "highly_concentrated": "筹码高度集中",
-        "concentrated": "筹码较集中",
-        "dispersed": "筹码分散",
-        "neutral": "筹码分布适中"
-    }
-    summary_parts.append(status_map.get(assessment["chip_status"], "筹码分布适中"))
+    summary_parts.append(_STATUS_DESC_MAP.get(assessment["chip_status"], "筹码分布适中"))
 
     # 获利比例描述
-    summary_parts.append(f"获利比例{winner_rate*100:.1f}%")
+    summary_parts.append(_TPL_SUMMARY_WINNER.format(winner_rate * 100))
 
     # 平均成本
-    summary_parts.append(f"平均成本{avg_cost:.2f}元")
+    summary_parts.append(_TPL_SUMMARY_COST.format(avg_cost))
 
     # 趋势描述
-    trend_desc_map = {
-        "concentrating": "筹码趋于集中",
-        "dispersing": "筹码趋于分散",
-        "stable": "筹码分布稳定"
-    }
-    summary_parts.append(trend_desc_map.get(conc_trend, ""))
+    summary_parts.append(_TREND_DESC_MAP.get(conc_trend, ""))
 
     # 主力行为描述
     if inst_signal == "accumulating":
-        summary_parts.append(f"研判主力吸筹（{inst_confidence_map.get(inst_confidence, '弱')}信号）")
+        summary_parts.append(_TPL_SUMMARY_ACCUMULATING.format(_INST_CONFIDENCE_MAP.get(inst_confidence, "弱")))
     elif inst_signal == "distributing":
-        summary_parts.append(f"研判主力派发（{inst_confidence_map.get(inst_confidence, '弱')}信号）")
+        summary_parts.append(_TPL_SUMMARY_DISTRIBUTING.format(_INST_CONFIDENCE_MAP.get(inst_confidence, "弱")))
 
     assessment["summary"] = "，".join(filter(None, summary_parts)) + "。"
 
     return assessment
 
 
-def _empty_chip_result(error_msg: str) -> Dict[str, Any]:
+# 空结果中与错误无关的固定评估字段（只读，每次展开为新字典）
+_EMPTY_ASSESSMENT = MappingProxyType({
+    "chip_status": "unknown",
+    "pressure_level": "unknown",
+    "support_level": "unknown",
+})
+
+
+def _empty_chip_result(error_msg: str) -> ChipResult:
     """返回空的筹码分析结果（数据获取失败时使用）"""
-    return {
-        "latest": {},
-        "trend": {},
-        "assessment": {
-            "chip_status": "unknown",
-            "pressure_level": "unknown",
-            "support_level": "unknown",
+    return ChipResult(
+        latest=None,
+        trend={},
+        assessment={
+            **_EMPTY_ASSESSMENT,
             "signals": [],
-            "summary": f"筹码数据获取失败: {error_msg}"
+            "summary": f"筹码数据获取失败: {error_msg}",
         },
-        "error": error_msg
-    }
+        error=error_msg,
+    )
 
 
 class ChipAnalyzer:
@@ -532,8 +1017,15 @@ class ChipAnalyzer:
     提供筹码分析的面向对象接口
     """
 
-    def __init__(self):
-        self.logger = get_logger(self.__class__.__name__)
+    # 类级别日志记录器，所有实例共享，避免每次实例化重复获取
+    logger: ClassVar[logging.Logger] = get_logger("ChipAnalyzer")
+
+    def __init__(self, score_thresholds: Optional[ChipScoreThresholds] = None):
+        """
+        参数:
+            score_thresholds: 主力行为打分阈值（可选，默认使用内置阈值）
+        """
+        self.score_thresholds = score_thresholds
 
     def analyze(
         self,
@@ -542,12 +1034,65 @@ class ChipAnalyzer:
         adjust: Literal["qfq", "hfq", ""] = "qfq"
     ) -> Dict[str, Any]:
         """执行筹码分析"""
-        return analyze_chip_distribution(symbol, current_price, adjust)
+        return analyze_chip_distribution(symbol, current_price, adjust, self.score_thresholds)
+
+    def analyze_many(
+        self,
+        symbols: List[str],
+        current_prices: Optional[Dict[str, float]] = None,
+        adjust: Literal["qfq", "hfq", ""] = "qfq",
+        max_workers: int = 16
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        批量执行筹码分析
+
+        筹码数据获取以网络等待为主，使用线程池并发请求多只股票；
+        数据已在内存或磁盘缓存中的股票无需等待网络，直接在当前线程计算，不进入线程池。
+        单只股票计算失败时返回空结果（含error字段），不影响其他股票。
+
+        参数:
+            symbols: 股票代码列表
+            current_prices: {股票代码: 当前价格}（可选）
+            adjust: 复权方式
+            max_workers: 最大并发线程数
+
+        返回:
+            {股票代码: 筹码分析结果}，顺序与symbols一致
+        """
+        if not symbols:
+            return {}
+
+        # 配置 SHARED_HTTP_SESSION 时 stock_cyq_em 改走连接池会话
+        enable_shared_session_if_configured()
+        prices = current_prices or {}
+
+        def _analyze_one(symbol: str) -> Dict[str, Any]:
+            try:
+                return analyze_chip_distribution(
+                    symbol, prices.get(symbol), adjust, self.score_thresholds
+                )
+            except CalculationError as e:
+                self.logger.warning(f"[chip_analysis] {symbol} 筹码分析失败: {e}")
+                return _empty_chip_result(str(e)).to_dict()
+
+        results: Dict[str, Dict[str, Any]] = {}
+        pending = []
+        for symbol in symbols:
+            if _is_chip_data_cached(symbol, adjust):
+                results[symbol] = _analyze_one(symbol)
+            else:
+                pending.append(symbol)
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+                results.update(zip(pending, executor.map(_analyze_one, pending)))
+
+        return {symbol: results[symbol] for symbol in symbols}
 
     def get_raw_data(
         self,
         symbol: str,
         adjust: Literal["qfq", "hfq", ""] = "qfq"
     ) -> pd.DataFrame:
-        """获取原始筹码分布数据"""
-        return fetch_chip_distribution(symbol, adjust)
+        """获取原始筹码分布数据（独立副本，可自由修改）"""
+        return fetch_chip_distribution(symbol, adjust).copy()
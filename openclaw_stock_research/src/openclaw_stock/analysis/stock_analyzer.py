@@ -4,27 +4,24 @@
 实现设计文档4.4节的接口8: 个股综合分析
 """
 
-from typing import Literal, Optional, Dict, Any, List
+from typing import Literal, Optional, Dict, Any, List, Callable, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from dataclasses import dataclass, field
+from functools import lru_cache, partial
+import io
 from datetime import datetime, timedelta
+import time
 import pandas as pd
 import numpy as np
 
 from ..core.exceptions import DataSourceError, CalculationError
 from ..utils.logger import get_logger
+from ..utils.decorators import jit_compile
+from ..utils.http_session import enable_shared_session_if_configured
 from ..data.market_data import fetch_market_data, fetch_realtime_quote
-from ..data.financial_data import fetch_financial_data
-from ..data.fund_flow import fetch_fund_flow, fetch_capital_flow
+from ..data.fund_flow import fetch_capital_flow
 from ..data.news_data import fetch_stock_news
-from ..data.lhb_data import fetch_lhb_data
-from ..data.margin_data import fetch_margin_data
-from ..data.northbound_data import fetch_northbound_data
-from ..data.block_trade_data import fetch_block_trade_data
-from ..data.shareholder_data import fetch_shareholder_data
-from ..data.institution_data import fetch_institution_data
-from ..data.restricted_shares_data import fetch_restricted_shares_data
-from ..data.industry_compare_data import fetch_industry_compare_data
-from ..data.dividend_data import fetch_dividend_data
+from ..data.registry import DATA_SOURCES
 from ..analysis.technical_analysis import (
     calculate_technical_indicators,
     calculate_support_resistance,
@@ -43,6 +40,39 @@ except ImportError:
 
 logger = get_logger(__name__)
 
+# 并发获取各数据源的最大线程数（基本信息、技术面等15个数据源）
+_FETCH_MAX_WORKERS = 16
+
+# 等待全部数据源返回的总时限（秒）；超时的数据源按失败处理，不阻塞整份分析
+_FETCH_TIMEOUT = 30
+
+# analyze_stock 结果中的各分析字段（按输出顺序），默认值均为空字典
+_RESULT_SECTIONS = (
+    "basic_info",
+    "technical_analysis",
+    "fundamental_analysis",
+    "fund_flow_analysis",
+    "news_analysis",
+    "chip_analysis",
+    # === 新增9大数据源 ===
+    "lhb_analysis",
+    "margin_analysis",
+    "northbound_analysis",
+    "block_trade_analysis",
+    "shareholder_analysis",
+    "institution_analysis",
+    "restricted_shares_analysis",
+    "industry_compare_analysis",
+    "dividend_analysis",
+    # === END ===
+    "risk_assessment",
+    "prediction",
+)
+
+# 分析器均无状态，模块内共享同一实例（各线程并发调用亦安全）
+_TECH_ANALYZER = TechnicalAnalyzer()
+_FUND_ANALYZER = FundamentalAnalyzer()
+
 
 @dataclass
 class PredictionResult:
@@ -71,7 +101,8 @@ class RiskAssessment:
 def analyze_stock(
     symbol: str,
     market: Literal["sh", "sz", "hk"] = "sh",
-    lookback_days: int = 250
+    lookback_days: int = 250,
+    as_of: Optional[datetime] = None
 ) -> Dict[str, Any]:
     """
     个股全方位分析（接口8实现）
@@ -80,6 +111,7 @@ def analyze_stock(
         symbol: 股票代码
         market: 市场类型
         lookback_days: 回看天数
+        as_of: 行情窗口的截止时间，默认为当前时间；批量分析时传入同一时间使各股窗口一致
 
     返回:
         {
@@ -98,325 +130,110 @@ def analyze_stock(
     if ak is None:
         raise DataSourceError("akshare库未安装")
 
+    # 配置 SHARED_HTTP_SESSION 时各数据源接口改走连接池会话
+    enable_shared_session_if_configured()
     logger.info(f"[analyze_stock] 开始分析 {market}:{symbol}")
 
     try:
+        now = datetime.now()
+        start_date, end_date = _date_window(lookback_days, as_of or now)
+        # 结果字典一次建好全部字段，之后只覆盖已有键（不再新增键）
         result = {
             "symbol": symbol,
             "market": market,
-            "analysis_time": datetime.now().isoformat(),
-            "basic_info": {},
-            "technical_analysis": {},
-            "fundamental_analysis": {},
-            "fund_flow_analysis": {},
-            "news_analysis": {},
-            "chip_analysis": {},
-            # === 新增9大数据源 ===
-            "lhb_analysis": {},
-            "margin_analysis": {},
-            "northbound_analysis": {},
-            "block_trade_analysis": {},
-            "shareholder_analysis": {},
-            "institution_analysis": {},
-            "restricted_shares_analysis": {},
-            "industry_compare_analysis": {},
-            "dividend_analysis": {},
-            # === END ===
-            "risk_assessment": {},
-            "prediction": {}
+            "analysis_time": now.isoformat(),
+            **{section: {} for section in _RESULT_SECTIONS},
         }
 
-        # 1. 获取基本信息
-        try:
-            # 获取实时行情
-            realtime_data = fetch_realtime_quote(symbol=symbol, market=market)
-            result["basic_info"] = {
-                "symbol": symbol,
-                "name": realtime_data.get("name", ""),
-                "current_price": realtime_data.get("price", 0),
-                "change": realtime_data.get("change", 0),
-                "change_pct": realtime_data.get("change_pct", 0),
-                "volume": realtime_data.get("volume", 0),
-                "turnover": realtime_data.get("amount", 0),
-                "high": realtime_data.get("high", 0),
-                "low": realtime_data.get("low", 0),
-                "open": realtime_data.get("open", 0),
-                "pre_close": realtime_data.get("pre_close", 0)
-            }
-        except Exception as e:
-            logger.warning(f"[{symbol}] 获取基本信息失败: {e}")
-
-        # 2. 技术分析
-        try:
-            # 获取历史K线数据
-            df_kline = fetch_market_data(
-                symbol=symbol,
-                period="daily",
-                start_date=(datetime.now() - timedelta(days=lookback_days)).strftime("%Y%m%d"),
-                end_date=datetime.now().strftime("%Y%m%d"),
-                market=market
-            )
-
-            if not df_kline.empty:
-                # 计算技术指标
-                df_tech = calculate_technical_indicators(df_kline)
-
-                # 检测交易信号
-                analyzer = TechnicalAnalyzer()
-                signals = analyzer.detect_signals(df_tech)
-
-                # 计算支撑压力位
-                sr_data = calculate_support_resistance(symbol, df_tech)
-
-                # 趋势判断
-                current_price = df_tech["close"].iloc[-1]
-                ma20 = df_tech["ma20"].iloc[-1] if "ma20" in df_tech.columns else current_price
-                ma60 = df_tech["ma60"].iloc[-1] if "ma60" in df_tech.columns else current_price
-
-                if current_price > ma20 > ma60:
-                    trend = "上升趋势"
-                elif current_price < ma20 < ma60:
-                    trend = "下降趋势"
-                else:
-                    trend = "震荡整理"
-
-                result["technical_analysis"] = {
-                    "current_price": current_price,
-                    "trend": trend,
-                    "signals": signals,
-                    "support_resistance": sr_data,
-                    "indicators": {
-                        "ma5": df_tech["ma5"].iloc[-1] if "ma5" in df_tech.columns else None,
-                        "ma10": df_tech["ma10"].iloc[-1] if "ma10" in df_tech.columns else None,
-                        "ma20": df_tech["ma20"].iloc[-1] if "ma20" in df_tech.columns else None,
-                        "ma60": df_tech["ma60"].iloc[-1] if "ma60" in df_tech.columns else None,
-                        "rsi6": df_tech["rsi6"].iloc[-1] if "rsi6" in df_tech.columns else None,
-                        "macd_hist": df_tech["macd_hist"].iloc[-1] if "macd_hist" in df_tech.columns else None,
-                    }
-                }
-        except Exception as e:
-            logger.warning(f"[{symbol}] 技术分析失败: {e}")
-
-        # 3. 基本面分析
-        try:
-            # 获取基本面数据
-            fundamental_data = calculate_fundamental_indicators(symbol)
-
-            # 使用FundamentalAnalyzer进行分析
-            analyzer = FundamentalAnalyzer()
-            valuation_level = analyzer.analyze_valuation(fundamental_data)
-            profitability_level = analyzer.analyze_profitability(fundamental_data)
-            growth_level = analyzer.analyze_growth(fundamental_data)
-
-            # 估值评价
-            if valuation_level == "undervalued":
-                valuation_desc = "低估值"
-            elif valuation_level == "overvalued":
-                valuation_desc = "高估值"
-            else:
-                valuation_desc = "合理估值"
-
-            result["fundamental_analysis"] = {
-                "valuation": fundamental_data.get("valuation", {}),
-                "profitability": fundamental_data.get("profitability", {}),
-                "growth": fundamental_data.get("growth", {}),
-                "quality": fundamental_data.get("quality", {}),
-                "analysis": {
-                    "valuation_level": valuation_desc,
-                    "profitability_level": profitability_level,
-                    "growth_level": growth_level,
-                }
-            }
-        except Exception as e:
-            logger.warning(f"[{symbol}] 基本面分析失败: {e}")
-
-        # 4. 资金流向分析
-        try:
-            # 获取资金流向数据
-            capital_flow = fetch_capital_flow(symbol=symbol, market=market, days=5)
-
-            result["fund_flow_analysis"] = {
-                "recent_flow": capital_flow,
-                "main_inflow_5d": capital_flow.get("main_inflow", 0),
-                "retail_inflow_5d": capital_flow.get("retail_inflow", 0),
-            }
-        except Exception as e:
-            logger.warning(f"[{symbol}] 资金流向分析失败: {e}")
+        # 1-15. 各数据源相互独立且以网络等待为主，使用线程池并发获取：
+        # 新闻依赖股票名称、筹码分析依赖当前价格，待基本信息返回后再提交
+        fetch_specs = {
+            "basic_info": ("获取基本信息", _fetch_basic_info, {"symbol": symbol, "market": market}),
+            "technical_analysis": ("技术分析", _analyze_technical, {
+                "symbol": symbol, "market": market, "start_date": start_date, "end_date": end_date,
+            }),
+            "fundamental_analysis": ("基本面分析", _analyze_fundamental, {"symbol": symbol}),
+            "fund_flow_analysis": ("资金流向分析", _analyze_fund_flow, {"symbol": symbol, "market": market}),
+            # === 新增9大数据源（见 data.registry） ===
+            **{
+                source.key: (source.label, source.resolve(), source.kwargs(symbol, market))
+                for source in DATA_SOURCES
+            },
+        }
 
-        # 5. 新闻分析
+        deadline = time.monotonic() + _FETCH_TIMEOUT
+        executor = ThreadPoolExecutor(max_workers=_FETCH_MAX_WORKERS)
         try:
-            # 获取股票名称
-            stock_name = result.get("basic_info", {}).get("name", "")
-            
-            # 获取新闻数据
-            news_data = fetch_stock_news(symbol=symbol, stock_name=stock_name, limit=10)
-            
-            result["news_analysis"] = {
-                "news_count": news_data.get("news_count", 0),
-                "news_list": news_data.get("news_list", []),
-                "summary": news_data.get("summary", ""),
-                "fetch_time": news_data.get("fetch_time", "")
-            }
-            
-            logger.info(f"[{symbol}] 获取到 {news_data.get('news_count', 0)} 条新闻")
-        except Exception as e:
-            logger.warning(f"[{symbol}] 新闻分析失败: {e}")
-            result["news_analysis"] = {
-                "news_count": 0,
-                "news_list": [],
-                "summary": "新闻获取失败",
-                "error": str(e)
+            futures = {
+                key: executor.submit(fn, **kwargs)
+                for key, (_, fn, kwargs) in fetch_specs.items()
             }
 
-        # 6. 筹码分布分析
-        try:
-            current_price = result.get("basic_info", {}).get("current_price", None)
-            chip_data = analyze_chip_distribution(
-                symbol=symbol,
-                current_price=current_price,
-                adjust="qfq"
+            _collect_result(result, symbol, "basic_info", "获取基本信息", futures.pop("basic_info"), deadline)
+            basic_info = result["basic_info"]
+            futures["news_analysis"] = executor.submit(
+                _analyze_news, symbol=symbol, stock_name=basic_info.get("name", "")
+            )
+            futures["chip_analysis"] = executor.submit(
+                _analyze_chip, symbol=symbol, current_price=basic_info.get("current_price", None)
             )
-            result["chip_analysis"] = chip_data
-            logger.info(f"[{symbol}] 筹码分析完成")
-        except Exception as e:
-            logger.warning(f"[{symbol}] 筹码分析失败: {e}")
-            result["chip_analysis"] = {
-                "latest": {},
-                "trend": {},
-                "assessment": {
-                    "chip_status": "unknown",
-                    "summary": f"筹码分析失败: {e}"
-                },
-                "error": str(e)
-            }
-
-        # === 7-15: 新增9大数据源 ===
-
-        # 7. 龙虎榜
-        try:
-            lhb_data = fetch_lhb_data(symbol=symbol, days=90)
-            result["lhb_analysis"] = lhb_data
-            logger.info(f"[{symbol}] 龙虎榜分析完成")
-        except Exception as e:
-            logger.warning(f"[{symbol}] 龙虎榜分析失败: {e}")
-
-        # 8. 融资融券
-        try:
-            margin_data = fetch_margin_data(symbol=symbol, days=30)
-            result["margin_analysis"] = margin_data
-            logger.info(f"[{symbol}] 融资融券分析完成")
-        except Exception as e:
-            logger.warning(f"[{symbol}] 融资融券分析失败: {e}")
-
-        # 9. 北向资金
-        try:
-            northbound_data = fetch_northbound_data(symbol=symbol, market=market)
-            result["northbound_analysis"] = northbound_data
-            logger.info(f"[{symbol}] 北向资金分析完成")
-        except Exception as e:
-            logger.warning(f"[{symbol}] 北向资金分析失败: {e}")
-
-        # 10. 大宗交易
-        try:
-            block_trade_data = fetch_block_trade_data(symbol=symbol, days=90)
-            result["block_trade_analysis"] = block_trade_data
-            logger.info(f"[{symbol}] 大宗交易分析完成")
-        except Exception as e:
-            logger.warning(f"[{symbol}] 大宗交易分析失败: {e}")
-
-        # 11. 股东人数
-        try:
-            shareholder_data = fetch_shareholder_data(symbol=symbol)
-            result["shareholder_analysis"] = shareholder_data
-            logger.info(f"[{symbol}] 股东人数分析完成")
-        except Exception as e:
-            logger.warning(f"[{symbol}] 股东人数分析失败: {e}")
-
-        # 12. 机构持仓
-        try:
-            institution_data = fetch_institution_data(symbol=symbol)
-            result["institution_analysis"] = institution_data
-            logger.info(f"[{symbol}] 机构持仓分析完成")
-        except Exception as e:
-            logger.warning(f"[{symbol}] 机构持仓分析失败: {e}")
-
-        # 13. 限售解禁
-        try:
-            restricted_data = fetch_restricted_shares_data(symbol=symbol)
-            result["restricted_shares_analysis"] = restricted_data
-            logger.info(f"[{symbol}] 限售解禁分析完成")
-        except Exception as e:
-            logger.warning(f"[{symbol}] 限售解禁分析失败: {e}")
-
-        # 14. 行业对比
-        try:
-            industry_data = fetch_industry_compare_data(symbol=symbol)
-            result["industry_compare_analysis"] = industry_data
-            logger.info(f"[{symbol}] 行业对比分析完成")
-        except Exception as e:
-            logger.warning(f"[{symbol}] 行业对比分析失败: {e}")
 
-        # 15. 分红送转
-        try:
-            dividend_data = fetch_dividend_data(symbol=symbol)
-            result["dividend_analysis"] = dividend_data
-            logger.info(f"[{symbol}] 分红送转分析完成")
-        except Exception as e:
-            logger.warning(f"[{symbol}] 分红送转分析失败: {e}")
+            labels = {key: label for key, (label, _, _) in fetch_specs.items()}
+            labels.update(news_analysis="新闻分析", chip_analysis="筹码分析")
+            for key, future in futures.items():
+                _collect_result(result, symbol, key, labels[key], future, deadline,
+                                on_error=_ERROR_RESULTS.get(key))
+        finally:
+            # 超时仍在运行的请求留在后台线程结束，不再等待
+            executor.shutdown(wait=False, cancel_futures=True)
 
-        # === END 9大数据源 ===
+        # 各分析结果各取一次，供风险评估与后市预测使用
+        tech = result.get("technical_analysis") or {}
+        fund = result.get("fundamental_analysis") or {}
 
         # 16. 风险评估
         try:
             risk_factors = []
 
             # 根据波动率评估
-            volatility = "medium"
-            if "technical_analysis" in result and result["technical_analysis"]:
-                indicators = result["technical_analysis"].get("indicators", {})
+            volatility = _RISK_MEDIUM
+            if tech:
+                indicators = tech.get("indicators", {})
                 rsi = indicators.get("rsi6")
                 if rsi and (rsi > 80 or rsi < 20):
-                    volatility = "high"
+                    volatility = _RISK_HIGH
                     risk_factors.append("RSI超买/超卖")
 
             # 根据估值评估
-            valuation_risk = "medium"
-            if "fundamental_analysis" in result and result["fundamental_analysis"]:
-                valuation = result["fundamental_analysis"].get("valuation", {})
+            valuation_risk = _RISK_MEDIUM
+            if fund:
+                valuation = fund.get("valuation", {})
                 pe = valuation.get("pe_ttm")
                 if pe and pe > 50:
-                    valuation_risk = "high"
+                    valuation_risk = _RISK_HIGH
                     risk_factors.append("估值偏高")
                 elif pe and pe < 10:
-                    valuation_risk = "low"
+                    valuation_risk = _RISK_LOW
 
             # 根据趋势评估
-            trend_risk = "medium"
-            if "technical_analysis" in result and result["technical_analysis"]:
-                trend = result["technical_analysis"].get("trend", "")
-                if "下降" in trend:
-                    trend_risk = "high"
+            trend_risk = _RISK_MEDIUM
+            if tech:
+                trend_code = tech.get("trend_code", _TREND_CODE_SIDEWAYS)
+                if trend_code == _TREND_CODE_DOWN:
+                    trend_risk = _RISK_HIGH
                     risk_factors.append("下降趋势")
-                elif "上升" in trend:
-                    trend_risk = "low"
+                elif trend_code == _TREND_CODE_UP:
+                    trend_risk = _RISK_LOW
 
             # 综合风险等级
-            risk_levels = [volatility, valuation_risk, trend_risk]
-            high_count = risk_levels.count("high")
-            low_count = risk_levels.count("low")
-
-            if high_count >= 2:
-                overall_risk = "high"
-            elif low_count >= 2:
-                overall_risk = "low"
-            else:
-                overall_risk = "medium"
+            risk_levels = np.array([volatility, valuation_risk, trend_risk], dtype=np.int8)
+            overall_risk = int(_combine_risk_levels(risk_levels))
 
             result["risk_assessment"] = {
-                "overall_risk": overall_risk,
-                "volatility_risk": volatility,
-                "valuation_risk": valuation_risk,
-                "trend_risk": trend_risk,
+                "overall_risk": _RISK_LEVEL_NAMES[overall_risk],
+                "volatility_risk": _RISK_LEVEL_NAMES[volatility],
+                "valuation_risk": _RISK_LEVEL_NAMES[valuation_risk],
+                "trend_risk": _RISK_LEVEL_NAMES[trend_risk],
                 "risk_factors": risk_factors,
                 "max_drawdown_estimate": None  # 需要历史数据计算
             }
@@ -425,196 +242,14 @@ def analyze_stock(
 
         # 8. 后市预测
         try:
-            # 基于技术和基本面综合判断
-            trend_probability = 0.5
+            # 基于技术、基本面、资金及筹码等综合判断：各分析结果编码为特征状态后统一打分
             predicted_trend = "sideways"
             target_high = None
             target_low = None
-            key_factors = []
-
-            # 技术面判断
-            if "technical_analysis" in result and result["technical_analysis"]:
-                tech = result["technical_analysis"]
-                trend = tech.get("trend", "")
-                signals = tech.get("signals", {})
-
-                if "上升" in trend:
-                    trend_probability += 0.2
-                    key_factors.append("技术趋势向上")
-                elif "下降" in trend:
-                    trend_probability -= 0.2
-                    key_factors.append("技术趋势向下")
-
-                overall_signal = signals.get("overall", "neutral") if isinstance(signals, dict) else "neutral"
-                if overall_signal in ["buy", "strong_buy"]:
-                    trend_probability += 0.15
-                    key_factors.append("技术指标买入信号")
-                elif overall_signal in ["sell", "strong_sell"]:
-                    trend_probability -= 0.15
-                    key_factors.append("技术指标卖出信号")
-
-            # 基本面判断
-            if "fundamental_analysis" in result and result["fundamental_analysis"]:
-                fund = result["fundamental_analysis"]
-                analysis = fund.get("analysis", {})
-
-                profitability = analysis.get("profitability_level", "moderate")
-                if profitability == "strong":
-                    trend_probability += 0.1
-                    key_factors.append("盈利能力强")
-
-                growth = analysis.get("growth_level", "moderate")
-                if growth == "high":
-                    trend_probability += 0.1
-                    key_factors.append("成长性高")
-
-                valuation = analysis.get("valuation_level", "合理估值")
-                if "低估值" in valuation:
-                    trend_probability += 0.1
-                    key_factors.append("估值偏低")
-                elif "高估值" in valuation:
-                    trend_probability -= 0.1
-                    key_factors.append("估值偏高")
-
-            # 资金流向判断
-            if "fund_flow_analysis" in result and result["fund_flow_analysis"]:
-                flow = result["fund_flow_analysis"]
-                main_inflow = flow.get("main_inflow_5d", 0)
-
-                if main_inflow > 0:
-                    trend_probability += 0.1
-                    key_factors.append("主力资金净流入")
-                elif main_inflow < 0:
-                    trend_probability -= 0.1
-                    key_factors.append("主力资金净流出")
-
-            # 筹码面判断
-            if "chip_analysis" in result and result["chip_analysis"]:
-                chip = result["chip_analysis"]
-                chip_assessment = chip.get("assessment", {})
-                chip_trend = chip.get("trend", {})
-
-                chip_status = chip_assessment.get("chip_status", "neutral")
-                if chip_status in ("highly_concentrated", "concentrated"):
-                    trend_probability += 0.05
-                    key_factors.append("筹码集中")
-                elif chip_status == "dispersed":
-                    trend_probability -= 0.05
-                    key_factors.append("筹码分散")
 
-                conc_trend = chip_trend.get("concentration_trend", "stable")
-                if conc_trend == "concentrating":
-                    trend_probability += 0.05
-                    key_factors.append("筹码趋于集中")
-                elif conc_trend == "dispersing":
-                    trend_probability -= 0.05
-                    key_factors.append("筹码趋于分散")
-
-                chip_latest = chip.get("latest", {})
-                winner_rate = chip_latest.get("winner_rate", 0.5)
-                if winner_rate > 0.90:
-                    trend_probability -= 0.05
-                    key_factors.append("获利盘压力大")
-                elif winner_rate < 0.10:
-                    key_factors.append("套牢盘较重")
-
-                # 主力行为推断
-                inst_signal = chip_trend.get("institutional_signal", "neutral")
-                if inst_signal == "accumulating":
-                    trend_probability += 0.05
-                    key_factors.append("筹码分析研判主力吸筹")
-                elif inst_signal == "distributing":
-                    trend_probability -= 0.05
-                    key_factors.append("筹码分析研判主力派发")
-
-            # === 新增数据源纳入预测 ===
-
-            # 龙虎榜判断
-            if result.get("lhb_analysis"):
-                lhb = result["lhb_analysis"]
-                lhb_analysis = lhb.get("analysis", {})
-                inst_att = lhb_analysis.get("institution_attitude", "中性")
-                if "净买入" in inst_att:
-                    trend_probability += 0.05
-                    key_factors.append("龙虎榜机构净买入")
-                elif "净卖出" in inst_att:
-                    trend_probability -= 0.05
-                    key_factors.append("龙虎榜机构净卖出")
-
-            # 融资融券判断
-            if result.get("margin_analysis"):
-                margin = result["margin_analysis"]
-                margin_analysis = margin.get("analysis", {})
-                margin_trend = margin_analysis.get("margin_trend", "stable")
-                if margin_trend == "increasing":
-                    trend_probability += 0.05
-                    key_factors.append("融资余额增加（杠杆看多）")
-                elif margin_trend == "decreasing":
-                    trend_probability -= 0.05
-                    key_factors.append("融资余额减少（杠杆看空）")
-
-            # 北向资金判断
-            if result.get("northbound_analysis"):
-                nb = result["northbound_analysis"]
-                nb_analysis = nb.get("analysis", {})
-                nb_direction = nb_analysis.get("direction", "neutral")
-                if nb_direction == "inflow":
-                    trend_probability += 0.05
-                    key_factors.append("北向资金净流入")
-                elif nb_direction == "outflow":
-                    trend_probability -= 0.05
-                    key_factors.append("北向资金净流出")
-
-            # 大宗交易判断
-            if result.get("block_trade_analysis"):
-                bt = result["block_trade_analysis"]
-                bt_analysis = bt.get("analysis", {})
-                bt_premium = bt_analysis.get("avg_premium", 0)
-                if bt_analysis.get("records_count", 0) > 0:
-                    if bt_premium > 0:
-                        trend_probability += 0.03
-                        key_factors.append("大宗交易溢价成交")
-                    elif bt_premium < -5:
-                        trend_probability -= 0.03
-                        key_factors.append("大宗交易大幅折价")
-
-            # 股东人数判断
-            if result.get("shareholder_analysis"):
-                sh = result["shareholder_analysis"]
-                sh_analysis = sh.get("analysis", {})
-                sh_trend = sh_analysis.get("shareholder_trend", "stable")
-                if sh_trend == "decreasing":
-                    trend_probability += 0.05
-                    key_factors.append("股东人数减少（筹码集中）")
-                elif sh_trend == "increasing":
-                    trend_probability -= 0.03
-                    key_factors.append("股东人数增加（筹码分散）")
-
-            # 限售解禁判断
-            if result.get("restricted_shares_analysis"):
-                rs = result["restricted_shares_analysis"]
-                rs_analysis = rs.get("analysis", {})
-                rs_pressure = rs_analysis.get("pressure_level", "low")
-                if rs_pressure == "high":
-                    trend_probability -= 0.05
-                    key_factors.append("近期有大额限售解禁")
-                elif rs_pressure == "medium":
-                    trend_probability -= 0.02
-                    key_factors.append("近期有限售解禁")
-
-            # 机构持仓判断
-            if result.get("institution_analysis"):
-                inst = result["institution_analysis"]
-                inst_analysis = inst.get("analysis", {})
-                inst_trend = inst_analysis.get("holding_trend", "stable")
-                if inst_trend == "increasing":
-                    trend_probability += 0.05
-                    key_factors.append("机构持仓增加")
-                elif inst_trend == "decreasing":
-                    trend_probability -= 0.03
-                    key_factors.append("机构持仓减少")
-
-            # === END 新增数据源 ===
+            states = _encode_prediction_features(result)
+            trend_probability = float(_prediction_score_kernel(states, _PREDICTION_WEIGHTS))
+            key_factors = _prediction_key_factors(states)
 
             # 确定趋势方向
             if trend_probability > 0.6:
@@ -626,8 +261,8 @@ def analyze_stock(
 
             # 计算目标价格区间
             current_price = 0
-            if "basic_info" in result and result["basic_info"]:
-                current_price = result["basic_info"].get("current_price", 0)
+            if basic_info:
+                current_price = basic_info.get("current_price", 0)
 
             if current_price > 0:
                 if predicted_trend == "up":
@@ -642,14 +277,9 @@ def analyze_stock(
 
             # 确定风险等级
             risk_level = "中等"
-            if "risk_assessment" in result and result["risk_assessment"]:
-                risk_level_map = {
-                    "low": "低",
-                    "medium": "中等",
-                    "high": "高"
-                }
-                risk_level = risk_level_map.get(
-                    result["risk_assessment"].get("overall_risk", "medium"),
+            if risk := result.get("risk_assessment"):
+                risk_level = _RISK_LEVEL_CN.get(
+                    risk.get("overall_risk", "medium"),
                     "中等"
                 )
 
@@ -681,6 +311,527 @@ def analyze_stock(
         raise CalculationError(f"分析{symbol}失败: {e}")
 
 
+# 批量分析输出的K线序列字段
+_BATCH_SERIES_COLS = ("close", "ma20", "ma60", "rsi6")
+
+
+def analyze_stocks(
+    symbols: List[str],
+    market: Literal["sh", "sz", "hk"] = "sh",
+    lookback_days: int = 250,
+    max_workers: int = _FETCH_MAX_WORKERS
+) -> Dict[str, np.ndarray]:
+    """
+    批量分析多只股票，按字段输出数组（每个字段一个数组，第一维为股票）
+
+    仅获取K线、基本面与资金流向三类数据，各股票的获取在线程池中并发执行，
+    趋势、风险等级与上涨概率在堆叠后的数组上一次计算；
+    各股票共用同一行情窗口，K线及技术指标以float32计算；
+    获取失败的数据源按缺失处理（序列为NaN）。
+
+    参数:
+        symbols: 股票代码列表
+        market: 市场类型
+        lookback_days: 回看天数
+        max_workers: 最大并发线程数
+
+    返回:
+        {
+            'symbols': (N,) 股票代码,
+            'close'/'ma20'/'ma60'/'rsi6': (N, T) float32，按最新交易日右对齐，不足T天的前部为NaN,
+            'trend': (N,) int8 趋势编码（1上升/-1下降/0震荡），_TREND_NAMES[code] 为分类字符串,
+            'risk': (N,) int8 综合风险等级，见 _RISK_LEVEL_NAMES,
+            'probability': (N,) float32 上涨概率,
+            'pe_ttm': (N,) float32 市盈率TTM,
+            'main_inflow_5d': (N,) float32 近5日主力净流入
+        }
+    """
+    start_date, end_date = _date_window(lookback_days, datetime.now())
+    logger.info(f"[analyze_stocks] 开始批量分析 {len(symbols)} 只股票")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            (
+                executor.submit(_fetch_technical_frame, symbol, market, start_date, end_date, np.float32),
+                executor.submit(_analyze_fundamental, symbol),
+                executor.submit(_analyze_fund_flow, symbol, market),
+            )
+            for symbol in symbols
+        ]
+        items = []
+        for symbol, (tech_future, fund_future, flow_future) in zip(symbols, futures):
+            df_tech, tech = _batch_result(symbol, "技术分析", tech_future, (None, {}))
+            items.append((
+                df_tech,
+                {
+                    "technical_analysis": tech,
+                    "fundamental_analysis": _batch_result(symbol, "基本面分析", fund_future, {}),
+                    "fund_flow_analysis": _batch_result(symbol, "资金流向分析", flow_future, {}),
+                },
+            ))
+
+    n = len(symbols)
+    t = max((len(df) for df, _ in items if df is not None), default=0)
+    series = {col: np.full((n, t), np.nan, dtype=np.float32) for col in _BATCH_SERIES_COLS}
+    for i, (df_tech, _) in enumerate(items):
+        if df_tech is None:
+            continue
+        for col in _BATCH_SERIES_COLS:
+            if col in df_tech.columns:
+                series[col][i, t - len(df_tech):] = df_tech[col].to_numpy(dtype=np.float32)
+
+    # 最新值按原始精度判断，与 analyze_stock 逐只判断一致
+    def latest(section: str, *keys: str) -> np.ndarray:
+        values = []
+        for _, result in items:
+            value = result[section]
+            for key in keys:
+                value = value.get(key, {}) if isinstance(value, dict) else None
+            values.append(value if isinstance(value, (int, float)) else np.nan)
+        return np.array(values, dtype=np.float64)
+
+    close = latest("technical_analysis", "current_price")
+    ma20 = latest("technical_analysis", "indicators", "ma20")
+    ma60 = latest("technical_analysis", "indicators", "ma60")
+    rsi = latest("technical_analysis", "indicators", "rsi6")
+    pe = latest("fundamental_analysis", "valuation", "pe_ttm")
+    main_inflow = latest("fund_flow_analysis", "main_inflow_5d")
+
+    # 缺少均线（NaN）时比较均为False，与逐只判断一样归为震荡整理
+    trend = _classify_trend_codes(close, ma20, ma60)
+
+    # 风险等级：波动率、估值、趋势三个维度（列），与 analyze_stock 的判断规则一致
+    levels = np.full((n, 3), _RISK_MEDIUM, dtype=np.int8)
+    levels[:, 0][(rsi > 80) | ((rsi < 20) & (rsi != 0))] = _RISK_HIGH
+    levels[:, 1][pe > 50] = _RISK_HIGH
+    levels[:, 1][(pe < 10) & (pe != 0)] = _RISK_LOW
+    levels[:, 2][trend == _TREND_CODE_DOWN] = _RISK_HIGH
+    levels[:, 2][trend == _TREND_CODE_UP] = _RISK_LOW
+
+    states = np.array([_encode_prediction_features(result) for _, result in items],
+                      dtype=np.int8).reshape(n, len(_PREDICTION_FEATURES))
+    probability = _prediction_score_batch(states, _PREDICTION_WEIGHTS)
+
+    logger.info(f"[analyze_stocks] 批量分析完成: {n} 只股票，{t} 个交易日")
+    return {
+        "symbols": np.array(symbols),
+        **series,
+        "trend": trend,
+        "risk": _combine_risk_levels(levels),
+        "probability": probability.astype(np.float32),
+        "pe_ttm": pe.astype(np.float32),
+        "main_inflow_5d": main_inflow.astype(np.float32),
+    }
+
+
+def _fetch_technical_frame(
+    symbol: str, market: str, start_date: str, end_date: str, dtype: Any = np.float64
+) -> Tuple[Optional[pd.DataFrame], Dict[str, Any]]:
+    """
+    获取K线并计算技术指标，返回 (指标K线, 技术分析汇总)；无K线数据时返回 (None, {})
+
+    dtype 为K线数值列及指标列的精度；批量分析使用float32以减半内存占用，
+    单只分析保持float64，使结果中的价格与指标不带单精度舍入误差
+    """
+    df_kline = fetch_market_data(
+        symbol=symbol,
+        period="daily",
+        start_date=start_date,
+        end_date=end_date,
+        market=market
+    )
+    if df_kline.empty:
+        return None, {}
+    # 只保留技术指标所需的列，其余行情字段（成交额、振幅、换手率等）不参与计算；
+    # 缺失的列补为NaN，数值列中无法解析的值（如 "-"）按NaN处理
+    df_kline = df_kline.reindex(columns=list(_KLINE_COLUMNS))
+    for col in _KLINE_COLUMNS[1:]:
+        df_kline[col] = pd.to_numeric(df_kline[col], errors="coerce").astype(dtype)
+    df_tech = calculate_technical_indicators(df_kline)
+    return df_tech, _summarize_technical(symbol, df_tech)
+
+
+def _batch_result(symbol: str, label: str, future: Future, default: Any) -> Any:
+    """取出批量分析中单个数据源的结果，失败时记录日志并返回默认值"""
+    error = future.exception()
+    if error is None:
+        return future.result()
+    logger.warning(f"[{symbol}] {label}失败: {error}")
+    return default
+
+
+# 风险等级编码（int8），写入结果时通过 _RISK_LEVEL_NAMES 转回字符串
+_RISK_LOW, _RISK_MEDIUM, _RISK_HIGH = 0, 1, 2
+_RISK_LEVEL_NAMES = ("low", "medium", "high")
+# 风险等级的中文描述（后市预测与报告共用）
+_RISK_LEVEL_CN = {"low": "低", "medium": "中等", "high": "高"}
+
+
+def _combine_risk_levels(levels: np.ndarray) -> np.ndarray:
+    """
+    综合各维度风险等级：两项及以上为高则高，两项及以上为低则低，否则中等
+
+    levels 最后一维为各风险维度，可为单只 (k,) 或批量 (N, k)
+    """
+    high_count = (levels == _RISK_HIGH).sum(axis=-1)
+    low_count = (levels == _RISK_LOW).sum(axis=-1)
+    return np.where(high_count >= 2, _RISK_HIGH,
+                    np.where(low_count >= 2, _RISK_LOW, _RISK_MEDIUM)).astype(np.int8)
+
+
+def _date_window(lookback_days: int, end: datetime) -> Tuple[str, str]:
+    """由截止时间和回看天数得到 (开始日期, 结束日期)，格式为YYYYMMDD"""
+    return (end - timedelta(days=lookback_days)).strftime("%Y%m%d"), end.strftime("%Y%m%d")
+
+
+def _collect_result(
+    result: Dict[str, Any],
+    symbol: str,
+    key: str,
+    label: str,
+    future: Future,
+    deadline: float,
+    on_error: Optional[Callable[[Exception], Dict[str, Any]]] = None
+) -> None:
+    """
+    取出单个数据源的并发结果写入result；失败或超时时记录日志，保留默认值或写入on_error给出的结果
+
+    key 须为 _RESULT_SECTIONS 中已预建的字段；通过 future.exception() 判断成败，
+    失败时不在此处重新抛出异常。deadline 为 time.monotonic() 下的截止时刻
+    """
+    try:
+        error = future.exception(timeout=max(deadline - time.monotonic(), 0))
+    except FuturesTimeoutError:
+        error = TimeoutError(f"{_FETCH_TIMEOUT}秒内未返回")
+    if error is None:
+        result[key] = future.result()
+        logger.info(f"[{symbol}] {label}完成")
+        return
+    logger.warning(f"[{symbol}] {label}失败: {error}")
+    if on_error is not None:
+        result[key] = on_error(error)
+
+
+def _fetch_basic_info(symbol: str, market: str) -> Dict[str, Any]:
+    """获取实时行情作为基本信息"""
+    realtime_data = fetch_realtime_quote(symbol=symbol, market=market)
+    return {
+        "symbol": symbol,
+        "name": realtime_data.get("name", ""),
+        "current_price": realtime_data.get("price", 0),
+        "change": realtime_data.get("change", 0),
+        "change_pct": realtime_data.get("change_pct", 0),
+        "volume": realtime_data.get("volume", 0),
+        "turnover": realtime_data.get("amount", 0),
+        "high": realtime_data.get("high", 0),
+        "low": realtime_data.get("low", 0),
+        "open": realtime_data.get("open", 0),
+        "pre_close": realtime_data.get("pre_close", 0)
+    }
+
+
+# 均线趋势分类结果
+_TREND_UP, _TREND_DOWN, _TREND_SIDEWAYS = "上升趋势", "下降趋势", "震荡整理"
+
+
+def _classify_trend(close: float, ma20: float, ma60: float) -> str:
+    """按价格与均线的多空排列判断单只股票的趋势（含NaN时为震荡整理）"""
+    if close > ma20 > ma60:
+        return _TREND_UP
+    if close < ma20 < ma60:
+        return _TREND_DOWN
+    return _TREND_SIDEWAYS
+
+
+# 趋势编码（int8）对应的分类字符串
+# 编码-1按负下标取到末尾的下降趋势
+_TREND_CODE_UP, _TREND_CODE_DOWN, _TREND_CODE_SIDEWAYS = 1, -1, 0
+_TREND_NAMES = (_TREND_SIDEWAYS, _TREND_UP, _TREND_DOWN)
+_TREND_CODES = {_TREND_UP: _TREND_CODE_UP, _TREND_DOWN: _TREND_CODE_DOWN, _TREND_SIDEWAYS: _TREND_CODE_SIDEWAYS}
+
+
+def _classify_trend_codes(close: np.ndarray, ma20: np.ndarray, ma60: np.ndarray) -> np.ndarray:
+    """一次比较判断多只股票的趋势，返回趋势编码（int8），_TREND_NAMES[code] 为分类字符串"""
+    close, ma20, ma60 = np.asarray(close), np.asarray(ma20), np.asarray(ma60)
+    return np.select(
+        [(close > ma20) & (ma20 > ma60), (close < ma20) & (ma20 < ma60)],
+        [_TREND_CODE_UP, _TREND_CODE_DOWN],
+        default=_TREND_CODE_SIDEWAYS,
+    ).astype(np.int8)
+
+
+def _classify_trend_vec(close: np.ndarray, ma20: np.ndarray, ma60: np.ndarray) -> np.ndarray:
+    """
+    _classify_trend 的向量化版本：一次比较判断多只股票的趋势
+
+    参数均为等长数组（每个元素对应一只股票的最新收盘价/MA20/MA60），
+    返回与输入等长的趋势分类字符串数组，逐元素结果与 _classify_trend 一致
+    """
+    return np.array(_TREND_NAMES)[_classify_trend_codes(close, ma20, ma60)]
+
+
+# 技术分析所需的K线列
+_KLINE_COLUMNS = ("date", "open", "high", "low", "close", "volume")
+
+# 技术分析结果中输出的最新指标
+_TECH_INDICATOR_KEYS = ("ma5", "ma10", "ma20", "ma60", "rsi6", "macd_hist")
+
+
+def _analyze_technical(symbol: str, market: str, start_date: str, end_date: str) -> Dict[str, Any]:
+    """获取历史K线并进行技术分析，无K线数据时返回空字典"""
+    return _fetch_technical_frame(symbol, market, start_date, end_date)[1]
+
+
+def _summarize_technical(symbol: str, df_tech: pd.DataFrame) -> Dict[str, Any]:
+    """由已计算指标的K线汇总交易信号、支撑压力位、趋势及最新指标"""
+    # 检测交易信号
+    signals = _TECH_ANALYZER.detect_signals(df_tech)
+
+    # 计算支撑压力位
+    sr_data = calculate_support_resistance(symbol, df_tech)
+
+    # 最新一日的全部指标一次取为字典，之后按键读取
+    last_row = df_tech.iloc[-1].to_dict()
+
+    # 趋势判断
+    current_price = last_row["close"]
+    ma20 = last_row.get("ma20", current_price)
+    ma60 = last_row.get("ma60", current_price)
+
+    trend = _classify_trend(current_price, ma20, ma60)
+
+    return {
+        "current_price": current_price,
+        "trend": trend,
+        "trend_code": _TREND_CODES[trend],
+        # 信号统一为字典，下游直接按字典读取
+        "signals": signals if isinstance(signals, dict) else {},
+        "support_resistance": sr_data,
+        "indicators": {key: last_row.get(key) for key in _TECH_INDICATOR_KEYS}
+    }
+
+
+def _analyze_fundamental(symbol: str) -> Dict[str, Any]:
+    """获取基本面数据并评价估值、盈利能力与成长性"""
+    fundamental_data = calculate_fundamental_indicators(symbol)
+
+    # 使用FundamentalAnalyzer进行分析
+    valuation_level = _FUND_ANALYZER.analyze_valuation(fundamental_data)
+    profitability_level = _FUND_ANALYZER.analyze_profitability(fundamental_data)
+    growth_level = _FUND_ANALYZER.analyze_growth(fundamental_data)
+
+    # 估值评价
+    if valuation_level == "undervalued":
+        valuation_desc = "低估值"
+    elif valuation_level == "overvalued":
+        valuation_desc = "高估值"
+    else:
+        valuation_desc = "合理估值"
+
+    return {
+        "valuation": fundamental_data.get("valuation", {}),
+        "profitability": fundamental_data.get("profitability", {}),
+        "growth": fundamental_data.get("growth", {}),
+        "quality": fundamental_data.get("quality", {}),
+        "analysis": {
+            "valuation_level": valuation_desc,
+            "profitability_level": profitability_level,
+            "growth_level": growth_level,
+        }
+    }
+
+
+def _analyze_fund_flow(symbol: str, market: str) -> Dict[str, Any]:
+    """获取近5日资金流向"""
+    capital_flow = fetch_capital_flow(symbol=symbol, market=market, days=5)
+    return {
+        "recent_flow": capital_flow,
+        "main_inflow_5d": capital_flow.get("main_inflow", 0),
+        "retail_inflow_5d": capital_flow.get("retail_inflow", 0),
+    }
+
+
+def _analyze_news(symbol: str, stock_name: str) -> Dict[str, Any]:
+    """获取个股新闻"""
+    news_data = fetch_stock_news(symbol=symbol, stock_name=stock_name, limit=10)
+    logger.info(f"[{symbol}] 获取到 {news_data.get('news_count', 0)} 条新闻")
+    return {
+        "news_count": news_data.get("news_count", 0),
+        "news_list": news_data.get("news_list", []),
+        "summary": news_data.get("summary", ""),
+        "fetch_time": news_data.get("fetch_time", "")
+    }
+
+
+def _news_error_result(e: Exception) -> Dict[str, Any]:
+    """新闻获取失败时的结果"""
+    return {
+        "news_count": 0,
+        "news_list": [],
+        "summary": "新闻获取失败",
+        "error": str(e)
+    }
+
+
+def _analyze_chip(symbol: str, current_price: Optional[float]) -> Dict[str, Any]:
+    """筹码分布分析"""
+    return analyze_chip_distribution(
+        symbol=symbol,
+        current_price=current_price,
+        adjust="qfq"
+    )
+
+
+def _chip_error_result(e: Exception) -> Dict[str, Any]:
+    """筹码分析失败时的结果"""
+    return {
+        "latest": {},
+        "trend": {},
+        "assessment": {
+            "chip_status": "unknown",
+            "summary": f"筹码分析失败: {e}"
+        },
+        "error": str(e)
+    }
+
+
+# 失败时需要写入说明性结果（而非保留空字典）的数据源
+_ERROR_RESULTS: Dict[str, Callable[[Exception], Dict[str, Any]]] = {
+    "news_analysis": _news_error_result,
+    "chip_analysis": _chip_error_result,
+}
+
+
+# 后市预测中按集合判断的信号及筹码状态
+_BUY_SIGNALS = frozenset({"buy", "strong_buy"})
+_SELL_SIGNALS = frozenset({"sell", "strong_sell"})
+_CONCENTRATED_STATUSES = frozenset({"highly_concentrated", "concentrated"})
+
+# 后市预测的打分特征，顺序即累加及 key_factors 的顺序
+# 每项为 (结果字段, 取值路径, 默认值, 状态1, 状态2)，状态为 (条件, 概率调整, 关键因素) 或None；
+# 结果字段为空时特征取状态0（无影响），否则依次判断状态1、状态2的条件
+_PREDICTION_FEATURES = (
+    # 技术面
+    ("technical_analysis", ("trend_code",), _TREND_CODE_SIDEWAYS,
+     (lambda v: v == _TREND_CODE_UP, 0.2, "技术趋势向上"),
+     (lambda v: v == _TREND_CODE_DOWN, -0.2, "技术趋势向下")),
+    ("technical_analysis", ("signals", "overall"), "neutral",
+     (lambda v: v in _BUY_SIGNALS, 0.15, "技术指标买入信号"),
+     (lambda v: v in _SELL_SIGNALS, -0.15, "技术指标卖出信号")),
+    # 基本面
+    ("fundamental_analysis", ("analysis", "profitability_level"), "moderate",
+     (lambda v: v == "strong", 0.1, "盈利能力强"), None),
+    ("fundamental_analysis", ("analysis", "growth_level"), "moderate",
+     (lambda v: v == "high", 0.1, "成长性高"), None),
+    ("fundamental_analysis", ("analysis", "valuation_level"), "合理估值",
+     (lambda v: "低估值" in v, 0.1, "估值偏低"),
+     (lambda v: "高估值" in v, -0.1, "估值偏高")),
+    # 资金流向
+    ("fund_flow_analysis", ("main_inflow_5d",), 0,
+     (lambda v: v > 0, 0.1, "主力资金净流入"),
+     (lambda v: v < 0, -0.1, "主力资金净流出")),
+    # 筹码面
+    ("chip_analysis", ("assessment", "chip_status"), "neutral",
+     (lambda v: v in _CONCENTRATED_STATUSES, 0.05, "筹码集中"),
+     (lambda v: v == "dispersed", -0.05, "筹码分散")),
+    ("chip_analysis", ("trend", "concentration_trend"), "stable",
+     (lambda v: v == "concentrating", 0.05, "筹码趋于集中"),
+     (lambda v: v == "dispersing", -0.05, "筹码趋于分散")),
+    ("chip_analysis", ("latest", "winner_rate"), 0.5,
+     (lambda v: v > 0.90, -0.05, "获利盘压力大"),
+     (lambda v: v < 0.10, 0.0, "套牢盘较重")),
+    # 主力行为推断
+    ("chip_analysis", ("trend", "institutional_signal"), "neutral",
+     (lambda v: v == "accumulating", 0.05, "筹码分析研判主力吸筹"),
+     (lambda v: v == "distributing", -0.05, "筹码分析研判主力派发")),
+    # === 新增数据源 ===
+    ("lhb_analysis", ("analysis", "institution_attitude"), "中性",
+     (lambda v: "净买入" in v, 0.05, "龙虎榜机构净买入"),
+     (lambda v: "净卖出" in v, -0.05, "龙虎榜机构净卖出")),
+    ("margin_analysis", ("analysis", "margin_trend"), "stable",
+     (lambda v: v == "increasing", 0.05, "融资余额增加（杠杆看多）"),
+     (lambda v: v == "decreasing", -0.05, "融资余额减少（杠杆看空）")),
+    ("northbound_analysis", ("analysis", "direction"), "neutral",
+     (lambda v: v == "inflow", 0.05, "北向资金净流入"),
+     (lambda v: v == "outflow", -0.05, "北向资金净流出")),
+    # 大宗交易：有成交记录时按平均折溢价率判断
+    ("block_trade_analysis", ("analysis",), {},
+     (lambda a: a.get("records_count", 0) > 0 and a.get("avg_premium", 0) > 0, 0.03, "大宗交易溢价成交"),
+     (lambda a: a.get("records_count", 0) > 0 and a.get("avg_premium", 0) < -5, -0.03, "大宗交易大幅折价")),
+    ("shareholder_analysis", ("analysis", "shareholder_trend"), "stable",
+     (lambda v: v == "decreasing", 0.05, "股东人数减少（筹码集中）"),
+     (lambda v: v == "increasing", -0.03, "股东人数增加（筹码分散）")),
+    ("restricted_shares_analysis", ("analysis", "pressure_level"), "low",
+     (lambda v: v == "high", -0.05, "近期有大额限售解禁"),
+     (lambda v: v == "medium", -0.02, "近期有限售解禁")),
+    ("institution_analysis", ("analysis", "holding_trend"), "stable",
+     (lambda v: v == "increasing", 0.05, "机构持仓增加"),
+     (lambda v: v == "decreasing", -0.03, "机构持仓减少")),
+)
+
+# (特征数, 3) 的概率调整表，按 [特征, 状态] 取值，状态0一律为0
+_PREDICTION_WEIGHTS = np.array(
+    [[0.0] + [option[1] if option else 0.0 for option in (first, second)]
+     for *_, first, second in _PREDICTION_FEATURES],
+    dtype=np.float64,
+)
+
+# 与 _PREDICTION_WEIGHTS 对应的关键因素文本，状态0为None
+_PREDICTION_FACTORS = tuple(
+    (None,) + tuple(option[2] if option else None for option in (first, second))
+    for *_, first, second in _PREDICTION_FEATURES
+)
+
+
+def _encode_prediction_features(result: Dict[str, Any]) -> np.ndarray:
+    """将各分析结果按 _PREDICTION_FEATURES 编码为后市预测的特征状态向量（int8，取值0/1/2）"""
+    states = np.zeros(len(_PREDICTION_FEATURES), dtype=np.int8)
+    for f, (section, path, default, *options) in enumerate(_PREDICTION_FEATURES):
+        data = result.get(section)
+        if not data:
+            continue
+        for key in path[:-1]:
+            data = data.get(key, {})
+        value = data.get(path[-1], default)
+        for state, option in enumerate(options, 1):
+            if option is not None and option[0](value):
+                states[f] = state
+                break
+    return states
+
+
+@jit_compile(cache=True)
+def _prediction_score_kernel(states, weights):
+    """
+    后市预测打分内核（numba可用时编译执行）
+
+    从0.5起按特征顺序逐项累加 weights[特征, 状态]，累加顺序与逐条判断一致，
+    状态0的项加0.0不改变结果。
+    """
+    total = 0.5
+    for f in range(states.shape[0]):
+        total += weights[f, states[f]]
+    return total
+
+
+@jit_compile(cache=True)
+def _prediction_score_batch(states, weights):
+    """对 (股票数, 特征数) 的状态矩阵逐行打分，结果与 _prediction_score_kernel 逐只计算一致"""
+    n = states.shape[0]
+    out = np.empty(n)
+    for i in range(n):
+        total = 0.5
+        for f in range(states.shape[1]):
+            total += weights[f, states[i, f]]
+        out[i] = total
+    return out
+
+
+def _prediction_key_factors(states: np.ndarray) -> List[str]:
+    """按特征顺序取出生效状态对应的关键因素文本"""
+    return [_PREDICTION_FACTORS[f][state] for f, state in enumerate(states.tolist()) if state]
+
+
 def _get_prediction_recommendation(trend: str, probability: float, risk_level: str) -> str:
     """获取预测建议"""
     if trend == "up":
@@ -703,6 +854,298 @@ def _get_prediction_recommendation(trend: str, probability: float, risk_level: s
         return "建议观望，等待趋势明朗"
 
 
+# 报告分隔线
+_REPORT_RULE = "-" * 60
+_REPORT_DOUBLE_RULE = "=" * 60
+
+# 报告中固定版式的段落模板，缺失字段由 _report_fields 填充为'N/A'
+_REPORT_HEADER_TEMPLATE = f"""\
+{_REPORT_DOUBLE_RULE}
+                {{symbol}} ({{name}}) 综合分析报告
+{_REPORT_DOUBLE_RULE}
+
+【当前价格】{{current_price}} 元
+【涨跌幅度】{{change}} ({{change_pct}}%)
+【成交量】{{volume:,}}"""
+
+_FUNDAMENTAL_TEMPLATE = """\
+估值水平：{valuation_level}
+  PE(TTM): {pe_ttm}
+  PB: {pb}
+  ROE: {roe}%
+
+盈利能力：{profitability_level}
+  净利率: {net_margin}%
+
+成长性：{growth_level}
+  营收增长率: {revenue_growth}%
+  利润增长率: {profit_growth}%
+
+财务质量：
+  资产负债率: {debt_ratio}%"""
+
+_FUND_FLOW_TEMPLATE = """\
+近5日主力资金净流入：{main_inflow:.2f} 万元
+近5日散户资金净流入：{retail_inflow:.2f} 万元"""
+
+_CHIP_OVERVIEW_TEMPLATE = """\
+数据日期：{date}
+
+筹码概况：
+  获利比例：{winner_pct:.2f}%
+  平均成本：{average_cost} 元
+
+筹码集中度：
+  90%成本区间：{cost_90_low} - {cost_90_high} 元（集中度 {concentration_90_pct:.2f}%）
+  70%成本区间：{cost_70_low} - {cost_70_high} 元（集中度 {concentration_70_pct:.2f}%）"""
+
+_RISK_TEMPLATE = """\
+综合风险等级：{risk_cn}
+
+各项风险：
+  波动风险：{volatility_risk}
+  流动性风险：{liquidity_risk}
+  基本面风险：{fundamental_risk}"""
+
+_PREDICTION_TEMPLATE = """\
+预测趋势：{trend_cn}
+概率：{probability_pct:.0f}%
+
+目标价格区间：
+  上限：{target_price_high} 元
+  下限：{target_price_low} 元
+
+时间周期：{time_horizon}
+风险等级：{risk_level}"""
+
+_REPORT_FOOTER_TEMPLATE = f"""
+{_REPORT_DOUBLE_RULE}
+报告生成时间：{{generated_at}}
+{_REPORT_DOUBLE_RULE}"""
+
+# 筹码趋势的中文描述
+_CONC_TREND_CN = {"concentrating": "趋于集中", "dispersing": "趋于分散", "stable": "保持稳定"}
+_COST_TREND_CN = {"rising": "上移", "falling": "下移", "stable": "稳定"}
+
+# 新增数据源章节中趋势、方向等取值的中文描述
+_MARGIN_TREND_CN = {"increasing": "融资余额增加（看多）", "decreasing": "融资余额减少（看空）", "stable": "融资余额稳定"}
+_NB_DIRECTION_CN = {"inflow": "净流入", "outflow": "净流出", "neutral": "中性"}
+_SHAREHOLDER_TREND_CN = {"decreasing": "股东减少（筹码集中）", "increasing": "股东增加（筹码分散）", "stable": "股东人数稳定"}
+_INSTITUTION_TREND_CN = {"increasing": "机构增持", "decreasing": "机构减持", "stable": "持仓稳定"}
+_RS_PRESSURE_CN = {"high": "高（大额解禁）", "medium": "中等", "low": "低"}
+
+# 技术面章节输出的指标 (键, 显示名)
+_REPORT_INDICATORS = (("ma5", "MA5"), ("ma20", "MA20"), ("rsi6", "RSI6"))
+
+
+def _report_fields(data: Dict[str, Any], keys: Tuple[str, ...]) -> Dict[str, Any]:
+    """取出模板所需字段，缺失时为'N/A'"""
+    return {key: data.get(key, "N/A") for key in keys}
+
+
+# 章节标题固定为16个，每个只拼接一次
+@lru_cache(maxsize=None)
+def _report_section(title: str) -> str:
+    """章节标题（前置空行，上下分隔线）"""
+    return f"\n{_REPORT_RULE}\n{title}\n{_REPORT_RULE}"
+
+
+def _report_lhb(analysis_result: Dict[str, Any]) -> Optional[str]:
+    """六、龙虎榜"""
+    lhb = analysis_result.get("lhb_analysis", {})
+    lhb_records = lhb.get("records", [])
+    if not lhb_records:
+        return None
+
+    lhb_inst = lhb.get("institution_summary", {})
+    lhb_a = lhb.get("analysis", {})
+    parts = [f"近期上榜次数：{len(lhb_records)} 次\n"
+             f"机构态度：{lhb_a.get('institution_attitude', '中性')}"]
+    if lhb_inst:
+        parts.append(f"  机构买入总额：{lhb_inst.get('total_buy', 0):.2f} 万元\n"
+                     f"  机构卖出总额：{lhb_inst.get('total_sell', 0):.2f} 万元\n"
+                     f"  机构净买入：{lhb_inst.get('net_buy', 0):.2f} 万元")
+    parts.append("")
+    parts.extend(
+        f"  {i}. [{rec.get('date','')}] {rec.get('reason','')}\n"
+        f"     净买入 {rec.get('net_buy',0):.2f}万 | 上榜后1日 {rec.get('after_1d',0):.2f}% | 5日 {rec.get('after_5d',0):.2f}%"
+        for i, rec in enumerate(lhb_records[:3], 1)
+    )
+    if len(lhb_records) > 3:
+        parts.append(f"  ... 还有 {len(lhb_records)-3} 条记录")
+    parts.append(f"综合：{lhb_a.get('summary', '')}")
+    return "\n".join(parts)
+
+
+def _report_margin(analysis_result: Dict[str, Any]) -> Optional[str]:
+    """七、融资融券"""
+    margin = analysis_result.get("margin_analysis", {})
+    margin_latest = margin.get("latest", {})
+    if not margin_latest:
+        return None
+
+    margin_a = margin.get("analysis", {})
+    margin_trend = margin_a.get("margin_trend", "stable")
+    return (f"融资余额：{margin_latest.get('margin_balance', 'N/A')} 元\n"
+            f"融券余额：{margin_latest.get('short_balance', 'N/A')} 元\n"
+            f"融资买入额：{margin_latest.get('margin_buy', 'N/A')} 元\n"
+            f"趋势：{_MARGIN_TREND_CN.get(margin_trend, '稳定')}\n"
+            f"综合：{margin_a.get('summary', '')}")
+
+
+def _report_northbound(analysis_result: Dict[str, Any]) -> Optional[str]:
+    """八、北向资金"""
+    nb = analysis_result.get("northbound_analysis", {})
+    nb_a = nb.get("analysis", {})
+    nb_holding = nb.get("holding", {})
+    if not (nb_holding or nb_a):
+        return None
+
+    parts = []
+    if nb_holding:
+        parts.append(f"北向持股数量：{nb_holding.get('shares', 'N/A')}\n"
+                     f"北向持股市值：{nb_holding.get('market_value', 'N/A')}\n"
+                     f"占流通股比：{nb_holding.get('ratio', 'N/A')}")
+    nb_dir = nb_a.get("direction", "neutral")
+    parts.append(f"资金方向：{_NB_DIRECTION_CN.get(nb_dir, '中性')}\n"
+                 f"综合：{nb_a.get('summary', '')}")
+    return "\n".join(parts)
+
+
+def _report_block_trade(analysis_result: Dict[str, Any]) -> Optional[str]:
+    """九、大宗交易"""
+    bt = analysis_result.get("block_trade_analysis", {})
+    bt_records = bt.get("records", [])
+    if not bt_records:
+        return None
+
+    bt_a = bt.get("analysis", {})
+    parts = [f"近期大宗交易：{bt_a.get('records_count', len(bt_records))} 笔\n"
+             f"平均折溢价率：{bt_a.get('avg_premium', 0):.2f}%\n"
+             f"总成交金额：{bt_a.get('total_amount', 0):.2f} 万元\n"]
+    parts.extend(
+        f"  {i}. [{rec.get('date','')}] 成交价 {rec.get('price','N/A')} 元 | 折溢价 {rec.get('premium',0):.2f}%"
+        for i, rec in enumerate(bt_records[:3], 1)
+    )
+    if len(bt_records) > 3:
+        parts.append(f"  ... 还有 {len(bt_records)-3} 笔")
+    parts.append(f"综合：{bt_a.get('summary', '')}")
+    return "\n".join(parts)
+
+
+def _report_shareholder(analysis_result: Dict[str, Any]) -> Optional[str]:
+    """十、股东人数变化"""
+    sh = analysis_result.get("shareholder_analysis", {})
+    sh_latest = sh.get("latest", {})
+    if not sh_latest:
+        return None
+
+    sh_a = sh.get("analysis", {})
+    sh_trend = sh_a.get("shareholder_trend", "stable")
+    return (f"最新股东户数：{sh_latest.get('holder_count', 'N/A')} 户\n"
+            f"户均持股：{sh_latest.get('avg_holding', 'N/A')} 股\n"
+            f"较上期变化：{sh_latest.get('change_pct', 'N/A')}%\n"
+            f"趋势：{_SHAREHOLDER_TREND_CN.get(sh_trend, '稳定')}\n"
+            f"综合：{sh_a.get('summary', '')}")
+
+
+def _report_institution(analysis_result: Dict[str, Any]) -> Optional[str]:
+    """十一、机构持仓"""
+    inst = analysis_result.get("institution_analysis", {})
+    inst_holdings = inst.get("holdings", [])
+    if not inst_holdings:
+        return None
+
+    inst_a = inst.get("analysis", {})
+    inst_trend = inst_a.get("holding_trend", "stable")
+    parts = [f"持仓机构数：{len(inst_holdings)}\n"
+             f"趋势：{_INSTITUTION_TREND_CN.get(inst_trend, '稳定')}"]
+    parts.extend(
+        f"  {i}. {h.get('name', 'N/A')} | 持股 {h.get('shares', 'N/A')} | 占比 {h.get('ratio', 'N/A')}%"
+        for i, h in enumerate(inst_holdings[:5], 1)
+    )
+    if len(inst_holdings) > 5:
+        parts.append(f"  ... 还有 {len(inst_holdings)-5} 家机构")
+    parts.append(f"综合：{inst_a.get('summary', '')}")
+    return "\n".join(parts)
+
+
+def _report_restricted_shares(analysis_result: Dict[str, Any]) -> Optional[str]:
+    """十二、限售解禁"""
+    rs = analysis_result.get("restricted_shares_analysis", {})
+    rs_upcoming = rs.get("upcoming", [])
+    if not rs_upcoming:
+        return None
+
+    rs_a = rs.get("analysis", {})
+    rs_pressure = rs_a.get("pressure_level", "low")
+    parts = [f"近期解禁批次：{len(rs_upcoming)}\n"
+             f"解禁压力：{_RS_PRESSURE_CN.get(rs_pressure, '低')}"]
+    parts.extend(
+        f"  {i}. [{item.get('date','')}] 解禁数量 {item.get('shares','N/A')} 股 | 市值 {item.get('market_value','N/A')}"
+        for i, item in enumerate(rs_upcoming[:3], 1)
+    )
+    parts.append(f"综合：{rs_a.get('summary', '')}")
+    return "\n".join(parts)
+
+
+def _report_industry_compare(analysis_result: Dict[str, Any]) -> Optional[str]:
+    """十三、行业对比"""
+    ind = analysis_result.get("industry_compare_analysis", {})
+    if not ind.get("industry_name"):
+        return None
+
+    ind_a = ind.get("analysis", {})
+    return (f"所属行业：{ind.get('industry_name', 'N/A')}\n"
+            f"行业排名：{ind_a.get('rank_desc', 'N/A')}\n"
+            f"行业平均PE：{ind_a.get('industry_avg_pe', 'N/A')}\n"
+            f"综合：{ind_a.get('summary', '')}")
+
+
+def _report_dividend(analysis_result: Dict[str, Any]) -> Optional[str]:
+    """十四、分红送转"""
+    div = analysis_result.get("dividend_analysis", {})
+    div_records = div.get("records", [])
+    if not div_records:
+        return None
+
+    div_a = div.get("analysis", {})
+    parts = [f"分红记录：{len(div_records)} 次\n"
+             f"股息率：{div_a.get('dividend_yield', 'N/A')}%\n"
+             f"分红稳定性：{div_a.get('stability', 'N/A')}"]
+    parts.extend(
+        f"  {i}. [{rec.get('year','')}] {rec.get('plan', 'N/A')}"
+        for i, rec in enumerate(div_records[:3], 1)
+    )
+    if len(div_records) > 3:
+        parts.append(f"  ... 还有 {len(div_records)-3} 条记录")
+    parts.append(f"综合：{div_a.get('summary', '')}")
+    return "\n".join(parts)
+
+
+def _report_news_item(index: int, item: Dict[str, Any]) -> str:
+    """单条新闻：标题行、摘要行（有摘要时）及其后的空行"""
+    time_str = f"[{item.get('time', '')}] " if item.get('time') else ""
+    if item.get('summary'):
+        return f"{index}. {time_str}{item.get('title', '')}\n   {item.get('summary', '')[:80]}...\n\n"
+    return f"{index}. {time_str}{item.get('title', '')}\n\n"
+
+
+# 新增9大数据源的报告章节，按输出顺序排列：(标题, 正文生成函数, 无数据时的正文)。
+# 正文生成函数在无数据时直接返回None，不再取其余字段、拼接正文
+_ADDON_REPORT_SECTIONS = (
+    (_report_section("【六、龙虎榜分析】"), _report_lhb, "近期未上龙虎榜"),
+    (_report_section("【七、融资融券分析】"), _report_margin, "暂无融资融券数据（可能非两融标的）"),
+    (_report_section("【八、北向资金分析】"), _report_northbound, "暂无北向资金数据"),
+    (_report_section("【九、大宗交易分析】"), _report_block_trade, "近期无大宗交易"),
+    (_report_section("【十、股东人数变化】"), _report_shareholder, "暂无股东人数数据"),
+    (_report_section("【十一、机构持仓分析】"), _report_institution, "暂无机构持仓数据"),
+    (_report_section("【十二、限售解禁】"), _report_restricted_shares, "近期无限售解禁"),
+    (_report_section("【十三、行业对比】"), _report_industry_compare, "暂无行业对比数据"),
+    (_report_section("【十四、分红送转历史】"), _report_dividend, "暂无分红送转记录"),
+)
+
+
 class StockAnalyzer:
     """
     股票综合分析器类
@@ -712,7 +1155,8 @@ class StockAnalyzer:
 
     def __init__(self):
         self.logger = get_logger(self.__class__.__name__)
-        self.fundamental_analyzer = FundamentalAnalyzer()
+        self.technical_analyzer = _TECH_ANALYZER
+        self.fundamental_analyzer = _FUND_ANALYZER
 
     def analyze(self, symbol: str, **kwargs) -> Dict[str, Any]:
         """执行分析"""
@@ -738,407 +1182,150 @@ class StockAnalyzer:
         risk = analysis_result.get("risk_assessment", {})
         prediction = analysis_result.get("prediction", {})
 
-        lines = [
-            f"=" * 60,
-            f"                {symbol} ({basic_info.get('name', '')}) 综合分析报告",
-            f"=" * 60,
-            "",
-            f"【当前价格】{basic_info.get('current_price', 'N/A')} 元",
-            f"【涨跌幅度】{basic_info.get('change', 'N/A')} ({basic_info.get('change_pct', 'N/A')}%)",
-            f"【成交量】{basic_info.get('volume', 'N/A'):,}",
-            "",
-            "-" * 60,
-            "【一、技术面分析】",
-            "-" * 60,
-        ]
+        # 各段文本依次写入缓冲区，每段后接换行（页脚除外）
+        out = io.StringIO()
+        add = partial(print, file=out)
+
+        add(_REPORT_HEADER_TEMPLATE.format_map({
+            "symbol": symbol,
+            "name": basic_info.get("name", ""),
+            **_report_fields(basic_info, ("current_price", "change", "change_pct", "volume")),
+        }))
+        add(_report_section("【一、技术面分析】"))
 
         if technical:
-            lines.extend([
-                f"趋势判断：{technical.get('trend', 'N/A')}",
-                f"",
-                f"主要技术指标：",
-            ])
+            add(f"趋势判断：{technical.get('trend', 'N/A')}\n\n主要技术指标：")
 
             indicators = technical.get("indicators", {})
             if indicators:
-                if indicators.get("ma5"):
-                    lines.append(f"  MA5: {indicators['ma5']:.2f}")
-                if indicators.get("ma20"):
-                    lines.append(f"  MA20: {indicators['ma20']:.2f}")
-                if indicators.get("rsi6"):
-                    lines.append(f"  RSI6: {indicators['rsi6']:.2f}")
+                out.writelines(
+                    f"  {label}: {indicators[key]:.2f}\n"
+                    for key, label in _REPORT_INDICATORS if indicators.get(key)
+                )
 
             signals = technical.get("signals", {})
-            if signals and isinstance(signals, dict):
-                lines.append(f"")
-                lines.append(f"交易信号：")
-                for signal_name, signal_value in signals.items():
-                    if signal_value and signal_value != "none":
-                        lines.append(f"  {signal_name}: {signal_value}")
-
-        lines.extend([
-            "",
-            "-" * 60,
-            "【二、基本面分析】",
-            "-" * 60,
-        ])
+            # 调用方自行构造的结果中 signals 可能不是字典，此时跳过该段
+            if isinstance(signals, dict) and signals:
+                add("\n交易信号：")
+                out.writelines(
+                    f"  {signal_name}: {signal_value}\n"
+                    for signal_name, signal_value in signals.items()
+                    if signal_value and signal_value != "none"
+                )
+
+        add(_report_section("【二、基本面分析】"))
 
         if fundamental:
-            valuation = fundamental.get("valuation", {})
-            profitability = fundamental.get("profitability", {})
-            growth = fundamental.get("growth", {})
-            quality = fundamental.get("quality", {})
-            analysis = fundamental.get("analysis", {})
-
-            lines.extend([
-                f"估值水平：{analysis.get('valuation_level', 'N/A')}",
-                f"  PE(TTM): {valuation.get('pe_ttm', 'N/A')}",
-                f"  PB: {valuation.get('pb', 'N/A')}",
-                f"  ROE: {valuation.get('roe', 'N/A')}%",
-                f"",
-                f"盈利能力：{analysis.get('profitability_level', 'N/A')}",
-                f"  净利率: {profitability.get('net_margin', 'N/A')}%",
-                f"",
-                f"成长性：{analysis.get('growth_level', 'N/A')}",
-                f"  营收增长率: {growth.get('revenue_growth', 'N/A')}%",
-                f"  利润增长率: {growth.get('profit_growth', 'N/A')}%",
-                f"",
-                f"财务质量：",
-                f"  资产负债率: {quality.get('debt_ratio', 'N/A')}%",
-            ])
-
-        lines.extend([
-            "",
-            "-" * 60,
-            "【三、资金流向分析】",
-            "-" * 60,
-        ])
+            add(_FUNDAMENTAL_TEMPLATE.format_map({
+                **_report_fields(fundamental.get("analysis", {}),
+                                 ("valuation_level", "profitability_level", "growth_level")),
+                **_report_fields(fundamental.get("valuation", {}), ("pe_ttm", "pb", "roe")),
+                **_report_fields(fundamental.get("profitability", {}), ("net_margin",)),
+                **_report_fields(fundamental.get("growth", {}), ("revenue_growth", "profit_growth")),
+                **_report_fields(fundamental.get("quality", {}), ("debt_ratio",)),
+            }))
+
+        add(_report_section("【三、资金流向分析】"))
 
         if fund_flow:
             main_inflow = fund_flow.get("main_inflow_5d", 0)
             retail_inflow = fund_flow.get("retail_inflow_5d", 0)
 
-            lines.extend([
-                f"近5日主力资金净流入：{main_inflow:.2f} 万元",
-                f"近5日散户资金净流入：{retail_inflow:.2f} 万元",
-            ])
+            add(_FUND_FLOW_TEMPLATE.format(main_inflow=main_inflow, retail_inflow=retail_inflow))
 
             if main_inflow > 0:
-                lines.append("资金面相符：主力资金持续流入")
+                add("资金面相符：主力资金持续流入")
             elif main_inflow < 0:
-                lines.append("资金面警示：主力资金持续流出")
+                add("资金面警示：主力资金持续流出")
 
-        lines.extend([
-            "",
-            "-" * 60,
-            "【四、新闻面分析】",
-            "-" * 60,
-        ])
+        add(_report_section("【四、新闻面分析】"))
 
         if news and news.get("news_count", 0) > 0:
-            lines.append(f"近期相关新闻：{news.get('news_count', 0)} 条")
-            lines.append("")
-            
+            add(f"近期相关新闻：{news.get('news_count', 0)} 条\n")
+
             news_list = news.get("news_list", [])
-            for i, item in enumerate(news_list[:5], 1):  # 只显示前5条
-                time_str = f"[{item.get('time', '')}] " if item.get('time') else ""
-                lines.append(f"{i}. {time_str}{item.get('title', '')}")
-                if item.get('summary'):
-                    lines.append(f"   {item.get('summary', '')[:80]}...")
-                lines.append("")
-            
+            # 只显示前5条，每条整段写入
+            out.writelines(_report_news_item(i, item) for i, item in enumerate(news_list[:5], 1))
+
             if len(news_list) > 5:
-                lines.append(f"... 还有 {len(news_list) - 5} 条新闻")
+                add(f"... 还有 {len(news_list) - 5} 条新闻")
         else:
-            lines.append("暂无相关新闻或新闻获取失败")
+            add("暂无相关新闻或新闻获取失败")
 
-        lines.extend([
-            "",
-            "-" * 60,
-            "【五、筹码分布分析】",
-            "-" * 60,
-        ])
+        add(_report_section("【五、筹码分布分析】"))
 
         if chip and chip.get("latest"):
             chip_latest = chip.get("latest", {})
             chip_trend = chip.get("trend", {})
             chip_assessment = chip.get("assessment", {})
 
-            lines.extend([
-                f"数据日期：{chip_latest.get('date', 'N/A')}",
-                f"",
-                f"筹码概况：",
-                f"  获利比例：{chip_latest.get('winner_rate', 0)*100:.2f}%",
-                f"  平均成本：{chip_latest.get('average_cost', 'N/A')} 元",
-                f"",
-                f"筹码集中度：",
-                f"  90%成本区间：{chip_latest.get('cost_90_low', 'N/A')} - {chip_latest.get('cost_90_high', 'N/A')} 元（集中度 {chip_latest.get('concentration_90', 0)*100:.2f}%）",
-                f"  70%成本区间：{chip_latest.get('cost_70_low', 'N/A')} - {chip_latest.get('cost_70_high', 'N/A')} 元（集中度 {chip_latest.get('concentration_70', 0)*100:.2f}%）",
-            ])
+            add(_CHIP_OVERVIEW_TEMPLATE.format_map({
+                **_report_fields(chip_latest, ("date", "average_cost", "cost_90_low", "cost_90_high",
+                                               "cost_70_low", "cost_70_high")),
+                "winner_pct": chip_latest.get("winner_rate", 0) * 100,
+                "concentration_90_pct": chip_latest.get("concentration_90", 0) * 100,
+                "concentration_70_pct": chip_latest.get("concentration_70", 0) * 100,
+            }))
 
             # 趋势信息
             if chip_trend:
-                conc_trend_map = {
-                    "concentrating": "趋于集中",
-                    "dispersing": "趋于分散",
-                    "stable": "保持稳定"
-                }
-                cost_trend_map = {
-                    "rising": "上移",
-                    "falling": "下移",
-                    "stable": "稳定"
-                }
-                lines.extend([
-                    f"",
-                    f"筹码趋势：",
-                    f"  集中度变化：{conc_trend_map.get(chip_trend.get('concentration_trend', 'stable'), '稳定')}",
-                    f"  成本中心：{cost_trend_map.get(chip_trend.get('cost_center_trend', 'stable'), '稳定')}",
-                ])
+                conc_trend = chip_trend.get("concentration_trend", "stable")
+                cost_trend = chip_trend.get("cost_center_trend", "stable")
+                add(f"\n筹码趋势：\n"
+                    f"  集中度变化：{_CONC_TREND_CN.get(conc_trend, '稳定')}\n"
+                    f"  成本中心：{_COST_TREND_CN.get(cost_trend, '稳定')}")
 
             # 综合评估
             if chip_assessment:
-                lines.extend([
-                    f"",
-                    f"筹码评估：{chip_assessment.get('summary', 'N/A')}",
-                ])
-                chip_signals = chip_assessment.get("signals", [])
-                if chip_signals:
-                    for signal in chip_signals:
-                        lines.append(f"  - {signal}")
+                add(f"\n筹码评估：{chip_assessment.get('summary', 'N/A')}")
+                out.writelines(f"  - {signal}\n" for signal in chip_assessment.get("signals") or [])
         elif chip and chip.get("error"):
-            lines.append(f"筹码数据获取失败: {chip.get('error', '未知错误')}")
-        else:
-            lines.append("暂无筹码分布数据")
-
-        # === 新增9大数据源报告章节 ===
-
-        # 六、龙虎榜
-        lhb = analysis_result.get("lhb_analysis", {})
-        lines.extend(["", "-" * 60, "【六、龙虎榜分析】", "-" * 60])
-        lhb_records = lhb.get("records", [])
-        lhb_inst = lhb.get("institution_summary", {})
-        lhb_a = lhb.get("analysis", {})
-        if lhb_records:
-            lines.append(f"近期上榜次数：{len(lhb_records)} 次")
-            lines.append(f"机构态度：{lhb_a.get('institution_attitude', '中性')}")
-            if lhb_inst:
-                lines.append(f"  机构买入总额：{lhb_inst.get('total_buy', 0):.2f} 万元")
-                lines.append(f"  机构卖出总额：{lhb_inst.get('total_sell', 0):.2f} 万元")
-                lines.append(f"  机构净买入：{lhb_inst.get('net_buy', 0):.2f} 万元")
-            lines.append("")
-            for i, rec in enumerate(lhb_records[:3], 1):
-                lines.append(f"  {i}. [{rec.get('date','')}] {rec.get('reason','')}")
-                lines.append(f"     净买入 {rec.get('net_buy',0):.2f}万 | 上榜后1日 {rec.get('after_1d',0):.2f}% | 5日 {rec.get('after_5d',0):.2f}%")
-            if len(lhb_records) > 3:
-                lines.append(f"  ... 还有 {len(lhb_records)-3} 条记录")
-            lines.append(f"综合：{lhb_a.get('summary', '')}")
-        else:
-            lines.append("近期未上龙虎榜")
-
-        # 七、融资融券
-        margin = analysis_result.get("margin_analysis", {})
-        lines.extend(["", "-" * 60, "【七、融资融券分析】", "-" * 60])
-        margin_a = margin.get("analysis", {})
-        margin_latest = margin.get("latest", {})
-        if margin_latest:
-            lines.append(f"融资余额：{margin_latest.get('margin_balance', 'N/A')} 元")
-            lines.append(f"融券余额：{margin_latest.get('short_balance', 'N/A')} 元")
-            lines.append(f"融资买入额：{margin_latest.get('margin_buy', 'N/A')} 元")
-            margin_trend = margin_a.get("margin_trend", "stable")
-            trend_map = {"increasing": "融资余额增加（看多）", "decreasing": "融资余额减少（看空）", "stable": "融资余额稳定"}
-            lines.append(f"趋势：{trend_map.get(margin_trend, '稳定')}")
-            lines.append(f"综合：{margin_a.get('summary', '')}")
-        else:
-            lines.append("暂无融资融券数据（可能非两融标的）")
-
-        # 八、北向资金
-        nb = analysis_result.get("northbound_analysis", {})
-        lines.extend(["", "-" * 60, "【八、北向资金分析】", "-" * 60])
-        nb_a = nb.get("analysis", {})
-        nb_holding = nb.get("holding", {})
-        if nb_holding or nb_a:
-            if nb_holding:
-                lines.append(f"北向持股数量：{nb_holding.get('shares', 'N/A')}")
-                lines.append(f"北向持股市值：{nb_holding.get('market_value', 'N/A')}")
-                lines.append(f"占流通股比：{nb_holding.get('ratio', 'N/A')}")
-            nb_dir = nb_a.get("direction", "neutral")
-            dir_map = {"inflow": "净流入", "outflow": "净流出", "neutral": "中性"}
-            lines.append(f"资金方向：{dir_map.get(nb_dir, '中性')}")
-            lines.append(f"综合：{nb_a.get('summary', '')}")
-        else:
-            lines.append("暂无北向资金数据")
-
-        # 九、大宗交易
-        bt = analysis_result.get("block_trade_analysis", {})
-        lines.extend(["", "-" * 60, "【九、大宗交易分析】", "-" * 60])
-        bt_a = bt.get("analysis", {})
-        bt_records = bt.get("records", [])
-        if bt_records:
-            lines.append(f"近期大宗交易：{bt_a.get('records_count', len(bt_records))} 笔")
-            lines.append(f"平均折溢价率：{bt_a.get('avg_premium', 0):.2f}%")
-            lines.append(f"总成交金额：{bt_a.get('total_amount', 0):.2f} 万元")
-            lines.append("")
-            for i, rec in enumerate(bt_records[:3], 1):
-                lines.append(f"  {i}. [{rec.get('date','')}] 成交价 {rec.get('price','N/A')} 元 | 折溢价 {rec.get('premium',0):.2f}%")
-            if len(bt_records) > 3:
-                lines.append(f"  ... 还有 {len(bt_records)-3} 笔")
-            lines.append(f"综合：{bt_a.get('summary', '')}")
+            add(f"筹码数据获取失败: {chip.get('error', '未知错误')}")
         else:
-            lines.append("近期无大宗交易")
-
-        # 十、股东人数变化
-        sh = analysis_result.get("shareholder_analysis", {})
-        lines.extend(["", "-" * 60, "【十、股东人数变化】", "-" * 60])
-        sh_a = sh.get("analysis", {})
-        sh_latest = sh.get("latest", {})
-        if sh_latest:
-            lines.append(f"最新股东户数：{sh_latest.get('holder_count', 'N/A')} 户")
-            lines.append(f"户均持股：{sh_latest.get('avg_holding', 'N/A')} 股")
-            lines.append(f"较上期变化：{sh_latest.get('change_pct', 'N/A')}%")
-            sh_trend = sh_a.get("shareholder_trend", "stable")
-            trend_map = {"decreasing": "股东减少（筹码集中）", "increasing": "股东增加（筹码分散）", "stable": "股东人数稳定"}
-            lines.append(f"趋势：{trend_map.get(sh_trend, '稳定')}")
-            lines.append(f"综合：{sh_a.get('summary', '')}")
-        else:
-            lines.append("暂无股东人数数据")
-
-        # 十一、机构持仓
-        inst = analysis_result.get("institution_analysis", {})
-        lines.extend(["", "-" * 60, "【十一、机构持仓分析】", "-" * 60])
-        inst_a = inst.get("analysis", {})
-        inst_holdings = inst.get("holdings", [])
-        if inst_holdings:
-            lines.append(f"持仓机构数：{len(inst_holdings)}")
-            inst_trend = inst_a.get("holding_trend", "stable")
-            trend_map = {"increasing": "机构增持", "decreasing": "机构减持", "stable": "持仓稳定"}
-            lines.append(f"趋势：{trend_map.get(inst_trend, '稳定')}")
-            for i, h in enumerate(inst_holdings[:5], 1):
-                lines.append(f"  {i}. {h.get('name', 'N/A')} | 持股 {h.get('shares', 'N/A')} | 占比 {h.get('ratio', 'N/A')}%")
-            if len(inst_holdings) > 5:
-                lines.append(f"  ... 还有 {len(inst_holdings)-5} 家机构")
-            lines.append(f"综合：{inst_a.get('summary', '')}")
-        else:
-            lines.append("暂无机构持仓数据")
-
-        # 十二、限售解禁
-        rs = analysis_result.get("restricted_shares_analysis", {})
-        lines.extend(["", "-" * 60, "【十二、限售解禁】", "-" * 60])
-        rs_a = rs.get("analysis", {})
-        rs_upcoming = rs.get("upcoming", [])
-        if rs_upcoming:
-            lines.append(f"近期解禁批次：{len(rs_upcoming)}")
-            rs_pressure = rs_a.get("pressure_level", "low")
-            pressure_map = {"high": "高（大额解禁）", "medium": "中等", "low": "低"}
-            lines.append(f"解禁压力：{pressure_map.get(rs_pressure, '低')}")
-            for i, item in enumerate(rs_upcoming[:3], 1):
-                lines.append(f"  {i}. [{item.get('date','')}] 解禁数量 {item.get('shares','N/A')} 股 | 市值 {item.get('market_value','N/A')}")
-            lines.append(f"综合：{rs_a.get('summary', '')}")
-        else:
-            lines.append("近期无限售解禁")
-
-        # 十三、行业对比
-        ind = analysis_result.get("industry_compare_analysis", {})
-        lines.extend(["", "-" * 60, "【十三、行业对比】", "-" * 60])
-        ind_a = ind.get("analysis", {})
-        if ind.get("industry_name"):
-            lines.append(f"所属行业：{ind.get('industry_name', 'N/A')}")
-            lines.append(f"行业排名：{ind_a.get('rank_desc', 'N/A')}")
-            lines.append(f"行业平均PE：{ind_a.get('industry_avg_pe', 'N/A')}")
-            lines.append(f"综合：{ind_a.get('summary', '')}")
-        else:
-            lines.append("暂无行业对比数据")
-
-        # 十四、分红送转
-        div = analysis_result.get("dividend_analysis", {})
-        lines.extend(["", "-" * 60, "【十四、分红送转历史】", "-" * 60])
-        div_a = div.get("analysis", {})
-        div_records = div.get("records", [])
-        if div_records:
-            lines.append(f"分红记录：{len(div_records)} 次")
-            lines.append(f"股息率：{div_a.get('dividend_yield', 'N/A')}%")
-            lines.append(f"分红稳定性：{div_a.get('stability', 'N/A')}")
-            for i, rec in enumerate(div_records[:3], 1):
-                lines.append(f"  {i}. [{rec.get('year','')}] {rec.get('plan', 'N/A')}")
-            if len(div_records) > 3:
-                lines.append(f"  ... 还有 {len(div_records)-3} 条记录")
-            lines.append(f"综合：{div_a.get('summary', '')}")
-        else:
-            lines.append("暂无分红送转记录")
+            add("暂无筹码分布数据")
 
-        # === END 新增报告章节 ===
+        # 新增9大数据源章节
+        for heading, render, placeholder in _ADDON_REPORT_SECTIONS:
+            add(heading)
+            add(render(analysis_result) or placeholder)
 
-        lines.extend([
-            "",
-            "-" * 60,
-            "【十五、风险评估】",
-            "-" * 60,
-        ])
+        add(_report_section("【十五、风险评估】"))
 
         if risk:
             overall = risk.get("overall_risk", "medium")
-            risk_cn = {"low": "低", "medium": "中等", "high": "高"}.get(overall, "中等")
-
-            lines.extend([
-                f"综合风险等级：{risk_cn}",
-                f"",
-                f"各项风险：",
-                f"  波动风险：{risk.get('volatility_risk', 'medium')}",
-                f"  流动性风险：{risk.get('liquidity_risk', 'medium')}",
-                f"  基本面风险：{risk.get('fundamental_risk', 'medium')}",
-            ])
+            add(_RISK_TEMPLATE.format(
+                risk_cn=_RISK_LEVEL_CN.get(overall, "中等"),
+                volatility_risk=risk.get("volatility_risk", "medium"),
+                liquidity_risk=risk.get("liquidity_risk", "medium"),
+                fundamental_risk=risk.get("fundamental_risk", "medium"),
+            ))
 
             risk_factors = risk.get("risk_factors", [])
             if risk_factors:
-                lines.extend([
-                    f"",
-                    f"风险因素：",
-                ])
-                for factor in risk_factors:
-                    lines.append(f"  - {factor}")
-
-        lines.extend([
-            "",
-            "-" * 60,
-            "【十六、后市预测】",
-            "-" * 60,
-        ])
+                add("\n风险因素：")
+                out.writelines(f"  - {factor}\n" for factor in risk_factors)
+
+        add(_report_section("【十六、后市预测】"))
 
         if prediction:
-            trend = prediction.get("trend", "sideways")
-            trend_cn = prediction.get("trend_cn", "震荡")
-            probability = prediction.get("probability", 0.5)
-
-            lines.extend([
-                f"预测趋势：{trend_cn}",
-                f"概率：{probability * 100:.0f}%",
-                f"",
-                f"目标价格区间：",
-                f"  上限：{prediction.get('target_price_high', 'N/A')} 元",
-                f"  下限：{prediction.get('target_price_low', 'N/A')} 元",
-                f"",
-                f"时间周期：{prediction.get('time_horizon', '短期')}",
-                f"风险等级：{prediction.get('risk_level', '中等')}",
-            ])
+            add(_PREDICTION_TEMPLATE.format(
+                trend_cn=prediction.get("trend_cn", "震荡"),
+                probability_pct=prediction.get("probability", 0.5) * 100,
+                target_price_high=prediction.get("target_price_high", "N/A"),
+                target_price_low=prediction.get("target_price_low", "N/A"),
+                time_horizon=prediction.get("time_horizon", "短期"),
+                risk_level=prediction.get("risk_level", "中等"),
+            ))
 
             key_factors = prediction.get("key_factors", [])
             if key_factors:
-                lines.extend([
-                    f"",
-                    f"关键影响因素：",
-                ])
-                for factor in key_factors:
-                    lines.append(f"  - {factor}")
-
-            lines.extend([
-                f"",
-                f"操作建议：{prediction.get('recommendation', '观望')}",
-            ])
-
-        lines.extend([
-            "",
-            "=" * 60,
-            f"报告生成时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            "=" * 60,
-        ])
-
-        return "\n".join(lines)
+                add("\n关键影响因素：")
+                out.writelines(f"  - {factor}\n" for factor in key_factors)
+
+            add(f"\n操作建议：{prediction.get('recommendation', '观望')}")
+
+        out.write(_REPORT_FOOTER_TEMPLATE.format(
+            generated_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        ))
+
+        return out.getvalue()
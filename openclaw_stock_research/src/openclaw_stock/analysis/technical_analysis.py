@@ -236,6 +236,11 @@ def calculate_technical_indicators(
             # 量比 = 当前成交量 / 过去5日平均成交量
             result["volume_ratio"] = result["volume"] / result["volume"].rolling(window=5, min_periods=1).mean()
 
+        # pandas 的 rolling/ewm 会提升为float64；输入为float32时指标列保持float32
+        if result["close"].dtype == np.float32:
+            indicator_cols = result.columns.difference(df.columns)
+            result[indicator_cols] = result[indicator_cols].astype(np.float32)
+
         logger.info("[calculate_technical_indicators] 技术指标计算完成")
         return result
 
@@ -54,6 +54,20 @@ class Config:
         Path(path).mkdir(parents=True, exist_ok=True)
         return path
 
+    def get_akshare_cache_path(self) -> Optional[str]:
+        """
+        获取AkShare数据磁盘缓存路径
+
+        从环境变量 AKSHARE_DATA_PATH 读取，如果未设置则返回None（不启用磁盘缓存）
+
+        Returns:
+            缓存路径字符串，如果未设置则返回None
+        """
+        cache_path = self.get("AKSHARE_DATA_PATH")
+        if cache_path:
+            Path(cache_path).mkdir(parents=True, exist_ok=True)
+        return cache_path
+
     def get_log_path(self) -> Optional[str]:
         """
         获取日志存储路径
@@ -101,6 +115,18 @@ class Config:
         """
         return float(self.get("PRICE_DIFF_THRESHOLD", 0.5))
 
+    def get_shared_http_session(self) -> bool:
+        """
+        获取是否启用 akshare 共享HTTP会话
+
+        从环境变量 SHARED_HTTP_SESSION 读取，默认为关闭
+        可选值: 1/true/yes/on 表示启用
+
+        Returns:
+            是否启用共享会话
+        """
+        return str(self.get("SHARED_HTTP_SESSION", "")).strip().lower() in ("1", "true", "yes", "on")
+
     def get_log_level(self) -> str:
         """
         获取日志级别
@@ -123,11 +149,13 @@ class Config:
         return {
             "proxy_url": self.get_proxy_url(),
             "stock_data_path": self.get_stock_data_path(),
+            "akshare_cache_path": self.get_akshare_cache_path(),
             "log_path": self.get_log_path(),
             "timeout": self.get_timeout(),
             "max_retries": self.get_max_retries(),
             "price_diff_threshold": self.get_price_diff_threshold(),
             "log_level": self.get_log_level(),
+            "shared_http_session": self.get_shared_http_session(),
         }
 
 
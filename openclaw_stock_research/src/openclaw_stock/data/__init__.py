@@ -4,36 +4,58 @@
 提供股票行情、财务数据、资金流向、新闻等数据的采集功能
 """
 
-from .market_data import (
-    fetch_market_data,
-    fetch_realtime_quote,
-    fetch_kline_data,
-    MarketDataCollector
-)
-from .financial_data import (
-    fetch_financial_data,
-    fetch_financial_report,
-    FinancialDataCollector
-)
-from .fund_flow import (
-    fetch_fund_flow,
-    fetch_capital_flow,
-    fetch_north_bound_flow,
-    FundFlowCollector
-)
-from .news_data import (
-    fetch_stock_news,
-    NewsDataCollector
-)
-from .lhb_data import fetch_lhb_data
-from .margin_data import fetch_margin_data
-from .northbound_data import fetch_northbound_data
-from .block_trade_data import fetch_block_trade_data
-from .shareholder_data import fetch_shareholder_data
-from .institution_data import fetch_institution_data
-from .restricted_shares_data import fetch_restricted_shares_data
-from .industry_compare_data import fetch_industry_compare_data
-from .dividend_data import fetch_dividend_data
+from importlib import import_module
+
+# 导出名 -> 所在子模块；子模块在首次访问导出名时才导入（PEP 562），
+# 只用到部分数据源时不必加载全部子模块
+_LAZY_EXPORTS = {
+    # 市场数据
+    'fetch_market_data': 'market_data',
+    'fetch_realtime_quote': 'market_data',
+    'fetch_kline_data': 'market_data',
+    'MarketDataCollector': 'market_data',
+    # 财务数据
+    'fetch_financial_data': 'financial_data',
+    'fetch_financial_report': 'financial_data',
+    'FinancialDataCollector': 'financial_data',
+    # 资金流向
+    'fetch_fund_flow': 'fund_flow',
+    'fetch_capital_flow': 'fund_flow',
+    'fetch_north_bound_flow': 'fund_flow',
+    'FundFlowCollector': 'fund_flow',
+    # 新闻数据
+    'fetch_stock_news': 'news_data',
+    'NewsDataCollector': 'news_data',
+    # === 新增9大数据源 ===
+    'fetch_lhb_data': 'lhb_data',
+    'fetch_margin_data': 'margin_data',
+    'fetch_northbound_data': 'northbound_data',
+    'fetch_block_trade_data': 'block_trade_data',
+    'fetch_shareholder_data': 'shareholder_data',
+    'fetch_institution_data': 'institution_data',
+    'fetch_restricted_shares_data': 'restricted_shares_data',
+    'fetch_industry_compare_data': 'industry_compare_data',
+    'fetch_dividend_data': 'dividend_data',
+    # 附加数据源注册表
+    'DataSource': 'registry',
+    'DATA_SOURCES': 'registry',
+    'fetch_data_sources': 'registry',
+}
+
+
+def __getattr__(name):
+    """首次访问导出名时导入对应子模块，并缓存到包命名空间"""
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
+
 
 __all__ = [
     # 市场数据
@@ -72,4 +94,8 @@ __all__ = [
     'fetch_industry_compare_data',
     # 分红送转
     'fetch_dividend_data',
+    # 附加数据源注册表
+    'DataSource',
+    'DATA_SOURCES',
+    'fetch_data_sources',
 ]
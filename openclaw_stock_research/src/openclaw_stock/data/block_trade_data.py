@@ -4,11 +4,14 @@
 获取个股大宗交易明细和统计数据
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 import pandas as pd
 
 from ..utils.logger import get_logger
+from ..utils.decorators import cache_result, skip_cache
+from ..utils.file_cache import FileCache
+from .utils import coerce_numeric, filter_by_symbol, frame_to_records, has_rows, numeric_column
 
 try:
     import akshare as ak
@@ -17,7 +20,55 @@ except ImportError:
 
 logger = get_logger(__name__)
 
-
+# 大宗交易明细的 (输出键, akshare列名, 类型)
+_TRADE_FIELDS = (
+    ("date", "交易日期", str),
+    ("close_price", "收盘价", float),
+    ("trade_price", "成交价", float),
+    ("premium_rate", "折溢率", float),
+    ("volume", "成交量", float),
+    ("amount", "成交额", float),
+    ("buyer", "买方营业部", str),
+    ("seller", "卖方营业部", str),
+)
+
+
+# 大宗交易按日披露，全市场数据落盘1天，跨进程复用
+_BLOCK_TRADE_FILE_CACHE = FileCache("block_trade", ttl=86400)
+
+
+# 全市场明细/统计只与日期区间有关，分析多只股票时每个区间只拉取一次
+@cache_result(ttl=86400, maxsize=32, daily=True)
+def _fetch_market_trades(start_date: str, end_date: str) -> pd.DataFrame:
+    """获取区间内全市场大宗交易明细"""
+    cache_key = f"mrmx_{start_date}_{end_date}"
+    df = _BLOCK_TRADE_FILE_CACHE.get(cache_key)
+    if df is None:
+        df = ak.stock_dzjy_mrmx(symbol='A股', start_date=start_date, end_date=end_date)
+        if df is not None and not df.empty:
+            _BLOCK_TRADE_FILE_CACHE.set(cache_key, df)
+    if not has_rows(df):
+        # 空结果多为数据源临时故障，不在内存中缓存到当天结束
+        skip_cache()
+    return df
+
+
+@cache_result(ttl=86400, maxsize=32, daily=True)
+def _fetch_market_statistics(start_date: str, end_date: str) -> pd.DataFrame:
+    """获取区间内全市场大宗交易统计"""
+    cache_key = f"mrtj_{start_date}_{end_date}"
+    df = _BLOCK_TRADE_FILE_CACHE.get(cache_key)
+    if df is None:
+        df = ak.stock_dzjy_mrtj(start_date=start_date, end_date=end_date)
+        if df is not None and not df.empty:
+            _BLOCK_TRADE_FILE_CACHE.set(cache_key, df)
+    if not has_rows(df):
+        skip_cache()
+    return df
+
+
+# 数据按日更新，同一参数当天内重复分析直接复用结果（跨日失效）
+@cache_result(ttl=86400, maxsize=256, daily=True, copy_result=True)
 def fetch_block_trade_data(symbol: str, days: int = 90) -> Dict[str, Any]:
     """
     获取个股大宗交易数据
@@ -46,39 +97,39 @@ def fetch_block_trade_data(symbol: str, days: int = 90) -> Dict[str, Any]:
     end_date = datetime.now().strftime("%Y%m%d")
     start_date = (datetime.now() - timedelta(days=days)).strftime("%Y%m%d")
 
-    # 1. 获取大宗交易明细
+    # 1. 获取大宗交易明细（统计量直接在列上计算，分析时不再遍历明细）
+    precomputed = None
     try:
-        df = ak.stock_dzjy_mrmx(symbol='A股', start_date=start_date, end_date=end_date)
-        if df is not None and not df.empty and '证券代码' in df.columns:
-            df_stock = df[df['证券代码'] == symbol]
+        df = _fetch_market_trades(start_date, end_date)
+        if has_rows(df, '证券代码'):
+            df_stock = filter_by_symbol(df, '证券代码', symbol)
             if not df_stock.empty:
-                trades = []
-                for _, row in df_stock.iterrows():
-                    trades.append({
-                        "date": str(row.get("交易日期", "")),
-                        "close_price": float(row.get("收盘价", 0) or 0),
-                        "trade_price": float(row.get("成交价", 0) or 0),
-                        "premium_rate": float(row.get("折溢率", 0) or 0),
-                        "volume": float(row.get("成交量", 0) or 0),
-                        "amount": float(row.get("成交额", 0) or 0),
-                        "buyer": str(row.get("买方营业部", "")),
-                        "seller": str(row.get("卖方营业部", "")),
-                    })
+                df_stock = coerce_numeric(df_stock, [column for _, column, kind in _TRADE_FIELDS if kind is float])
+                trades = frame_to_records(df_stock, _TRADE_FIELDS)
                 result["trades"] = trades
-                logger.info(f"[block_trade] {symbol} 近{days}天大宗交易 {len(trades)} 笔")
+                precomputed = {
+                    "avg_premium": float(numeric_column(df_stock, "折溢率").mean()),
+                    "total_amount": float(numeric_column(df_stock, "成交额").sum()),
+                }
+                logger.info("[block_trade] %s 近%d天大宗交易 %d 笔", symbol, days, len(trades))
     except Exception as e:
-        logger.warning(f"[block_trade] 获取大宗交易明细失败: {e}")
+        logger.warning("[block_trade] 获取大宗交易明细失败: %s", e)
+        skip_cache()
 
     # 2. 获取大宗交易统计
     try:
-        df_tj = ak.stock_dzjy_mrtj(start_date=start_date, end_date=end_date)
-        if df_tj is not None and not df_tj.empty and '证券代码' in df_tj.columns:
-            df_tj_stock = df_tj[df_tj['证券代码'] == symbol]
+        df_tj = _fetch_market_statistics(start_date, end_date)
+        if has_rows(df_tj, '证券代码'):
+            df_tj_stock = filter_by_symbol(df_tj, '证券代码', symbol)
             if not df_tj_stock.empty:
-                total_amount = df_tj_stock['成交总额'].sum() if '成交总额' in df_tj_stock.columns else 0
-                total_volume = df_tj_stock['成交总量'].sum() if '成交总量' in df_tj_stock.columns else 0
-                avg_premium = df_tj_stock['折溢率'].mean() if '折溢率' in df_tj_stock.columns else 0
-                trade_count = df_tj_stock['成交笔数'].sum() if '成交笔数' in df_tj_stock.columns else len(df_tj_stock)
+                # 各列按数值整体转换一次（"-"等占位符记为0），缺列时合计为0；
+                # 折溢率均值跳过无法解析的值，不把缺失当作0拉低均值
+                total_amount = numeric_column(df_tj_stock, '成交总额').sum()
+                total_volume = numeric_column(df_tj_stock, '成交总量').sum()
+                avg_premium = (pd.to_numeric(df_tj_stock['折溢率'], errors='coerce').mean()
+                               if '折溢率' in df_tj_stock.columns else 0.0)
+                trade_count = (numeric_column(df_tj_stock, '成交笔数').sum()
+                               if '成交笔数' in df_tj_stock.columns else len(df_tj_stock))
 
                 result["statistics"] = {
                     "total_amount": float(total_amount),
@@ -88,16 +139,25 @@ def fetch_block_trade_data(symbol: str, days: int = 90) -> Dict[str, Any]:
                     "trade_days": len(df_tj_stock),
                 }
     except Exception as e:
-        logger.warning(f"[block_trade] 获取大宗交易统计失败: {e}")
+        logger.warning("[block_trade] 获取大宗交易统计失败: %s", e)
+        skip_cache()
 
     # 3. 分析
-    result["analysis"] = _analyze_block_trade(result)
+    result["analysis"] = _analyze_block_trade(result, precomputed)
 
     return result
 
 
-def _analyze_block_trade(data: Dict[str, Any]) -> Dict[str, Any]:
-    """分析大宗交易数据"""
+def _analyze_block_trade(
+    data: Dict[str, Any],
+    precomputed: Optional[Dict[str, float]] = None
+) -> Dict[str, Any]:
+    """
+    分析大宗交易数据
+
+    precomputed 为按明细列算好的 avg_premium（平均折溢率）与 total_amount（成交额合计），
+    给出时不再逐条遍历 trades
+    """
     analysis = {
         "trade_frequency": "无",
         "premium_status": "无数据",
@@ -120,9 +180,17 @@ def _analyze_block_trade(data: Dict[str, Any]) -> Dict[str, Any]:
         analysis["trade_frequency"] = "偶尔"
 
     # 折溢价分析
-    premiums = [t.get("premium_rate", 0) for t in trades if t.get("premium_rate") is not None]
-    if premiums:
-        avg_premium = sum(premiums) / len(premiums)
+    if precomputed is not None:
+        avg_premium = precomputed["avg_premium"]
+        has_premium = True
+        detail_amount = precomputed["total_amount"]
+    else:
+        premiums = [t.get("premium_rate", 0) for t in trades if t.get("premium_rate") is not None]
+        has_premium = bool(premiums)
+        avg_premium = sum(premiums) / len(premiums) if premiums else 0.0
+        detail_amount = sum(t.get("amount", 0) for t in trades)
+
+    if has_premium:
         if avg_premium > 2:
             analysis["premium_status"] = "溢价成交"
             analysis["signal"] = "看多"
@@ -138,15 +206,14 @@ def _analyze_block_trade(data: Dict[str, Any]) -> Dict[str, Any]:
         analysis["avg_premium_rate"] = round(avg_premium, 2)
 
     # 总成交额
-    total_amount = stats.get("total_amount", sum(t.get("amount", 0) for t in trades))
+    total_amount = stats.get("total_amount", detail_amount)
 
     # 综合总结
     parts = [f"近期大宗交易{count}笔"]
     if total_amount > 0:
         parts.append(f"累计成交{total_amount:.2f}万元")
-    if premiums:
-        avg_p = sum(premiums) / len(premiums)
-        parts.append(f"平均折溢率{avg_p:.2f}%")
+    if has_premium:
+        parts.append(f"平均折溢率{avg_premium:.2f}%")
         parts.append(analysis["premium_status"])
 
     analysis["summary"] = "，".join(parts)
@@ -6,9 +6,14 @@
 
 from typing import Dict, Any, List
 from datetime import datetime
+from itertools import islice
+import numpy as np
 import pandas as pd
 
 from ..utils.logger import get_logger
+from ..utils.decorators import cache_result, skip_cache
+from ..utils.file_cache import FileCache
+from .utils import frame_to_records, normalize_columns
 
 try:
     import akshare as ak
@@ -17,7 +22,64 @@ except ImportError:
 
 logger = get_logger(__name__)
 
+# 分红送转详情的 (输出键, akshare列名, 类型)
+_DETAIL_FIELDS = (
+    ("report_date", "报告期", str),
+    ("disclosure_date", "业绩披露日期", str),
+    ("bonus_ratio", "送转股份-送转总比例", float),
+    ("send_ratio", "送转股份-送股比例", float),
+    ("transfer_ratio", "送转股份-转股比例", float),
+    ("cash_dividend", "现金分红-现金分红比例", float),
+    ("cash_desc", "现金分红-现金分红比例描述", str),
+    ("dividend_yield", "现金分红-股息率", float),
+    ("eps", "每股收益", float),
+    ("bps", "每股净资产", float),
+    ("profit_growth", "净利润同比增长", float),
+    ("progress", "方案进度", str),
+    ("ex_date", "除权除息日", str),
+    ("record_date", "股权登记日", str),
+)
+
+# 历史分红记录的 (输出键, akshare列名, 类型)
+_HISTORY_FIELDS = (
+    ("announce_date", "公告日期", str),
+    ("send_shares", "送股", float),
+    ("transfer_shares", "转增", float),
+    ("cash_per_share", "派息", float),
+    ("progress", "进度", str),
+    ("ex_date", "除权除息日", str),
+    ("record_date", "股权登记日", str),
+)
+
+
+# 分红方案变动很少，原始数据落盘7天，详情与历史分开缓存，一项失败不影响另一项复用
+_DIVIDEND_FILE_CACHE = FileCache("dividend", ttl=7 * 86400)
+
+
+def _fetch_detail_frame(symbol: str) -> pd.DataFrame:
+    """获取分红送转详情原始数据（优先读磁盘缓存）"""
+    cache_key = f"detail_{symbol}"
+    df = _DIVIDEND_FILE_CACHE.get(cache_key)
+    if df is None:
+        df = ak.stock_fhps_detail_em(symbol=symbol)
+        if df is not None and not df.empty:
+            _DIVIDEND_FILE_CACHE.set(cache_key, df)
+    return df
 
+
+def _fetch_history_frame(symbol: str) -> pd.DataFrame:
+    """获取历史分红记录原始数据（优先读磁盘缓存）"""
+    cache_key = f"history_{symbol}"
+    df = _DIVIDEND_FILE_CACHE.get(cache_key)
+    if df is None:
+        df = ak.stock_history_dividend_detail(symbol=symbol, indicator="分红")
+        if df is not None and not df.empty:
+            _DIVIDEND_FILE_CACHE.set(cache_key, df)
+    return df
+
+
+# 数据按日更新，同一参数当天内重复分析直接复用结果（跨日失效）
+@cache_result(ttl=86400, maxsize=256, daily=True, copy_result=True)
 def fetch_dividend_data(symbol: str) -> Dict[str, Any]:
     """
     获取个股分红送转数据
@@ -44,51 +106,23 @@ def fetch_dividend_data(symbol: str) -> Dict[str, Any]:
 
     # 1. 获取分红送转详情（含股息率）
     try:
-        df = ak.stock_fhps_detail_em(symbol=symbol)
+        df = _fetch_detail_frame(symbol)
         if df is not None and not df.empty:
-            records = []
-            for _, row in df.iterrows():
-                record = {
-                    "report_date": str(row.get("报告期", "")),
-                    "disclosure_date": str(row.get("业绩披露日期", "")),
-                    "bonus_ratio": float(row.get("送转股份-送转总比例", 0) or 0),
-                    "send_ratio": float(row.get("送转股份-送股比例", 0) or 0),
-                    "transfer_ratio": float(row.get("送转股份-转股比例", 0) or 0),
-                    "cash_dividend": float(row.get("现金分红-现金分红比例", 0) or 0),
-                    "cash_desc": str(row.get("现金分红-现金分红比例描述", "")),
-                    "dividend_yield": float(row.get("现金分红-股息率", 0) or 0),
-                    "eps": float(row.get("每股收益", 0) or 0),
-                    "bps": float(row.get("每股净资产", 0) or 0),
-                    "profit_growth": float(row.get("净利润同比增长", 0) or 0),
-                    "progress": str(row.get("方案进度", "")),
-                    "ex_date": str(row.get("除权除息日", "")),
-                    "record_date": str(row.get("股权登记日", "")),
-                }
-                records.append(record)
+            records = frame_to_records(normalize_columns(df), _DETAIL_FIELDS)
             result["detail"] = records
-            logger.info(f"[dividend] {symbol} 获取到 {len(records)} 条分红送转记录")
+            logger.info("[dividend] %s 获取到 %d 条分红送转记录", symbol, len(records))
     except Exception as e:
-        logger.warning(f"[dividend] 获取分红送转详情失败: {e}")
+        logger.warning("[dividend] 获取分红送转详情失败: %s", e)
+        skip_cache()
 
     # 2. 获取历史分红记录
     try:
-        df_hist = ak.stock_history_dividend_detail(symbol=symbol, indicator="分红")
+        df_hist = _fetch_history_frame(symbol)
         if df_hist is not None and not df_hist.empty:
-            history = []
-            for _, row in df_hist.iterrows():
-                record = {
-                    "announce_date": str(row.get("公告日期", "")),
-                    "send_shares": float(row.get("送股", 0) or 0),
-                    "transfer_shares": float(row.get("转增", 0) or 0),
-                    "cash_per_share": float(row.get("派息", 0) or 0),
-                    "progress": str(row.get("进度", "")),
-                    "ex_date": str(row.get("除权除息日", "")),
-                    "record_date": str(row.get("股权登记日", "")),
-                }
-                history.append(record)
-            result["history"] = history
+            result["history"] = frame_to_records(normalize_columns(df_hist), _HISTORY_FIELDS)
     except Exception as e:
-        logger.warning(f"[dividend] 获取历史分红记录失败: {e}")
+        logger.warning("[dividend] 获取历史分红记录失败: %s", e)
+        skip_cache()
 
     # 3. 分析
     result["analysis"] = _analyze_dividend(result)
@@ -134,12 +168,8 @@ def _analyze_dividend(data: Dict[str, Any]) -> Dict[str, Any]:
                 analysis["dividend_stability"] = "不分红"
                 parts.append("历史无分红记录")
 
-        # 最新股息率
-        latest_with_yield = None
-        for d in detail:
-            if d.get("dividend_yield", 0) > 0:
-                latest_with_yield = d
-                break
+        # 最新股息率（detail 由 _DETAIL_FIELDS 生成，dividend_yield 必定为float）
+        latest_with_yield = next((d for d in detail if d["dividend_yield"] > 0), None)
 
         if latest_with_yield:
             dy = latest_with_yield["dividend_yield"]
@@ -170,14 +200,17 @@ def _analyze_dividend(data: Dict[str, Any]) -> Dict[str, Any]:
 
     # 历史分红趋势
     if history:
-        actual_dividends = [h for h in history if h.get("cash_per_share", 0) > 0 and h.get("progress") == "实施"]
-        if len(actual_dividends) >= 3:
-            recent_3 = actual_dividends[:3]
-            amounts = [d["cash_per_share"] for d in recent_3]
-            if all(amounts[i] >= amounts[i+1] for i in range(len(amounts)-1)):
+        # 只需最近3次实际分红，找到即停止扫描
+        actual_dividends = list(islice(
+            (h for h in history if h.get("cash_per_share", 0) > 0 and h.get("progress") == "实施"), 3
+        ))
+        if len(actual_dividends) == 3:
+            # 记录按时间倒序，相邻差值均<=0即由远及近递增
+            steps = np.diff([d["cash_per_share"] for d in actual_dividends])
+            if (steps <= 0).all():
                 analysis["dividend_trend"] = "分红递增"
                 parts.append("近年分红金额递增")
-            elif all(amounts[i] <= amounts[i+1] for i in range(len(amounts)-1)):
+            elif (steps >= 0).all():
                 analysis["dividend_trend"] = "分红递减"
                 parts.append("近年分红金额递减")
             else:
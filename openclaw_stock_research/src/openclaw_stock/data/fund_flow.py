@@ -4,7 +4,7 @@
 实现设计文档4.1节的接口3: 资金流向采集
 """
 
-from typing import Literal, Optional, Dict, Any, List
+from typing import Literal, Optional, Dict, Any, List, Sequence, Tuple
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
@@ -13,7 +13,8 @@ import json
 
 from ..core.exceptions import DataSourceError, SymbolNotFoundError
 from ..utils.logger import get_logger
-from ..utils.decorators import retry, cache_result
+from ..utils.decorators import retry, cache_result, skip_cache
+from .utils import frame_to_records
 
 try:
     import akshare as ak
@@ -22,6 +23,30 @@ except ImportError:
 
 logger = get_logger(__name__)
 
+# 个股资金流向记录字段：(输出键, 源列名, 类型)
+_INDIVIDUAL_FLOW_FIELDS = (
+    ("main_inflow", "主力净流入", float),
+    ("large_inflow", "超大单净流入", float),
+    ("medium_inflow", "中单净流入", float),
+    ("small_inflow", "小单净流入", float),
+    ("total_inflow", "净流入", float),
+)
+
+# 北向资金记录字段
+_NORTH_FLOW_FIELDS = (
+    ("north_inflow", "当日资金流入", float),
+    ("north_cumulative", "历史累计流入", float),
+)
+
+
+def _flow_records(df: pd.DataFrame, fields: Sequence[Tuple[str, str, type]], **extra: Any) -> List[Dict[str, Any]]:
+    """按列转换资金流向记录，日期保持原值，extra 为每条记录的固定字段"""
+    dates = df["日期"].tolist() if "日期" in df.columns else [""] * len(df)
+    return [
+        {"date": date, **extra, **record}
+        for date, record in zip(dates, frame_to_records(df, fields))
+    ]
+
 
 def _get_eastmoney_fund_flow_individual(symbol: str) -> pd.DataFrame:
     """
@@ -138,18 +163,12 @@ def fetch_fund_flow(
 
                     if not df_flow.empty:
                         # 处理数据
-                        for _, row in df_flow.head(days).iterrows():
-                            result_data.append({
-                                "date": row.get("日期", ""),
-                                "symbol": symbol,
-                                "main_inflow": float(row.get("主力净流入", 0) or 0),
-                                "large_inflow": float(row.get("超大单净流入", 0) or 0),
-                                "medium_inflow": float(row.get("中单净流入", 0) or 0),
-                                "small_inflow": float(row.get("小单净流入", 0) or 0),
-                                "total_inflow": float(row.get("净流入", 0) or 0),
-                            })
+                        result_data.extend(
+                            _flow_records(df_flow.head(days), _INDIVIDUAL_FLOW_FIELDS, symbol=symbol)
+                        )
                 except Exception as e:
                     logger.warning(f"[fetch_fund_flow] 获取个股资金流向失败: {e}")
+                    skip_cache()
 
         else:
             # 全市场资金流向
@@ -165,6 +184,7 @@ def fetch_fund_flow(
                         })
                 except Exception as e:
                     logger.warning(f"[fetch_fund_flow] 获取板块资金流向失败: {e}")
+                    skip_cache()
 
             # 北向资金
             if flow_type in ["north", "all"]:
@@ -172,14 +192,10 @@ def fetch_fund_flow(
                     df_north = ak.stock_hsgt_hist_em()
 
                     if not df_north.empty:
-                        for _, row in df_north.head(days).iterrows():
-                            result_data.append({
-                                "date": row.get("日期", ""),
-                                "north_inflow": float(row.get("当日资金流入", 0) or 0),
-                                "north_cumulative": float(row.get("历史累计流入", 0) or 0),
-                            })
+                        result_data.extend(_flow_records(df_north.head(days), _NORTH_FLOW_FIELDS))
                 except Exception as e:
                     logger.warning(f"[fetch_fund_flow] 获取北向资金失败: {e}")
+                    skip_cache()
 
         df_result = pd.DataFrame(result_data)
         logger.info(f"[fetch_fund_flow] 成功获取资金流向数据: {len(df_result)}条")
@@ -190,6 +206,8 @@ def fetch_fund_flow(
         raise DataSourceError(f"获取资金流向数据失败: {e}")
 
 
+# 资金流向盘中持续变化，仅短时复用；获取失败或无数据时不缓存
+@cache_result(ttl=60, maxsize=256, copy_result=True)
 def fetch_capital_flow(
     symbol: str,
     market: Literal["sh", "sz", "hk"] = "sh",
@@ -210,6 +228,7 @@ def fetch_capital_flow(
         df = fetch_fund_flow(symbol=symbol, days=days, market=market)
 
         if df.empty:
+            skip_cache()
             return {
                 "symbol": symbol,
                 "market": market,
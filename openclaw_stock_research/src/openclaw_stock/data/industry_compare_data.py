@@ -4,13 +4,18 @@
 获取个股所属行业信息，与同行业股票进行估值和涨跌幅对比
 """
 
-from typing import Dict, Any, List
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, Any, Tuple
 from datetime import datetime
+import numpy as np
 import pandas as pd
-import time
+import threading
 import concurrent.futures
 
 from ..utils.logger import get_logger
+from ..utils.decorators import cache_result, jit_compile, NUMBA_AVAILABLE, skip_cache
+from .utils import coerce_numeric, frame_to_records, has_rows, numeric_column
 
 try:
     import akshare as ak
@@ -20,13 +25,77 @@ except ImportError:
 logger = get_logger(__name__)
 
 
+# 成分股记录字段：(输出键, akshare列名, 类型)
+_PEER_FIELDS = (
+    ("code", "代码", str),
+    ("name", "名称", str),
+    ("price", "最新价", float),
+    ("change_pct", "涨跌幅", float),
+    ("pe", "市盈率-动态", float),
+    ("pb", "市净率", float),
+    ("total_market_cap", "总市值", float),
+    ("turnover_rate", "换手率", float),
+)
+
+@dataclass(frozen=True)
+class IndustryPeers:
+    """
+    同行业成分股的列式数据
+
+    每个字段为一个数组，同一下标对应同一只股票；由成分股DataFrame一次性取列得到，
+    行业对比的统计与排名直接在数组上计算。对外返回的 industry_peers 仍为记录列表
+    """
+
+    codes: np.ndarray             # 股票代码（str）
+    pe: np.ndarray                # 市盈率-动态
+    pb: np.ndarray                # 市净率
+    change_pct: np.ndarray        # 涨跌幅
+    total_market_cap: np.ndarray  # 总市值
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "IndustryPeers":
+        """从akshare成分股数据取列（数值列无法解析或缺失的值为0.0）"""
+        codes = df["代码"].map(str).to_numpy() if "代码" in df.columns else np.full(len(df), "")
+        return cls(
+            codes=codes,
+            pe=numeric_column(df, "市盈率-动态"),
+            pb=numeric_column(df, "市净率"),
+            change_pct=numeric_column(df, "涨跌幅"),
+            total_market_cap=numeric_column(df, "总市值"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def index_of(self, symbol: str) -> int:
+        """目标股票的下标，不在成分股中时返回-1"""
+        hits = np.flatnonzero(self.codes == symbol)
+        return int(hits[0]) if hits.size else -1
+
+
 def _fetch_with_timeout(func, timeout=15, **kwargs):
-    """带超时的函数调用包装器"""
-    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-        future = executor.submit(func, **kwargs)
-        return future.result(timeout=timeout)
+    """
+    带超时的函数调用包装器
 
+    每次调用在新的守护线程中执行，超时立即抛出 concurrent.futures.TimeoutError 返回调用方；
+    akshare 请求无法中途取消，挂起的请求留在各自线程中，不占用共享线程池、不阻塞之后的调用
+    """
+    future: concurrent.futures.Future = concurrent.futures.Future()
+
+    def _run() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(**kwargs))
+        except BaseException as e:
+            future.set_exception(e)
 
+    threading.Thread(target=_run, name="industry-fetch", daemon=True).start()
+    return future.result(timeout=timeout)
+
+
+# 数据按日更新，同一参数1小时内重复分析直接复用结果
+@cache_result(ttl=3600, maxsize=256, copy_result=True)
 def fetch_industry_compare_data(symbol: str) -> Dict[str, Any]:
     """
     获取个股行业对比数据
@@ -58,10 +127,8 @@ def fetch_industry_compare_data(symbol: str) -> Dict[str, Any]:
     industry_name = ""
     try:
         df_info = ak.stock_individual_info_em(symbol=symbol)
-        if df_info is not None and not df_info.empty:
-            info_dict = {}
-            for _, row in df_info.iterrows():
-                info_dict[str(row.get("item", ""))] = row.get("value", "")
+        if has_rows(df_info, "item"):
+            info_dict = dict(zip(df_info["item"].map(str), df_info["value"]))
 
             result["stock_info"] = {
                 "name": info_dict.get("股票简称", ""),
@@ -76,6 +143,7 @@ def fetch_industry_compare_data(symbol: str) -> Dict[str, Any]:
             logger.info(f"[industry] {symbol} 所属行业: {industry_name}")
     except Exception as e:
         logger.warning(f"[industry] 获取个股信息失败: {e}")
+        skip_cache()
 
     # 2. 获取同行业成分股（带超时保护，eastmoney接口可能不稳定）
     if industry_name:
@@ -85,30 +153,21 @@ def fetch_industry_compare_data(symbol: str) -> Dict[str, Any]:
                 timeout=10,
                 symbol=industry_name
             )
-            if df_cons is not None and not df_cons.empty:
-                peers = []
-                for _, row in df_cons.iterrows():
-                    peer = {
-                        "code": str(row.get("代码", "")),
-                        "name": str(row.get("名称", "")),
-                        "price": float(row.get("最新价", 0) or 0),
-                        "change_pct": float(row.get("涨跌幅", 0) or 0),
-                        "pe": float(row.get("市盈率-动态", 0) or 0),
-                        "pb": float(row.get("市净率", 0) or 0),
-                        "total_market_cap": float(row.get("总市值", 0) or 0),
-                        "turnover_rate": float(row.get("换手率", 0) or 0),
-                    }
-                    peers.append(peer)
-
-                result["industry_peers"] = peers
+            if has_rows(df_cons):
+                # 数值列先整列转换一次，记录与列式数据共用
+                df_cons = coerce_numeric(df_cons, [column for _, column, kind in _PEER_FIELDS if kind is float])
+                result["industry_peers"] = frame_to_records(df_cons, _PEER_FIELDS)
+                peers = IndustryPeers.from_frame(df_cons)
                 logger.info(f"[industry] {industry_name} 共{len(peers)}只成分股")
 
                 # 3. 计算行业对比
                 result["comparison"] = _calculate_comparison(symbol, peers)
         except concurrent.futures.TimeoutError:
             logger.warning(f"[industry] 获取行业成分股超时(10s)，跳过行业对比")
+            skip_cache()
         except Exception as e:
             logger.warning(f"[industry] 获取行业成分股失败: {e}")
+            skip_cache()
 
     # 4. 分析
     result["analysis"] = _analyze_industry(result)
@@ -116,60 +175,110 @@ def fetch_industry_compare_data(symbol: str) -> Dict[str, Any]:
     return result
 
 
-def _calculate_comparison(symbol: str, peers: List[Dict]) -> Dict[str, Any]:
+def _upper_median(values: np.ndarray) -> float:
+    """中位数（偶数个时取靠后的一个，即排序后下标n//2），用 np.partition 选择而不完整排序"""
+    k = values.size // 2
+    return float(np.partition(values, k)[k])
+
+
+@jit_compile(cache=True)
+def _metric_stats_kernel(values, low, high, target, ascending):
+    """
+    单指标统计内核（numba可用时编译执行）
+
+    一次遍历求出 (low, high) 开区间内有效值的个数、合计，以及有效值中
+    不高于（ascending）/不低于target的个数；按下标顺序逐个累加
+    """
+    count = 0
+    total = 0.0
+    rank = 0
+    for v in values:
+        if v > low and v < high:
+            count += 1
+            total += v
+            if (v <= target) if ascending else (v >= target):
+                rank += 1
+    return count, total, rank
+
+
+def _metric_stats(
+    values: np.ndarray,
+    low: float,
+    high: float,
+    target: float,
+    ascending: bool = True
+) -> Tuple[int, float, int]:
+    """
+    单指标的 (有效个数, 有效值合计, 目标排名)，numba可用时走编译内核，否则按掩码向量化计算
+
+    合计按下标顺序逐个累加（不用 ndarray.sum 的分块求和），与逐条求和的结果逐位一致，
+    均值四舍五入到两位小数时不因累加顺序不同而相差0.01
+    """
+    if NUMBA_AVAILABLE:
+        return _metric_stats_kernel(values, low, high, target, ascending)
+    valid = values[(values > low) & (values < high)]
+    rank = np.count_nonzero(valid <= target) if ascending else np.count_nonzero(valid >= target)
+    return int(valid.size), float(sum(valid.tolist())), int(rank)
+
+
+def _calculate_comparison(symbol: str, peers: IndustryPeers) -> Dict[str, Any]:
     """计算行业对比数据"""
-    if not peers:
+    if not len(peers):
         return {}
 
-    # 过滤有效数据
-    valid_pe = [p["pe"] for p in peers if p["pe"] and p["pe"] > 0 and p["pe"] < 1000]
-    valid_pb = [p["pb"] for p in peers if p["pb"] and p["pb"] > 0 and p["pb"] < 100]
-    valid_change = [p["change_pct"] for p in peers if p["change_pct"] is not None]
-    valid_cap = [p["total_market_cap"] for p in peers if p["total_market_cap"] and p["total_market_cap"] > 0]
+    pe, pb, cap, change = peers.pe, peers.pb, peers.total_market_cap, peers.change_pct
+
+    # 找到目标股票（不在成分股中时目标值记为0，排名不输出）
+    i = peers.index_of(symbol)
+    target_pe = float(pe[i]) if i >= 0 else 0.0
+    target_pb = float(pb[i]) if i >= 0 else 0.0
+    target_cap = float(cap[i]) if i >= 0 else 0.0
 
-    # 找到目标股票
-    target = None
-    for p in peers:
-        if p["code"] == symbol:
-            target = p
-            break
+    # 各指标一次遍历得到有效个数、合计与排名；中位数为O(n)选择，不排序
+    pe_count, pe_total, pe_rank = _metric_stats(pe, 0.0, 1000.0, target_pe)
+    pb_count, pb_total, pb_rank = _metric_stats(pb, 0.0, 100.0, target_pb)
+    cap_count, _, cap_rank = _metric_stats(cap, 0.0, np.inf, target_cap, ascending=False)
+    # 涨跌幅合计同样按下标顺序累加
+    change_total = float(sum(change.tolist()))
 
     comparison = {
         "total_peers": len(peers),
-        "industry_avg_pe": round(sum(valid_pe) / len(valid_pe), 2) if valid_pe else 0,
-        "industry_median_pe": round(sorted(valid_pe)[len(valid_pe)//2], 2) if valid_pe else 0,
-        "industry_avg_pb": round(sum(valid_pb) / len(valid_pb), 2) if valid_pb else 0,
-        "industry_median_pb": round(sorted(valid_pb)[len(valid_pb)//2], 2) if valid_pb else 0,
-        "industry_avg_change": round(sum(valid_change) / len(valid_change), 2) if valid_change else 0,
+        "industry_avg_pe": round(pe_total / pe_count, 2) if pe_count else 0,
+        "industry_median_pe": round(_upper_median(pe[(pe > 0) & (pe < 1000)]), 2) if pe_count else 0,
+        "industry_avg_pb": round(pb_total / pb_count, 2) if pb_count else 0,
+        "industry_median_pb": round(_upper_median(pb[(pb > 0) & (pb < 100)]), 2) if pb_count else 0,
+        "industry_avg_change": round(change_total / change.size, 2),
     }
 
-    if target:
-        comparison["stock_pe"] = target["pe"]
-        comparison["stock_pb"] = target["pb"]
-        comparison["stock_change_pct"] = target["change_pct"]
-        comparison["stock_market_cap"] = target["total_market_cap"]
+    if i >= 0:
+        comparison["stock_pe"] = target_pe
+        comparison["stock_pb"] = target_pb
+        comparison["stock_change_pct"] = float(change[i])
+        comparison["stock_market_cap"] = target_cap
 
-        # PE排名
-        if target["pe"] and target["pe"] > 0 and valid_pe:
-            pe_rank = sum(1 for pe in valid_pe if pe <= target["pe"])
+        # PE排名（不高于目标PE的个数）
+        if target_pe > 0 and pe_count:
             comparison["pe_rank"] = pe_rank
-            comparison["pe_rank_pct"] = round(pe_rank / len(valid_pe) * 100, 1)
+            comparison["pe_rank_pct"] = round(pe_rank / pe_count * 100, 1)
 
         # PB排名
-        if target["pb"] and target["pb"] > 0 and valid_pb:
-            pb_rank = sum(1 for pb in valid_pb if pb <= target["pb"])
+        if target_pb > 0 and pb_count:
             comparison["pb_rank"] = pb_rank
-            comparison["pb_rank_pct"] = round(pb_rank / len(valid_pb) * 100, 1)
+            comparison["pb_rank_pct"] = round(pb_rank / pb_count * 100, 1)
 
-        # 市值排名
-        if target["total_market_cap"] and target["total_market_cap"] > 0 and valid_cap:
-            cap_rank = sum(1 for cap in valid_cap if cap >= target["total_market_cap"])
+        # 市值排名（不低于目标市值的个数）
+        if target_cap > 0 and cap_count:
             comparison["cap_rank"] = cap_rank
-            comparison["cap_rank_total"] = len(valid_cap)
+            comparison["cap_rank_total"] = cap_count
 
     return comparison
 
 
+# PE分位上界（含）与对应的估值位置：<=25、<=50、<=75、其余
+_VALUATION_BOUNDS = (25, 50, 75)
+_VALUATION_POSITIONS = ("行业低估值", "行业中低估值", "行业中高估值", "行业高估值")
+
+
 def _analyze_industry(data: Dict[str, Any]) -> Dict[str, Any]:
     """分析行业对比数据"""
     analysis = {
@@ -194,18 +303,9 @@ def _analyze_industry(data: Dict[str, Any]) -> Dict[str, Any]:
     avg_pe = comparison.get("industry_avg_pe", 0)
 
     if pe_rank_pct is not None and stock_pe > 0:
-        if pe_rank_pct <= 25:
-            analysis["valuation_position"] = "行业低估值"
-            parts.append(f"PE {stock_pe:.1f}（行业均值{avg_pe:.1f}），处于行业低估值区间（{pe_rank_pct:.0f}%分位）")
-        elif pe_rank_pct <= 50:
-            analysis["valuation_position"] = "行业中低估值"
-            parts.append(f"PE {stock_pe:.1f}（行业均值{avg_pe:.1f}），处于行业中低估值区间（{pe_rank_pct:.0f}%分位）")
-        elif pe_rank_pct <= 75:
-            analysis["valuation_position"] = "行业中高估值"
-            parts.append(f"PE {stock_pe:.1f}（行业均值{avg_pe:.1f}），处于行业中高估值区间（{pe_rank_pct:.0f}%分位）")
-        else:
-            analysis["valuation_position"] = "行业高估值"
-            parts.append(f"PE {stock_pe:.1f}（行业均值{avg_pe:.1f}），处于行业高估值区间（{pe_rank_pct:.0f}%分位）")
+        position = _VALUATION_POSITIONS[bisect_left(_VALUATION_BOUNDS, pe_rank_pct)]
+        analysis["valuation_position"] = position
+        parts.append(f"PE {stock_pe:.1f}（行业均值{avg_pe:.1f}），处于{position}区间（{pe_rank_pct:.0f}%分位）")
 
     # 市值排名
     cap_rank = comparison.get("cap_rank")
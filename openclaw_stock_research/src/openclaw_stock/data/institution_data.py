@@ -9,25 +9,30 @@ from datetime import datetime, timedelta
 import pandas as pd
 
 from ..utils.logger import get_logger
+from ..utils.decorators import cache_result, skip_cache
+from ..utils.file_cache import FileCache
+from ..utils.http_session import get_shared_session
+from .utils import has_rows, numeric_column
 
 try:
     import akshare as ak
 except ImportError:
     ak = None
 
-try:
-    import requests as _requests
-except ImportError:
-    _requests = None
-
 logger = get_logger(__name__)
 
 
+# 东方财富调研接口的 (连接, 读取) 超时秒数；请求走 utils.http_session 的当前线程会话，
+# 复用进程内共享的连接池
+_RESEARCH_TIMEOUT = (3, 10)
+
+
 def _fetch_institution_research_direct(symbol: str, days: int = 180) -> List[Dict]:
     """
     直接调用东方财富API获取个股机构调研数据（按股票代码过滤，避免全量翻页）
     """
-    if _requests is None:
+    session = get_shared_session()
+    if session is None:
         return []
 
     start_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
@@ -45,15 +50,14 @@ def _fetch_institution_research_direct(symbol: str, days: int = 180) -> List[Dic
     }
 
     try:
-        r = _requests.get(url, params=params, timeout=10)
+        r = session.get(url, params=params, timeout=_RESEARCH_TIMEOUT)
         data = r.json()
         if not data.get("success") or not data.get("result"):
             return []
 
         records = data["result"].get("data", [])
-        result = []
-        for rec in records:
-            result.append({
+        return [
+            {
                 "name": rec.get("SECURITY_NAME_ABBR", ""),
                 "research_org": rec.get("RECEIVE_OBJECT", ""),
                 "org_type": rec.get("ORG_TYPE", ""),
@@ -61,13 +65,68 @@ def _fetch_institution_research_direct(symbol: str, days: int = 180) -> List[Dic
                 "notice_date": str(rec.get("NOTICE_DATE", ""))[:10],
                 "receive_way": rec.get("RECEIVE_WAY_EXPLAIN", ""),
                 "research_org_count": int(rec.get("SUM", 0) or 0),
-            })
-        return result
+            }
+            for rec in records
+        ]
     except Exception as e:
         logger.warning(f"[institution] 直接获取机构调研数据失败: {e}")
+        skip_cache()
         return []
 
 
+# 机构持仓字段：(输出键, akshare列名, int/float)，无法解析或缺失的值为0
+_HOLDING_FIELDS = (
+    ("institution_count", "机构数", int),
+    ("institution_change", "机构数变化", int),
+    ("hold_ratio", "持股比例", float),
+    ("hold_ratio_change", "持股比例增幅", float),
+    ("float_ratio", "占流通股比例", float),
+    ("float_ratio_change", "占流通股比例增幅", float),
+)
+
+# 尝试的季度数（数据可能滞后1-2个季度）
+_HOLDING_QUARTERS = 6
+
+
+def _recent_quarters(now: datetime, count: int = _HOLDING_QUARTERS) -> List[str]:
+    """从上一季度起向前的 count 个季度字符串（如 '20244', '20243', ...）"""
+    # 以 年*4+季度序号 计数，逐季递减后换算回年份与季度
+    last = now.year * 4 + (now.month - 1) // 3 - 1
+    return [f"{n // 4}{n % 4 + 1}" for n in range(last, last - count, -1)]
+
+
+# 季度机构持仓落盘跨进程复用：最近两个季度仍在陆续披露，缓存1天；
+# 更早的季度数据已基本定型，缓存30天（同一命名空间，按季度选用有效期）
+_HOLD_FILE_CACHE = FileCache("institution_hold", ttl=86400)
+_HOLD_FINAL_FILE_CACHE = FileCache("institution_hold", ttl=30 * 86400)
+
+
+# 季度机构持仓为全市场数据，分析多只股票时每个季度只拉取一次
+@cache_result(ttl=3600, maxsize=16)
+def _fetch_quarter_holdings(quarter_str: str) -> pd.DataFrame:
+    """
+    获取某季度全市场机构持仓（quarter_str 如 '20241'）
+
+    以证券代码为索引（保留代码列），各股票按哈希索引取行，不再每次整列比较；
+    非空结果连同索引写入磁盘缓存
+    """
+    recent = quarter_str in _recent_quarters(datetime.now(), 2)
+    file_cache = _HOLD_FILE_CACHE if recent else _HOLD_FINAL_FILE_CACHE
+    df = file_cache.get(quarter_str)
+    if df is None:
+        df = ak.stock_institute_hold(symbol=quarter_str)
+        if df is not None and '证券代码' in df.columns:
+            df = df.set_index('证券代码', drop=False).rename_axis(None)
+            if not df.empty:
+                file_cache.set(quarter_str, df)
+    if not has_rows(df, '证券代码'):
+        # 空结果多为数据源临时故障（或季度尚未披露），不在内存中缓存
+        skip_cache()
+    return df
+
+
+# 数据按日更新，同一参数1小时内重复分析直接复用结果
+@cache_result(ttl=3600, maxsize=256, copy_result=True)
 def fetch_institution_data(symbol: str) -> Dict[str, Any]:
     """
     获取个股机构持仓数据
@@ -92,40 +151,31 @@ def fetch_institution_data(symbol: str) -> Dict[str, Any]:
         "analysis": {}
     }
 
-    # 1. 获取机构持仓数据（stock_institute_hold 单次请求，速度快）
-    now = datetime.now()
-    year = now.year
-    quarter = (now.month - 1) // 3  # 0-3, 上一季度
-
-    for attempt in range(6):  # 尝试最近6个季度（数据可能滞后1-2个季度）
-        q = quarter - attempt
-        y = year
-        while q <= 0:
-            q += 4
-            y -= 1
-        quarter_str = f"{y}{q}"
-
+    # 1. 获取机构持仓数据（季度全市场数据按季度缓存，多只股票共用）
+    quarters = _recent_quarters(datetime.now())
+    failed_quarters = 0
+    for quarter_str in quarters:
         try:
-            df = ak.stock_institute_hold(symbol=quarter_str)
-            if df is not None and not df.empty and '证券代码' in df.columns:
-                df_stock = df[df['证券代码'] == symbol]
+            df = _fetch_quarter_holdings(quarter_str)
+            if has_rows(df, '证券代码'):
+                df_stock = df.loc[[symbol]] if symbol in df.index else df.iloc[0:0]
                 if not df_stock.empty:
-                    row = df_stock.iloc[0]
-                    result["holding"] = {
-                        "quarter": quarter_str,
-                        "institution_count": int(row.get("机构数", 0) or 0),
-                        "institution_change": int(row.get("机构数变化", 0) or 0),
-                        "hold_ratio": float(row.get("持股比例", 0) or 0),
-                        "hold_ratio_change": float(row.get("持股比例增幅", 0) or 0),
-                        "float_ratio": float(row.get("占流通股比例", 0) or 0),
-                        "float_ratio_change": float(row.get("占流通股比例增幅", 0) or 0),
-                    }
+                    first = df_stock.iloc[:1]
+                    holding = {"quarter": quarter_str}
+                    for key, column, kind in _HOLDING_FIELDS:
+                        holding[key] = kind(numeric_column(first, column)[0])
+                    result["holding"] = holding
                     logger.info(f"[institution] {symbol} {quarter_str}季度 机构数: {result['holding']['institution_count']}")
                     break
         except Exception as e:
             logger.debug(f"[institution] 获取{quarter_str}季度机构持仓失败: {e}")
+            failed_quarters += 1
             continue
 
+    # 各季度均获取失败（数据源故障）时结果不缓存；个别季度未披露属正常情况
+    if failed_quarters == len(quarters):
+        skip_cache()
+
     # 2. 获取机构调研数据（直接API调用，按股票代码过滤，避免全量翻页）
     try:
         research_list = _fetch_institution_research_direct(symbol, days=180)
@@ -134,6 +184,7 @@ def fetch_institution_data(symbol: str) -> Dict[str, Any]:
             logger.info(f"[institution] {symbol} 机构调研记录: {len(research_list)}")
     except Exception as e:
         logger.warning(f"[institution] 获取机构调研数据失败: {e}")
+        skip_cache()
 
     # 3. 分析
     result["analysis"] = _analyze_institution(result)
@@ -152,6 +203,9 @@ def _analyze_institution(data: Dict[str, Any]) -> Dict[str, Any]:
     holding = data.get("holding", {})
     research = data.get("research", [])
 
+    if not holding and not research:
+        return analysis
+
     parts = []
 
     if holding:
@@ -198,7 +252,7 @@ def _analyze_institution(data: Dict[str, Any]) -> Dict[str, Any]:
     if research:
         total_orgs = len(research)
         # 统计不同机构数
-        unique_orgs = set(r.get("research_org", "") for r in research if r.get("research_org"))
+        unique_orgs = {org for org in (r.get("research_org") for r in research) if org}
         if total_orgs > 0:
             parts.append(f"近半年被{len(unique_orgs)}家机构调研{total_orgs}次")
 
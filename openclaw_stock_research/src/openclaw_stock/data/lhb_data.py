@@ -9,6 +9,8 @@ from datetime import datetime, timedelta
 import pandas as pd
 
 from ..utils.logger import get_logger
+from ..utils.decorators import cache_result, skip_cache
+from .utils import coerce_numeric, filter_by_symbol, frame_to_records, has_rows, numeric_column
 
 try:
     import akshare as ak
@@ -18,6 +20,25 @@ except ImportError:
 logger = get_logger(__name__)
 
 
+# 机构买卖统计中合计的列：买入总额、卖出总额、买入净额、买方机构数、卖方机构数
+_INSTITUTION_COLUMNS = ["机构买入总额", "机构卖出总额", "机构买入净额", "买方机构数", "卖方机构数"]
+
+# 上榜记录字段：(输出键, akshare列名, 类型)
+_RECORD_FIELDS = (
+    ("date", "上榜日", str),
+    ("reason", "上榜原因", str),
+    ("close_price", "收盘价", float),
+    ("change_pct", "涨跌幅", float),
+    ("net_buy", "龙虎榜净买额", float),
+    ("buy_amount", "龙虎榜买入额", float),
+    ("sell_amount", "龙虎榜卖出额", float),
+    ("turnover", "龙虎榜成交额", float),
+    ("after_1d", "上榜后1日", float),
+    ("after_5d", "上榜后5日", float),
+)
+
+# 数据按日更新，同一参数1小时内重复分析直接复用结果
+@cache_result(ttl=3600, maxsize=256, copy_result=True)
 def fetch_lhb_data(symbol: str, days: int = 90) -> Dict[str, Any]:
     """
     获取个股龙虎榜数据
@@ -46,42 +67,35 @@ def fetch_lhb_data(symbol: str, days: int = 90) -> Dict[str, Any]:
     end_date = datetime.now().strftime("%Y%m%d")
     start_date = (datetime.now() - timedelta(days=days)).strftime("%Y%m%d")
 
-    # 1. 获取龙虎榜明细
+    # 1. 获取龙虎榜明细（统计量直接在列上计算，分析时不再遍历记录）
+    precomputed = None
     try:
         df = ak.stock_lhb_detail_em(start_date=start_date, end_date=end_date)
-        if not df.empty and '代码' in df.columns:
-            df_stock = df[df['代码'] == symbol]
+        if has_rows(df, '代码'):
+            df_stock = filter_by_symbol(df, '代码', symbol)
             if not df_stock.empty:
-                records = []
-                for _, row in df_stock.iterrows():
-                    records.append({
-                        "date": str(row.get("上榜日", "")),
-                        "reason": str(row.get("上榜原因", "")),
-                        "close_price": float(row.get("收盘价", 0) or 0),
-                        "change_pct": float(row.get("涨跌幅", 0) or 0),
-                        "net_buy": float(row.get("龙虎榜净买额", 0) or 0),
-                        "buy_amount": float(row.get("龙虎榜买入额", 0) or 0),
-                        "sell_amount": float(row.get("龙虎榜卖出额", 0) or 0),
-                        "turnover": float(row.get("龙虎榜成交额", 0) or 0),
-                        "after_1d": float(row.get("上榜后1日", 0) or 0),
-                        "after_5d": float(row.get("上榜后5日", 0) or 0),
-                    })
+                df_stock = coerce_numeric(df_stock, [column for _, column, kind in _RECORD_FIELDS if kind is float])
+                records = frame_to_records(df_stock, _RECORD_FIELDS)
                 result["records"] = records
+                precomputed = {
+                    "total_net_buy": float(numeric_column(df_stock, "龙虎榜净买额").sum()),
+                    "avg_after_1d": float(numeric_column(df_stock, "上榜后1日").mean()),
+                    "avg_after_5d": float(numeric_column(df_stock, "上榜后5日").mean()),
+                }
                 logger.info(f"[lhb] {symbol} 近{days}天上榜 {len(records)} 次")
     except Exception as e:
         logger.warning(f"[lhb] 获取龙虎榜明细失败: {e}")
+        skip_cache()
 
     # 2. 获取机构买卖统计
     try:
         df_jg = ak.stock_lhb_jgmmtj_em(start_date=start_date, end_date=end_date)
-        if not df_jg.empty and '代码' in df_jg.columns:
-            df_jg_stock = df_jg[df_jg['代码'] == symbol]
+        if has_rows(df_jg, '代码'):
+            df_jg_stock = filter_by_symbol(df_jg, '代码', symbol)
             if not df_jg_stock.empty:
-                total_buy = df_jg_stock['机构买入总额'].sum() if '机构买入总额' in df_jg_stock.columns else 0
-                total_sell = df_jg_stock['机构卖出总额'].sum() if '机构卖出总额' in df_jg_stock.columns else 0
-                net_buy = df_jg_stock['机构买入净额'].sum() if '机构买入净额' in df_jg_stock.columns else 0
-                buy_count = df_jg_stock['买方机构数'].sum() if '买方机构数' in df_jg_stock.columns else 0
-                sell_count = df_jg_stock['卖方机构数'].sum() if '卖方机构数' in df_jg_stock.columns else 0
+                # 各统计列一次求和，缺失的列按0计
+                totals = df_jg_stock.reindex(columns=_INSTITUTION_COLUMNS).sum()
+                total_buy, total_sell, net_buy, buy_count, sell_count = totals.tolist()
 
                 result["institution_summary"] = {
                     "total_buy": float(total_buy),
@@ -94,15 +108,24 @@ def fetch_lhb_data(symbol: str, days: int = 90) -> Dict[str, Any]:
                 logger.info(f"[lhb] {symbol} 机构净买入: {net_buy:.2f}万元")
     except Exception as e:
         logger.warning(f"[lhb] 获取机构买卖统计失败: {e}")
+        skip_cache()
 
     # 3. 分析
-    result["analysis"] = _analyze_lhb(result)
+    result["analysis"] = _analyze_lhb(result, precomputed)
 
     return result
 
 
-def _analyze_lhb(data: Dict[str, Any]) -> Dict[str, Any]:
-    """分析龙虎榜数据"""
+def _analyze_lhb(
+    data: Dict[str, Any],
+    precomputed: Optional[Dict[str, float]] = None
+) -> Dict[str, Any]:
+    """
+    分析龙虎榜数据
+
+    precomputed 为按明细列算好的 total_net_buy（净买额合计）、avg_after_1d / avg_after_5d
+    （上榜后1日/5日平均涨跌），给出时不再逐条遍历 records
+    """
     analysis = {
         "lhb_frequency": "无",
         "institution_attitude": "中性",
@@ -124,8 +147,16 @@ def _analyze_lhb(data: Dict[str, Any]) -> Dict[str, Any]:
     else:
         analysis["lhb_frequency"] = "少量上榜"
 
-    # 龙虎榜净买入
-    total_net_buy = sum(r.get("net_buy", 0) for r in records)
+    # 龙虎榜净买入及上榜后表现
+    if precomputed is not None:
+        total_net_buy = precomputed["total_net_buy"]
+        avg_after_1d = precomputed["avg_after_1d"]
+        avg_after_5d = precomputed["avg_after_5d"]
+    else:
+        total_net_buy = sum(r.get("net_buy", 0) for r in records)
+        avg_after_1d = sum(r.get("after_1d", 0) for r in records) / len(records)
+        avg_after_5d = sum(r.get("after_5d", 0) for r in records) / len(records)
+
     if total_net_buy > 0:
         analysis["lhb_direction"] = "净买入"
     else:
@@ -138,10 +169,6 @@ def _analyze_lhb(data: Dict[str, Any]) -> Dict[str, Any]:
     elif net_buy < 0:
         analysis["institution_attitude"] = "机构净卖出"
 
-    # 上榜后表现
-    avg_after_1d = sum(r.get("after_1d", 0) for r in records) / len(records) if records else 0
-    avg_after_5d = sum(r.get("after_5d", 0) for r in records) / len(records) if records else 0
-
     # 综合总结
     parts = [f"近期上榜{count}次"]
     if total_net_buy > 0:
@@ -4,11 +4,17 @@
 获取个股融资融券余额、买入额等数据，分析市场杠杆资金动向
 """
 
-from typing import Dict, Any, List
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 import pandas as pd
 
 from ..utils.logger import get_logger
+from ..utils.decorators import cache_result, skip_cache
+from ..utils.file_cache import FileCache
+from .utils import frame_to_records, has_rows
 
 try:
     import akshare as ak
@@ -18,6 +24,74 @@ except ImportError:
 logger = get_logger(__name__)
 
 
+# 融资融券记录字段：(输出键, akshare列名, 类型)；深市明细无偿还额/偿还量
+_SSE_FIELDS = (
+    ("margin_balance", "融资余额", float),
+    ("margin_buy", "融资买入额", float),
+    ("margin_repay", "融资偿还额", float),
+    ("short_balance", "融券余量", float),
+    ("short_sell", "融券卖出量", float),
+    ("short_repay", "融券偿还量", float),
+)
+_SZSE_FIELDS = tuple(f for f in _SSE_FIELDS if f[0] not in ("margin_repay", "short_repay"))
+
+# 深市明细的证券代码列（akshare 固定列名）
+_SZSE_CODE_COL = "证券代码"
+
+# 沪市逐日明细的并发请求数
+_SSE_FETCH_WORKERS = 8
+
+# 沪市某日的全市场明细发布后不再变化，落盘7天跨进程复用
+_MARGIN_FILE_CACHE = FileCache("margin", ttl=7 * 86400)
+
+
+# 全市场明细只与日期有关，分析多只股票时每个日期只拉取一次
+@cache_result(ttl=3600, maxsize=32)
+def _fetch_sse_detail(date_str: str) -> pd.DataFrame:
+    """
+    获取沪市某日全市场融资融券明细
+
+    以标的证券代码为索引（保留代码列），各股票按哈希索引取行，不再每次整列比较
+    """
+    cache_key = f"sse_{date_str}"
+    df = _MARGIN_FILE_CACHE.get(cache_key)
+    if df is None:
+        df = ak.stock_margin_detail_sse(date=date_str)
+        if df is not None and '标的证券代码' in df.columns:
+            df = df.set_index('标的证券代码', drop=False).rename_axis(None)
+            if not df.empty:
+                _MARGIN_FILE_CACHE.set(cache_key, df)
+    if not has_rows(df, '标的证券代码'):
+        # 空结果多为数据源临时故障，不在内存中缓存
+        skip_cache()
+    return df
+
+
+@cache_result(ttl=3600, maxsize=8)
+def _fetch_szse_detail(date_str: str) -> pd.DataFrame:
+    """获取深市某日全市场融资融券明细，以证券代码（字符串）为索引"""
+    df = ak.stock_margin_detail_szse(date=date_str)
+    if df is not None and _SZSE_CODE_COL in df.columns:
+        df = df.set_index(df[_SZSE_CODE_COL].astype(str)).rename_axis(None)
+    if not has_rows(df, _SZSE_CODE_COL):
+        skip_cache()
+    return df
+
+
+def _fetch_sse_record(symbol: str, date_str: str) -> Optional[Dict[str, Any]]:
+    """获取沪市某一日的个股融资融券明细，非交易日、数据不可用或无该股票时返回None"""
+    try:
+        df = _fetch_sse_detail(date_str)
+        if has_rows(df, '标的证券代码') and symbol in df.index:
+            return {"date": date_str, **frame_to_records(df.loc[[symbol]].iloc[:1], _SSE_FIELDS)[0]}
+    except Exception:
+        # 非交易日或数据不可用，跳过
+        pass
+    return None
+
+
+# 数据按日更新，同一参数1小时内重复分析直接复用结果
+@cache_result(ttl=3600, maxsize=256, copy_result=True)
 def fetch_margin_data(symbol: str, days: int = 30) -> Dict[str, Any]:
     """
     获取个股融资融券数据
@@ -47,51 +121,22 @@ def fetch_margin_data(symbol: str, days: int = 30) -> Dict[str, Any]:
     records = []
     end_date = datetime.now()
 
-    # 尝试获取最近几个交易日的数据
-    for i in range(min(days, 10)):
-        date = end_date - timedelta(days=i)
-        date_str = date.strftime("%Y%m%d")
-        try:
-            df = ak.stock_margin_detail_sse(date=date_str)
-            if df is not None and not df.empty and '标的证券代码' in df.columns:
-                df_stock = df[df['标的证券代码'] == symbol]
-                if not df_stock.empty:
-                    row = df_stock.iloc[0]
-                    record = {
-                        "date": date_str,
-                        "margin_balance": float(row.get("融资余额", 0) or 0),
-                        "margin_buy": float(row.get("融资买入额", 0) or 0),
-                        "margin_repay": float(row.get("融资偿还额", 0) or 0),
-                        "short_balance": float(row.get("融券余量", 0) or 0),
-                        "short_sell": float(row.get("融券卖出量", 0) or 0),
-                        "short_repay": float(row.get("融券偿还量", 0) or 0),
-                    }
-                    records.append(record)
-        except Exception as e:
-            # 非交易日或数据不可用，跳过
-            continue
+    # 尝试获取最近几个交易日的数据（各日期并发请求，非交易日返回None）
+    dates = [(end_date - timedelta(days=i)).strftime("%Y%m%d") for i in range(min(days, 10))]
+    if dates:
+        with ThreadPoolExecutor(max_workers=min(len(dates), _SSE_FETCH_WORKERS)) as executor:
+            records = [record for record in executor.map(partial(_fetch_sse_record, symbol), dates) if record]
 
     if not records:
         # 尝试深市接口
         try:
-            df = ak.stock_margin_detail_szse(date=end_date.strftime("%Y%m%d"))
-            if df is not None and not df.empty:
-                for col in df.columns:
-                    if '代码' in col:
-                        df_stock = df[df[col].astype(str) == symbol]
-                        if not df_stock.empty:
-                            row = df_stock.iloc[0]
-                            record = {
-                                "date": end_date.strftime("%Y%m%d"),
-                                "margin_balance": float(row.get("融资余额", 0) or 0),
-                                "margin_buy": float(row.get("融资买入额", 0) or 0),
-                                "short_balance": float(row.get("融券余量", 0) or 0),
-                                "short_sell": float(row.get("融券卖出量", 0) or 0),
-                            }
-                            records.append(record)
-                            break
+            date_str = end_date.strftime("%Y%m%d")
+            df = _fetch_szse_detail(date_str)
+            if has_rows(df, _SZSE_CODE_COL) and symbol in df.index:
+                records.append({"date": date_str, **frame_to_records(df.loc[[symbol]].iloc[:1], _SZSE_FIELDS)[0]})
         except Exception as e:
             logger.warning(f"[margin] 深市融资融券获取失败: {e}")
+            skip_cache()
 
     if records:
         # 按日期排序（最新在前）
@@ -105,6 +150,16 @@ def fetch_margin_data(symbol: str, days: int = 30) -> Dict[str, Any]:
     return result
 
 
+# 融资余额区间涨跌幅上界（含）与对应的趋势、信号：<=-5、<=0、<=5、其余
+_MARGIN_CHANGE_BOUNDS = (-5, 0, 5)
+_MARGIN_TRENDS = (
+    ("融资余额显著减少", "看空"),
+    ("融资余额小幅减少", "偏空"),
+    ("融资余额小幅增加", "偏多"),
+    ("融资余额显著增加", "看多"),
+)
+
+
 def _analyze_margin(data: Dict[str, Any]) -> Dict[str, Any]:
     """分析融资融券数据"""
     analysis = {
@@ -121,10 +176,10 @@ def _analyze_margin(data: Dict[str, Any]) -> Dict[str, Any]:
 
     margin_balance = latest.get("margin_balance", 0)
     short_balance = latest.get("short_balance", 0)
+    margin_balance_yi = margin_balance / 1e8
 
     # 融资余额描述
     if margin_balance > 0:
-        margin_balance_yi = margin_balance / 1e8
         analysis["margin_balance_desc"] = f"{margin_balance_yi:.2f}亿元"
     else:
         analysis["margin_balance_desc"] = "无数据"
@@ -132,7 +187,7 @@ def _analyze_margin(data: Dict[str, Any]) -> Dict[str, Any]:
     # 融资融券比
     if short_balance > 0 and margin_balance > 0:
         # 注意：融券余量是股数，融资余额是金额，不能直接比
-        analysis["margin_short_info"] = f"融资余额{margin_balance/1e8:.2f}亿，融券余量{short_balance}股"
+        analysis["margin_short_info"] = f"融资余额{margin_balance_yi:.2f}亿，融券余量{short_balance}股"
 
     # 趋势分析
     if len(trend) >= 2:
@@ -141,18 +196,9 @@ def _analyze_margin(data: Dict[str, Any]) -> Dict[str, Any]:
 
         if prev_balance > 0:
             change_pct = (latest_balance - prev_balance) / prev_balance * 100
-            if change_pct > 5:
-                analysis["margin_trend"] = "融资余额显著增加"
-                analysis["signal"] = "看多"
-            elif change_pct > 0:
-                analysis["margin_trend"] = "融资余额小幅增加"
-                analysis["signal"] = "偏多"
-            elif change_pct > -5:
-                analysis["margin_trend"] = "融资余额小幅减少"
-                analysis["signal"] = "偏空"
-            else:
-                analysis["margin_trend"] = "融资余额显著减少"
-                analysis["signal"] = "看空"
+            analysis["margin_trend"], analysis["signal"] = _MARGIN_TRENDS[
+                bisect_left(_MARGIN_CHANGE_BOUNDS, change_pct)
+            ]
             analysis["change_pct"] = round(change_pct, 2)
         else:
             analysis["margin_trend"] = "稳定"
@@ -164,7 +210,7 @@ def _analyze_margin(data: Dict[str, Any]) -> Dict[str, Any]:
     # 综合总结
     parts = []
     if margin_balance > 0:
-        parts.append(f"融资余额{margin_balance/1e8:.2f}亿元")
+        parts.append(f"融资余额{analysis['margin_balance_desc']}")
     if analysis.get("margin_trend") and analysis["margin_trend"] != "无数据":
         parts.append(analysis["margin_trend"])
     if analysis.get("signal"):
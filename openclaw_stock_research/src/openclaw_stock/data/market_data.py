@@ -124,6 +124,8 @@ def _format_a_share_symbol(symbol: str, market: str) -> str:
     return f"sz{symbol}"
 
 
+# K线数据：同一区间5分钟内重复请求直接复用；每次返回独立副本，调用方修改不影响缓存
+@cache_result(ttl=300, maxsize=256, copy_result=True)
 def fetch_market_data(
     symbol: str,
     period: Literal["1m", "5m", "15m", "30m", "60m", "daily", "weekly", "monthly"] = "daily",
@@ -226,7 +228,7 @@ def fetch_market_data(
 
 
 @retry(max_attempts=3, delay=1.0)
-@cache_result(ttl=300)
+@cache_result(ttl=5, maxsize=256, copy_result=True)  # 实时行情，仅合并几秒内的重复请求
 def fetch_realtime_quote(
     symbol: str,
     market: Literal["sh", "sz", "hk"] = "sh"
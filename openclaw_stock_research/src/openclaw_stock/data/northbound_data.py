@@ -9,6 +9,9 @@ from datetime import datetime, timedelta
 import pandas as pd
 
 from ..utils.logger import get_logger
+from ..utils.decorators import cache_result, skip_cache
+from ..utils.file_cache import FileCache
+from .utils import frame_to_records, has_rows
 
 try:
     import akshare as ak
@@ -18,6 +21,72 @@ except ImportError:
 logger = get_logger(__name__)
 
 
+# 个股北向持股字段：(输出键, akshare列名, 类型)
+_HOLD_FIELDS = (
+    ("name", "名称", str),
+    ("close_price", "今日收盘价", float),
+    ("change_pct", "今日涨跌幅", float),
+    ("hold_shares", "今日持股-股数", float),
+    ("hold_value", "今日持股-市值", float),
+    ("hold_ratio_float", "今日持股-占流通股比", float),
+    ("hold_ratio_total", "今日持股-占总股本比", float),
+    ("change_shares", "今日增持估计-股数", float),
+    ("change_value", "今日增持估计-市值", float),
+    ("change_value_pct", "今日增持估计-市值增幅", float),
+    ("board", "所属板块", str),
+    ("date", "日期", str),
+)
+
+# 北向资金整体流向记录字段：(输出键, akshare列名, 类型)
+_FLOW_FIELDS = (
+    ("date", "日期", str),
+    ("net_buy", "当日成交净买额", float),
+    ("buy_amount", "买入成交额", float),
+    ("sell_amount", "卖出成交额", float),
+    ("cumulative", "历史累计净买额", float),
+)
+
+# 北向持股排行与整体流向为全市场数据，落盘1小时（不跨日）跨进程复用
+_NORTHBOUND_FILE_CACHE = FileCache("northbound", ttl=3600, daily=True)
+
+
+# 分析多只股票时每个市场的持股排行只拉取一次
+@cache_result(ttl=3600, maxsize=4)
+def _fetch_hold_ranking(market_name: str) -> pd.DataFrame:
+    """
+    获取沪股通/深股通今日持股排行
+
+    以代码为索引（保留代码列），各股票按索引取行；非空结果连同索引写入磁盘缓存
+    """
+    cache_key = f"hold_{market_name}"
+    df = _NORTHBOUND_FILE_CACHE.get(cache_key)
+    if df is None:
+        df = ak.stock_hsgt_hold_stock_em(market=market_name, indicator="今日排行")
+        if df is not None and '代码' in df.columns:
+            df = df.set_index('代码', drop=False).rename_axis(None)
+            if not df.empty:
+                _NORTHBOUND_FILE_CACHE.set(cache_key, df)
+    if not has_rows(df, '代码'):
+        # 空结果多为数据源临时故障，不在内存中缓存
+        skip_cache()
+    return df
+
+
+@cache_result(ttl=3600, maxsize=4)
+def _fetch_flow_history() -> pd.DataFrame:
+    """获取北向资金历史流向"""
+    df = _NORTHBOUND_FILE_CACHE.get("hist")
+    if df is None:
+        df = ak.stock_hsgt_hist_em(symbol="北向资金")
+        if df is not None and not df.empty:
+            _NORTHBOUND_FILE_CACHE.set("hist", df)
+    if not has_rows(df):
+        skip_cache()
+    return df
+
+
+# 数据按日更新，同一参数1小时内重复分析直接复用结果
+@cache_result(ttl=3600, maxsize=256, copy_result=True)
 def fetch_northbound_data(symbol: str, market: str = "sh") -> Dict[str, Any]:
     """
     获取个股北向资金数据
@@ -46,46 +115,23 @@ def fetch_northbound_data(symbol: str, market: str = "sh") -> Dict[str, Any]:
     # 1. 获取个股北向持股数据
     try:
         market_name = "沪股通" if market == "sh" else "深股通"
-        df = ak.stock_hsgt_hold_stock_em(market=market_name, indicator="今日排行")
-        if df is not None and not df.empty and '代码' in df.columns:
-            df_stock = df[df['代码'] == symbol]
-            if not df_stock.empty:
-                row = df_stock.iloc[0]
-                result["individual"] = {
-                    "name": str(row.get("名称", "")),
-                    "close_price": float(row.get("今日收盘价", 0) or 0),
-                    "change_pct": float(row.get("今日涨跌幅", 0) or 0),
-                    "hold_shares": float(row.get("今日持股-股数", 0) or 0),
-                    "hold_value": float(row.get("今日持股-市值", 0) or 0),
-                    "hold_ratio_float": float(row.get("今日持股-占流通股比", 0) or 0),
-                    "hold_ratio_total": float(row.get("今日持股-占总股本比", 0) or 0),
-                    "change_shares": float(row.get("今日增持估计-股数", 0) or 0),
-                    "change_value": float(row.get("今日增持估计-市值", 0) or 0),
-                    "change_value_pct": float(row.get("今日增持估计-市值增幅", 0) or 0),
-                    "board": str(row.get("所属板块", "")),
-                    "date": str(row.get("日期", "")),
-                }
-                logger.info(f"[northbound] {symbol} 北向持股占流通股比: {result['individual'].get('hold_ratio_float', 0)}%")
+        df = _fetch_hold_ranking(market_name)
+        if has_rows(df, '代码') and symbol in df.index:
+            result["individual"] = frame_to_records(df.loc[[symbol]].iloc[:1], _HOLD_FIELDS)[0]
+            logger.info(f"[northbound] {symbol} 北向持股占流通股比: {result['individual'].get('hold_ratio_float', 0)}%")
     except Exception as e:
         logger.warning(f"[northbound] 获取个股北向持股失败: {e}")
+        skip_cache()
 
     # 2. 获取北向资金整体流向（最近几天）
     try:
-        df_flow = ak.stock_hsgt_hist_em(symbol="北向资金")
+        df_flow = _fetch_flow_history()
         if df_flow is not None and not df_flow.empty:
             recent = df_flow.tail(10)
-            flow_list = []
-            for _, row in recent.iterrows():
-                flow_list.append({
-                    "date": str(row.get("日期", "")),
-                    "net_buy": float(row.get("当日成交净买额", 0) or 0),
-                    "buy_amount": float(row.get("买入成交额", 0) or 0),
-                    "sell_amount": float(row.get("卖出成交额", 0) or 0),
-                    "cumulative": float(row.get("历史累计净买额", 0) or 0),
-                })
-            result["overall_flow"] = flow_list
+            result["overall_flow"] = frame_to_records(recent, _FLOW_FIELDS)
     except Exception as e:
         logger.warning(f"[northbound] 获取北向资金整体流向失败: {e}")
+        skip_cache()
 
     # 3. 分析
     result["analysis"] = _analyze_northbound(result)
@@ -105,6 +151,9 @@ def _analyze_northbound(data: Dict[str, Any]) -> Dict[str, Any]:
     individual = data.get("individual", {})
     overall_flow = data.get("overall_flow", [])
 
+    if not individual and not overall_flow:
+        return analysis
+
     parts = []
 
     # 个股持股分析
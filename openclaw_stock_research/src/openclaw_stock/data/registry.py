@@ -0,0 +1,97 @@
+"""
+个股附加数据源注册表
+
+声明 analyze_stock 并发获取的9大附加数据源：结果字段、日志名称、获取函数及参数。
+调用方遍历 DATA_SOURCES 统一提交、收集，新增数据源只需在此登记；
+fetch_data_sources 批量获取多只股票的附加数据
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from importlib import import_module
+from typing import Any, Callable, Dict, List, Mapping, Sequence, Tuple
+
+from ..utils.http_session import enable_shared_session_if_configured
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class DataSource:
+    """
+    单个附加数据源
+
+    获取函数按名称从 openclaw_stock.data 包解析（调用时解析，随包的懒加载导入子模块，
+    替换包中的同名函数即可替换数据源）
+    """
+
+    key: str                      # analyze_stock 结果中的字段名
+    label: str                    # 日志中的名称
+    fetcher: str                  # openclaw_stock.data 中的获取函数名
+    with_market: bool = False     # 是否传入 market 参数
+    options: Mapping[str, Any] = field(default_factory=dict)  # 固定的其余参数
+
+    def resolve(self) -> Callable[..., Dict[str, Any]]:
+        """取得获取函数"""
+        return getattr(import_module(__package__), self.fetcher)
+
+    def kwargs(self, symbol: str, market: str) -> Dict[str, Any]:
+        """调用获取函数的关键字参数"""
+        if self.with_market:
+            return {"symbol": symbol, "market": market, **self.options}
+        return {"symbol": symbol, **self.options}
+
+
+# 按报告输出顺序登记
+DATA_SOURCES: Tuple[DataSource, ...] = (
+    DataSource("lhb_analysis", "龙虎榜分析", "fetch_lhb_data", options={"days": 90}),
+    DataSource("margin_analysis", "融资融券分析", "fetch_margin_data", options={"days": 30}),
+    DataSource("northbound_analysis", "北向资金分析", "fetch_northbound_data", with_market=True),
+    DataSource("block_trade_analysis", "大宗交易分析", "fetch_block_trade_data", options={"days": 90}),
+    DataSource("shareholder_analysis", "股东人数分析", "fetch_shareholder_data"),
+    DataSource("institution_analysis", "机构持仓分析", "fetch_institution_data"),
+    DataSource("restricted_shares_analysis", "限售解禁分析", "fetch_restricted_shares_data"),
+    DataSource("industry_compare_analysis", "行业对比分析", "fetch_industry_compare_data"),
+    DataSource("dividend_analysis", "分红送转分析", "fetch_dividend_data"),
+)
+
+
+def fetch_data_sources(
+    symbols: List[str],
+    market: str = "sh",
+    sources: Sequence[DataSource] = DATA_SOURCES,
+    max_workers: int = 16
+) -> Dict[str, Dict[str, Any]]:
+    """
+    批量获取多只股票的附加数据
+
+    所有 (股票, 数据源) 请求提交到同一线程池并发执行，按股票展开请求，
+    不必等一只股票的数据源全部返回再开始下一只；全市场数据（大宗交易明细、季度机构持仓等）
+    由各数据源自身的缓存在股票间共享。
+
+    参数:
+        symbols: 股票代码列表
+        market: 市场类型
+        sources: 获取的数据源，默认为全部附加数据源
+        max_workers: 最大并发线程数
+
+    返回:
+        {symbol: {数据源字段: 结果}}，获取失败的数据源记录日志后不写入
+    """
+    # 配置 SHARED_HTTP_SESSION 时各数据源接口改走连接池会话
+    enable_shared_session_if_configured()
+    results: Dict[str, Dict[str, Any]] = {symbol: {} for symbol in symbols}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            (symbol, source, executor.submit(source.resolve(), **source.kwargs(symbol, market)))
+            for symbol in symbols
+            for source in sources
+        ]
+        for symbol, source, future in futures:
+            error = future.exception()
+            if error is None:
+                results[symbol][source.key] = future.result()
+            else:
+                logger.warning(f"[{symbol}] {source.label}失败: {error}")
+    return results
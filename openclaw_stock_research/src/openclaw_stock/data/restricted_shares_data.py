@@ -4,11 +4,15 @@
 获取个股限售股解禁计划，分析解禁压力
 """
 
+import heapq
 from typing import Dict, Any, List
 from datetime import datetime, timedelta
 import pandas as pd
 
 from ..utils.logger import get_logger
+from ..utils.decorators import cache_result, skip_cache
+from ..utils.file_cache import FileCache
+from .utils import frame_to_records
 
 try:
     import akshare as ak
@@ -17,7 +21,36 @@ except ImportError:
 
 logger = get_logger(__name__)
 
+# 解禁计划记录字段：(输出键, akshare列名, 类型)
+_SCHEDULE_FIELDS = (
+    ("date", "解禁时间", str),
+    ("shareholder_count", "解禁股东数", int),
+    ("shares", "解禁数量", float),
+    ("actual_shares", "实际解禁数量", float),
+    ("unreleased_shares", "未解禁数量", float),
+    ("market_value", "实际解禁数量市值", float),
+    ("total_ratio", "占总市值比例", float),
+    ("float_ratio", "占流通市值比例", float),
+    ("type", "限售股类型", str),
+    ("pre_close", "解禁前一交易日收盘价", float),
+)
+
+# 解禁计划按日更新，原始数据落盘1天跨进程复用
+_RESTRICTED_FILE_CACHE = FileCache("restricted", ttl=86400)
+
+
+def _fetch_release_queue(symbol: str) -> pd.DataFrame:
+    """获取个股限售解禁计划（先读磁盘缓存）"""
+    df = _RESTRICTED_FILE_CACHE.get(symbol)
+    if df is None:
+        df = ak.stock_restricted_release_queue_em(symbol=symbol)
+        if df is not None and not df.empty:
+            _RESTRICTED_FILE_CACHE.set(symbol, df)
+    return df
 
+
+# 数据按日更新，同一参数1小时内重复分析直接复用结果
+@cache_result(ttl=3600, maxsize=256, copy_result=True)
 def fetch_restricted_shares_data(symbol: str) -> Dict[str, Any]:
     """
     获取个股限售解禁数据
@@ -43,46 +76,27 @@ def fetch_restricted_shares_data(symbol: str) -> Dict[str, Any]:
     }
 
     try:
-        df = ak.stock_restricted_release_queue_em(symbol=symbol)
+        df = _fetch_release_queue(symbol)
         if df is not None and not df.empty:
-            records = []
-            for _, row in df.iterrows():
-                record = {
-                    "date": str(row.get("解禁时间", "")),
-                    "shareholder_count": int(row.get("解禁股东数", 0) or 0),
-                    "shares": float(row.get("解禁数量", 0) or 0),
-                    "actual_shares": float(row.get("实际解禁数量", 0) or 0),
-                    "unreleased_shares": float(row.get("未解禁数量", 0) or 0),
-                    "market_value": float(row.get("实际解禁数量市值", 0) or 0),
-                    "total_ratio": float(row.get("占总市值比例", 0) or 0),
-                    "float_ratio": float(row.get("占流通市值比例", 0) or 0),
-                    "type": str(row.get("限售股类型", "")),
-                    "pre_close": float(row.get("解禁前一交易日收盘价", 0) or 0),
-                }
-                records.append(record)
+            records = frame_to_records(df, _SCHEDULE_FIELDS)
 
             result["schedule"] = records
 
-            # 找出未来的解禁
-            now = datetime.now()
-            upcoming = []
-            for r in records:
-                try:
-                    release_date = datetime.strptime(r["date"], "%Y-%m-%d")
-                    if release_date > now:
-                        upcoming.append(r)
-                except (ValueError, TypeError):
-                    continue
+            # 找出未来的解禁（解禁日期整列解析一次，无法解析的为NaT、不计入）
+            release_dates = pd.to_datetime([r["date"] for r in records], format="%Y-%m-%d", errors="coerce")
+            is_future = release_dates > datetime.now()
+            upcoming = [r for r, future in zip(records, is_future) if future]
 
             if upcoming:
-                # 按日期排序，最近的在前
-                upcoming.sort(key=lambda x: x["date"])
-                result["upcoming"] = upcoming[0]  # 最近一次解禁
-                result["upcoming_list"] = upcoming[:3]  # 最近3次
+                # 只取最近3次（最近的在前），不必整表排序
+                nearest = heapq.nsmallest(3, upcoming, key=lambda x: x["date"])
+                result["upcoming"] = nearest[0]  # 最近一次解禁
+                result["upcoming_list"] = nearest  # 最近3次
 
             logger.info(f"[restricted] {symbol} 共{len(records)}次解禁记录，未来{len(upcoming)}次")
     except Exception as e:
         logger.warning(f"[restricted] 获取限售解禁数据失败: {e}")
+        skip_cache()
 
     # 分析
     result["analysis"] = _analyze_restricted(result)
@@ -4,11 +4,16 @@
 获取个股股东户数变化、户均持股等数据，分析筹码集中度
 """
 
+from bisect import bisect_right
+import heapq
 from typing import Dict, Any, List
 from datetime import datetime
 import pandas as pd
 
 from ..utils.logger import get_logger
+from ..utils.decorators import cache_result, skip_cache
+from ..utils.file_cache import FileCache
+from .utils import frame_to_records
 
 try:
     import akshare as ak
@@ -17,7 +22,36 @@ except ImportError:
 
 logger = get_logger(__name__)
 
+# 股东户数记录字段：(输出键, akshare列名, 类型)
+_HOLDER_FIELDS = (
+    ("date", "股东户数统计截止日", str),
+    ("holder_count", "股东户数-本次", int),
+    ("holder_count_prev", "股东户数-上次", int),
+    ("holder_change", "股东户数-增减", int),
+    ("holder_change_pct", "股东户数-增减比例", float),
+    ("avg_hold_value", "户均持股市值", float),
+    ("avg_hold_shares", "户均持股数量", float),
+    ("total_market_cap", "总市值", float),
+    ("total_shares", "总股本", float),
+    ("price_change_pct", "区间涨跌幅", float),
+)
+
+# 股东户数按季度/不定期披露，原始数据落盘1天跨进程复用
+_SHAREHOLDER_FILE_CACHE = FileCache("shareholder", ttl=86400)
+
+
+def _fetch_holder_detail(symbol: str) -> pd.DataFrame:
+    """获取个股股东户数明细（先读磁盘缓存）"""
+    df = _SHAREHOLDER_FILE_CACHE.get(symbol)
+    if df is None:
+        df = ak.stock_zh_a_gdhs_detail_em(symbol=symbol)
+        if df is not None and not df.empty:
+            _SHAREHOLDER_FILE_CACHE.set(symbol, df)
+    return df
 
+
+# 数据按日更新，同一参数1小时内重复分析直接复用结果
+@cache_result(ttl=3600, maxsize=256, copy_result=True)
 def fetch_shareholder_data(symbol: str) -> Dict[str, Any]:
     """
     获取个股股东人数变化数据
@@ -43,34 +77,21 @@ def fetch_shareholder_data(symbol: str) -> Dict[str, Any]:
     }
 
     try:
-        df = ak.stock_zh_a_gdhs_detail_em(symbol=symbol)
+        df = _fetch_holder_detail(symbol)
         if df is not None and not df.empty:
-            records = []
-            for _, row in df.iterrows():
-                record = {
-                    "date": str(row.get("股东户数统计截止日", "")),
-                    "holder_count": int(row.get("股东户数-本次", 0) or 0),
-                    "holder_count_prev": int(row.get("股东户数-上次", 0) or 0),
-                    "holder_change": int(row.get("股东户数-增减", 0) or 0),
-                    "holder_change_pct": float(row.get("股东户数-增减比例", 0) or 0),
-                    "avg_hold_value": float(row.get("户均持股市值", 0) or 0),
-                    "avg_hold_shares": float(row.get("户均持股数量", 0) or 0),
-                    "total_market_cap": float(row.get("总市值", 0) or 0),
-                    "total_shares": float(row.get("总股本", 0) or 0),
-                    "price_change_pct": float(row.get("区间涨跌幅", 0) or 0),
-                }
-                records.append(record)
-
-            # 按日期排序（最新在前）
-            records.sort(key=lambda x: x["date"], reverse=True)
-
-            if records:
-                result["latest"] = records[0]
-                result["history"] = records[:8]  # 最近8期
+            records = frame_to_records(df, _HOLDER_FIELDS)
+
+            # 只取最近8期（最新在前），不必整表排序
+            history = heapq.nlargest(8, records, key=lambda x: x["date"])
+
+            if history:
+                result["latest"] = history[0]
+                result["history"] = history  # 最近8期
 
             logger.info(f"[shareholder] {symbol} 获取到 {len(records)} 期股东数据")
     except Exception as e:
         logger.warning(f"[shareholder] 获取股东人数数据失败: {e}")
+        skip_cache()
 
     # 分析
     result["analysis"] = _analyze_shareholder(result)
@@ -78,6 +99,17 @@ def fetch_shareholder_data(symbol: str) -> Dict[str, Any]:
     return result
 
 
+# 股东人数变化率下界（含）与对应的筹码状态、信号及描述：<-10、<-3、<3、<10、其余
+_HOLDER_CHANGE_BOUNDS = (-10, -3, 3, 10)
+_HOLDER_CHANGE_LEVELS = (
+    ("快速集中", "看多", "股东人数大幅减少{:.2f}%，筹码快速集中"),
+    ("逐步集中", "偏多", "股东人数减少{:.2f}%，筹码逐步集中"),
+    ("基本稳定", "中性", "股东人数变化{:.2f}%，筹码基本稳定"),
+    ("逐步分散", "偏空", "股东人数增加{:.2f}%，筹码逐步分散"),
+    ("快速分散", "看空", "股东人数大幅增加{:.2f}%，筹码快速分散"),
+)
+
+
 def _analyze_shareholder(data: Dict[str, Any]) -> Dict[str, Any]:
     """分析股东人数变化"""
     analysis = {
@@ -107,26 +139,10 @@ def _analyze_shareholder(data: Dict[str, Any]) -> Dict[str, Any]:
         parts.append(f"户均持股市值{avg_hold_value:,.0f}元")
 
     # 变化趋势
-    if holder_change_pct < -10:
-        analysis["chip_concentration"] = "快速集中"
-        analysis["signal"] = "看多"
-        parts.append(f"股东人数大幅减少{holder_change_pct:.2f}%，筹码快速集中")
-    elif holder_change_pct < -3:
-        analysis["chip_concentration"] = "逐步集中"
-        analysis["signal"] = "偏多"
-        parts.append(f"股东人数减少{holder_change_pct:.2f}%，筹码逐步集中")
-    elif holder_change_pct < 3:
-        analysis["chip_concentration"] = "基本稳定"
-        analysis["signal"] = "中性"
-        parts.append(f"股东人数变化{holder_change_pct:.2f}%，筹码基本稳定")
-    elif holder_change_pct < 10:
-        analysis["chip_concentration"] = "逐步分散"
-        analysis["signal"] = "偏空"
-        parts.append(f"股东人数增加{holder_change_pct:.2f}%，筹码逐步分散")
-    else:
-        analysis["chip_concentration"] = "快速分散"
-        analysis["signal"] = "看空"
-        parts.append(f"股东人数大幅增加{holder_change_pct:.2f}%，筹码快速分散")
+    concentration, signal, template = _HOLDER_CHANGE_LEVELS[bisect_right(_HOLDER_CHANGE_BOUNDS, holder_change_pct)]
+    analysis["chip_concentration"] = concentration
+    analysis["signal"] = signal
+    parts.append(template.format(holder_change_pct))
 
     # 连续趋势
     if len(history) >= 3:
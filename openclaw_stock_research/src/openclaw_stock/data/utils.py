@@ -1,10 +1,15 @@
 """
 数据工具函数模块
 
-提供股票代码验证、格式化等通用工具函数
+提供股票代码验证、格式化及DataFrame转换等通用工具函数
 """
 
-from typing import Literal, Optional
+import re
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
 from ..core.exceptions import SymbolNotFoundError
 
 
@@ -116,3 +121,122 @@ def normalize_symbol(symbol: str) -> tuple[str, str]:
     # 没有前缀，自动判断
     market = get_market_by_symbol(symbol)
     return symbol, market
+
+
+# akshare 不同版本的列名可能夹带空白或使用全角/长破折号，统一为半角"-"后再按列名取值
+_COLUMN_NOISE = re.compile(r"\s+|[－—–]")
+
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    规范化列名：去除空白，破折号统一为半角"-"
+
+    Args:
+        df: 原始数据
+
+    Returns:
+        pd.DataFrame: 列名规范化后的数据（列名已规范时返回原对象）
+    """
+    columns = [_COLUMN_NOISE.sub(lambda m: "" if m.group().isspace() else "-", str(col)) for col in df.columns]
+    if columns == list(df.columns):
+        return df
+    return df.set_axis(columns, axis=1)
+
+
+def frame_to_records(
+    df: pd.DataFrame,
+    fields: Sequence[Tuple[str, str, type]]
+) -> List[Dict[str, Any]]:
+    """
+    按列转换DataFrame为记录列表（替代逐行 iterrows）
+
+    Args:
+        df: 原始数据（akshare返回的中文列）
+        fields: (输出键, 源列名, float/int/str) 序列，决定记录中的键及其顺序；
+            float/int列无法解析或缺失的值为0，str列逐个str()，源列不存在时为0/""
+
+    Returns:
+        list: 每行一个字典的记录列表
+    """
+    columns = {}
+    for key, column, kind in fields:
+        if kind is float:
+            columns[key] = numeric_column(df, column)
+        elif kind is int:
+            columns[key] = numeric_column(df, column).astype(np.int64)
+        elif column in df.columns:
+            columns[key] = df[column].map(str)
+        else:
+            columns[key] = ""
+    return pd.DataFrame(columns, index=df.index).to_dict(orient="records")
+
+
+def numeric_column(df: pd.DataFrame, column: str) -> np.ndarray:
+    """
+    取出数值列为float64数组，无法解析或缺失的值为0.0
+
+    Args:
+        df: 原始数据
+        column: 列名，不存在时返回全0数组
+
+    Returns:
+        np.ndarray: 长度与df行数相同的float64数组
+    """
+    if column not in df.columns:
+        return np.zeros(len(df))
+    series = df[column]
+    if series.dtype != np.float64:
+        series = pd.to_numeric(series, errors="coerce")
+    return series.fillna(0.0).to_numpy(dtype=np.float64)
+
+
+def coerce_numeric(df: pd.DataFrame, columns: Sequence[str]) -> pd.DataFrame:
+    """
+    一次性将数值列转换为float64（无法解析或缺失的值为0.0）
+
+    akshare返回的数值列常为object类型，同一列被记录转换和统计计算多次读取时，
+    先按列转换一次，之后的 numeric_column 直接取数组
+
+    Args:
+        df: 原始数据
+        columns: 需转换的列名，不存在的列跳过
+
+    Returns:
+        pd.DataFrame: 转换后的新数据（其余列不变）
+    """
+    present = [column for column in columns if column in df.columns]
+    if not present:
+        return df
+    return df.assign(**{column: numeric_column(df, column) for column in present})
+
+
+def has_rows(df: Optional[pd.DataFrame], column: Optional[str] = None) -> bool:
+    """
+    判断akshare返回的数据是否可用：非None、有数据行，且包含指定列
+
+    Args:
+        df: akshare返回的数据（可能为None）
+        column: 必须存在的列名（如股票代码列），为None时不检查
+
+    Returns:
+        bool: 是否可继续处理
+    """
+    return df is not None and len(df) > 0 and (column is None or column in df.columns)
+
+
+def filter_by_symbol(df: pd.DataFrame, column: str, symbol: str) -> pd.DataFrame:
+    """
+    从全市场数据中筛选单只股票的行
+
+    直接在列的NumPy数组上比较并按位置取行，避免布尔Series索引的对齐开销
+
+    Args:
+        df: 全市场数据
+        column: 股票代码列名
+        symbol: 股票代码
+
+    Returns:
+        pd.DataFrame: 该股票的行（可能为空）
+    """
+    mask = df[column].to_numpy() == symbol
+    return df.iloc[mask.nonzero()[0]]
@@ -4,19 +4,35 @@ OpenClaw工具装饰器定义
 提供工具注册、环境变量检查、日志记录、重试等功能
 """
 
+from collections import OrderedDict
+from concurrent.futures import Future
 from functools import wraps
-from typing import Callable, Any, List, TypeVar, Optional
+from typing import Callable, Any, Dict, List, TypeVar, Optional
+import inspect
 import os
+import pickle
+import threading
 import time
 import logging
 from datetime import datetime
 
+try:
+    from numba import njit as _numba_njit
+except ImportError:
+    _numba_njit = None
+
 # 获取日志记录器
 logger = logging.getLogger("openclaw_stock.decorators")
 
+# numba 为可选依赖（pip install openclaw-stock-research[perf]），未安装时 jit_compile 不做任何处理
+NUMBA_AVAILABLE = _numba_njit is not None
+
 # 类型变量
 F = TypeVar("F", bound=Callable[..., Any])
 
+# cache_result 的"本次结果不缓存"标记（按线程记录，嵌套的缓存函数各自保存、恢复）
+_cache_skip = threading.local()
+
 
 def tool(name: str, description: str) -> Callable[[F], F]:
     """
@@ -205,72 +221,178 @@ def retry(
     return decorator
 
 
+def skip_cache() -> None:
+    """
+    在被 cache_result 装饰的函数内调用：本次结果照常返回，但不写入缓存
+
+    用于捕获异常后返回部分/空结果的数据获取函数，避免数据源故障期间的结果被当作真实数据缓存
+    """
+    _cache_skip.active = True
+
+
 def cache_result(
     cache_key_func: Optional[Callable[..., str]] = None,
-    ttl: float = 300.0
+    ttl: float = 300.0,
+    maxsize: Optional[int] = None,
+    daily: bool = False,
+    copy_result: bool = False
 ) -> Callable[[F], F]:
     """
     结果缓存装饰器
 
-    缓存函数的执行结果，在指定时间内直接返回缓存值
+    缓存函数的执行结果，在指定时间内直接返回缓存值；
+    函数执行中调用了 skip_cache() 时该次结果不缓存。
+    多线程同时以相同参数未命中缓存时只执行一次，其余线程等待并共享该次结果（或异常）
 
     参数:
-        cache_key_func: 自定义缓存键生成函数，默认为函数名+参数哈希
+        cache_key_func: 自定义缓存键生成函数，默认为函数名+参数（按函数签名归一化）
         ttl: 缓存有效期（秒），默认为300秒（5分钟）
+        maxsize: 最大缓存条目数，超出时淘汰最久未使用的条目，默认为None（不限制）
+        daily: 是否仅当天有效（跨日后自动失效，适合按日更新的数据），默认为False
+        copy_result: 是否以pickle字节缓存、每次返回独立副本（调用方修改结果不影响缓存），默认为False
 
     示例:
-        @cache_result(ttl=60.0)
+        @cache_result(ttl=60.0, maxsize=128)
         def get_stock_price(symbol: str):
             ...
     """
-    _cache: Dict[str, tuple] = {}
+    _cache: "OrderedDict[str, tuple]" = OrderedDict()
+    _inflight: Dict[str, Future] = {}
+    _lock = threading.Lock()
+
+    def is_fresh(cached_time: float, now: float) -> bool:
+        if now - cached_time >= ttl:
+            return False
+        return not daily or datetime.fromtimestamp(cached_time).date() == datetime.fromtimestamp(now).date()
 
     def decorator(func: F) -> F:
-        @wraps(func)
-        def wrapper(*args: Any, **kwargs: Any) -> Any:
-            # 生成缓存键
+        try:
+            signature: Optional[inspect.Signature] = inspect.signature(func)
+        except (TypeError, ValueError):
+            signature = None
+
+        def make_key(*args: Any, **kwargs: Any) -> str:
             if cache_key_func:
-                key = cache_key_func(*args, **kwargs)
-            else:
-                # 默认缓存键: 函数名+参数哈希
-                args_str = ",".join(str(a) for a in args)
-                kwargs_str = ",".join(f"{k}={v}" for k, v in sorted(kwargs.items()))
-                key = f"{func.__name__}({args_str},{kwargs_str})"
+                return cache_key_func(*args, **kwargs)
 
-            now = time.time()
+            # 默认缓存键: 函数名+参数，位置参数与关键字参数归一化后键一致
+            if signature is not None:
+                try:
+                    bound = signature.bind(*args, **kwargs)
+                    bound.apply_defaults()
+                    args_str = ",".join(f"{k}={v}" for k, v in bound.arguments.items())
+                    return f"{func.__name__}({args_str})"
+                except TypeError:
+                    pass
+            args_str = ",".join(str(a) for a in args)
+            kwargs_str = ",".join(f"{k}={v}" for k, v in sorted(kwargs.items()))
+            return f"{func.__name__}({args_str},{kwargs_str})"
 
-            # 检查缓存
-            if key in _cache:
-                cached_value, cached_time = _cache[key]
-                if now - cached_time < ttl:
-                    logger.debug(f"[cache_result] 命中缓存: {key}")
-                    return cached_value
-                else:
-                    logger.debug(f"[cache_result] 缓存过期: {key}")
-                    del _cache[key]
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = make_key(*args, **kwargs)
+            now = time.time()
 
-            # 执行函数并缓存结果
-            result = func(*args, **kwargs)
-            _cache[key] = (result, now)
-            logger.debug(f"[cache_result] 缓存结果: {key}")
+            # 检查缓存；未命中且同键已有线程在执行时，等待其结果而不重复执行
+            with _lock:
+                if key in _cache:
+                    cached_value, cached_time = _cache[key]
+                    if is_fresh(cached_time, now):
+                        _cache.move_to_end(key)
+                        logger.debug(f"[cache_result] 命中缓存: {key}")
+                        return pickle.loads(cached_value) if copy_result else cached_value
+                    else:
+                        logger.debug(f"[cache_result] 缓存过期: {key}")
+                        del _cache[key]
+                future = _inflight.get(key)
+                is_owner = future is None
+                if is_owner:
+                    future = Future()
+                    _inflight[key] = future
+
+            if not is_owner:
+                logger.debug(f"[cache_result] 等待进行中的调用: {key}")
+                shared_value = future.result()
+                return pickle.loads(shared_value) if copy_result else shared_value
+
+            # 执行函数并缓存结果（执行结果/异常同时交给等待中的线程，即使本次结果不缓存）
+            outer_skip = getattr(_cache_skip, "active", False)
+            _cache_skip.active = False
+            try:
+                try:
+                    result = func(*args, **kwargs)
+                    skipped = _cache_skip.active
+                finally:
+                    _cache_skip.active = outer_skip
+                cached_value = pickle.dumps(result) if copy_result else result
+            except BaseException as e:
+                with _lock:
+                    _inflight.pop(key, None)
+                future.set_exception(e)
+                raise
 
+            with _lock:
+                if not skipped:
+                    _cache[key] = (cached_value, now)
+                    _cache.move_to_end(key)
+                    if maxsize is not None:
+                        while len(_cache) > maxsize:
+                            _cache.popitem(last=False)
+                _inflight.pop(key, None)
+            future.set_result(cached_value)
+            logger.debug(f"[cache_result] {'本次结果不缓存' if skipped else '缓存结果'}: {key}")
+
+            # copy_result 时缓存的是字节，本次结果本身即独立于缓存
             return result
 
         # 添加清除缓存的方法
         def clear_cache():
             """清除该函数的所有缓存"""
-            keys_to_remove = [k for k in _cache if k.startswith(f"{func.__name__}(")]
-            for key in keys_to_remove:
-                del _cache[key]
+            with _lock:
+                keys_to_remove = [k for k in _cache if k.startswith(f"{func.__name__}(")]
+                for key in keys_to_remove:
+                    del _cache[key]
             logger.debug(f"[cache_result] 清除 {len(keys_to_remove)} 个缓存项")
 
+        def is_cached(*args: Any, **kwargs: Any) -> bool:
+            """判断给定参数的结果是否已缓存且未过期（不执行函数）"""
+            key = make_key(*args, **kwargs)
+            with _lock:
+                entry = _cache.get(key)
+            return entry is not None and is_fresh(entry[1], time.time())
+
         wrapper.clear_cache = clear_cache  # type: ignore
+        wrapper.is_cached = is_cached  # type: ignore
 
         return wrapper  # type: ignore
 
     return decorator
 
 
+def jit_compile(**options: Any) -> Callable[[F], F]:
+    """
+    可选的numba JIT编译装饰器
+
+    numba可用时使用 numba.njit(**options) 编译函数，未安装时原样返回、按纯Python执行。
+    被装饰的函数只能使用numba支持的写法（标量循环、ndarray索引与创建），
+    调用方可根据 NUMBA_AVAILABLE 决定走编译内核还是NumPy向量化实现。
+
+    参数:
+        **options: 透传给 numba.njit 的编译选项，如 cache=True
+
+    示例:
+        @jit_compile(cache=True)
+        def window_sum(arr, start, end):
+            ...
+    """
+    def decorator(func: F) -> F:
+        if _numba_njit is None:
+            return func
+        return _numba_njit(**options)(func)  # type: ignore
+
+    return decorator
+
+
 # 导出所有装饰器
 __all__ = [
     "tool",
@@ -278,4 +400,7 @@ __all__ = [
     "log_execution",
     "retry",
     "cache_result",
+    "skip_cache",
+    "jit_compile",
+    "NUMBA_AVAILABLE",
 ]
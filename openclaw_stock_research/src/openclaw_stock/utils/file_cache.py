@@ -0,0 +1,128 @@
+"""
+磁盘文件缓存模块
+
+将接口返回结果（DataFrame等可pickle对象）持久化到 AKSHARE_DATA_PATH 下，
+跨进程复用，避免重复请求数据源。未设置 AKSHARE_DATA_PATH 时缓存不生效。
+"""
+
+import os
+import pickle
+import re
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from ..core.config import get_config
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# 缓存键中不能用于文件名的字符
+_UNSAFE_KEY_CHARS = re.compile(r"[^0-9A-Za-z_.\-]")
+
+
+class FileCache:
+    """
+    基于pickle文件的磁盘缓存
+
+    每个缓存项保存为 {AKSHARE_DATA_PATH}/{namespace}/{key}.pkl，
+    按文件修改时间判断是否过期；读写失败只记录日志，不影响调用方。
+
+    参数:
+        namespace: 缓存命名空间（子目录名）
+        ttl: 有效期（秒），默认为None（不按时长过期）
+        daily: 是否仅当天有效（跨日后自动失效），默认为False
+
+    示例:
+        cache = FileCache("chip", ttl=1800, daily=True)
+        df = cache.get("601127_qfq")
+        if df is None:
+            df = fetch(...)
+            cache.set("601127_qfq", df)
+    """
+
+    def __init__(self, namespace: str, ttl: Optional[float] = None, daily: bool = False):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.daily = daily
+
+    def _cache_dir(self) -> Optional[Path]:
+        """缓存目录，未配置 AKSHARE_DATA_PATH 时返回None"""
+        base = get_config().get_akshare_cache_path()
+        if not base:
+            return None
+        return Path(base) / self.namespace
+
+    def _cache_file(self, cache_dir: Path, key: str) -> Path:
+        return cache_dir / f"{_UNSAFE_KEY_CHARS.sub('_', key)}.pkl"
+
+    def _is_fresh(self, path: Path) -> bool:
+        mtime = path.stat().st_mtime
+        if self.ttl is not None and time.time() - mtime >= self.ttl:
+            return False
+        if self.daily and datetime.fromtimestamp(mtime).date() != date.today():
+            return False
+        return True
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取缓存，未命中、已过期或读取失败时返回None"""
+        cache_dir = self._cache_dir()
+        if cache_dir is None:
+            return None
+
+        path = self._cache_file(cache_dir, key)
+        try:
+            if not path.exists() or not self._is_fresh(path):
+                return None
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            logger.debug(f"[FileCache] 命中磁盘缓存: {self.namespace}/{key}")
+            return value
+        except Exception as e:
+            logger.warning(f"[FileCache] 读取缓存失败 {path}: {e}")
+            return None
+
+    def contains(self, key: str) -> bool:
+        """判断缓存是否存在且未过期（不读取内容）"""
+        cache_dir = self._cache_dir()
+        if cache_dir is None:
+            return False
+
+        path = self._cache_file(cache_dir, key)
+        try:
+            return path.exists() and self._is_fresh(path)
+        except OSError:
+            return False
+
+    def set(self, key: str, value: Any) -> None:
+        """写入缓存（先写临时文件再替换，避免并发读到半个文件）"""
+        cache_dir = self._cache_dir()
+        if cache_dir is None:
+            return
+
+        path = self._cache_file(cache_dir, key)
+        tmp_path = path.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            logger.debug(f"[FileCache] 写入磁盘缓存: {self.namespace}/{key}")
+        except Exception as e:
+            logger.warning(f"[FileCache] 写入缓存失败 {path}: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    def clear(self) -> int:
+        """清除该命名空间下的所有缓存，返回删除的文件数"""
+        cache_dir = self._cache_dir()
+        if cache_dir is None or not cache_dir.exists():
+            return 0
+
+        removed = 0
+        for path in cache_dir.glob("*.pkl"):
+            path.unlink(missing_ok=True)
+            removed += 1
+        logger.debug(f"[FileCache] 清除 {self.namespace} 下 {removed} 个缓存文件")
+        return removed
@@ -0,0 +1,199 @@
+"""
+共享HTTP会话模块
+
+akshare 的各接口模块直接调用 requests.get，每次请求都新建 TCP/TLS 连接。
+显式启用后（enable_shared_session，或设置环境变量 SHARED_HTTP_SESSION=1），
+将这些模块内的 requests 引用替换为走连接池会话的代理，
+批量分析多只股票时复用到数据源的长连接；安装了 orjson 时，
+经共享会话的响应 json() 改用 orjson 解析。
+
+注意：
+- 会话按线程创建（threading.local），各线程的 Cookie 互不共享；
+  连接池（HTTPAdapter）为进程内共享，analyze_stock 每次新建的线程池结束后，
+  已建立的长连接仍留在池中供后续线程复用
+- 会话的 HTTPAdapter 设置了 max_retries=2，连接建立失败时会自动重试2次，
+  与直接调用 requests.get（不重试）的行为不同
+- 导入本模块或 akshare 不会替换任何引用，disable_shared_session 可恢复原始 requests
+"""
+
+import sys
+import threading
+from typing import Any, Dict, Optional
+
+from ..core.config import get_config
+from .logger import get_logger
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+# 可选依赖（perf）：orjson 直接解析响应字节，比标准库json快
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+logger = get_logger(__name__)
+
+# 连接池大小：覆盖 fetch_data_sources 的并发线程数
+_POOL_SIZE = 32
+# 连接级重试次数（HTTPAdapter.max_retries）
+_MAX_RETRIES = 2
+
+# 各数据源使用的 akshare 接口
+AKSHARE_ENDPOINTS = (
+    "stock_cyq_em",
+    "stock_lhb_detail_em",
+    "stock_lhb_jgmmtj_em",
+    "stock_fhps_detail_em",
+    "stock_history_dividend_detail",
+    "stock_hsgt_hold_stock_em",
+    "stock_hsgt_hist_em",
+    "stock_institute_hold",
+    "stock_individual_info_em",
+    "stock_board_industry_cons_em",
+    "stock_restricted_release_queue_em",
+    "stock_dzjy_mrmx",
+    "stock_dzjy_mrtj",
+    "stock_zh_a_gdhs_detail_em",
+    "stock_margin_detail_sse",
+    "stock_margin_detail_szse",
+)
+
+_local = threading.local()
+_install_lock = threading.Lock()
+# 各线程会话共用的 HTTPAdapter（首次创建会话时创建）
+_adapter: Optional[Any] = None
+_adapter_lock = threading.Lock()
+# 已替换的模块 -> 原始 requests 引用，供 disable_shared_session 恢复
+_patched: Dict[str, Any] = {}
+
+
+class PooledRequests:
+    """替代 akshare 模块内的 requests 引用：get 走当前线程的会话，其余属性透传给 requests"""
+
+    def __init__(self, requests_module: Any):
+        self._requests = requests_module
+
+    def get(self, *args: Any, **kwargs: Any) -> Any:
+        return get_shared_session().get(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._requests, name)
+
+
+def _use_orjson(response: Any, *args: Any, **kwargs: Any) -> Any:
+    """响应钩子：Response.json() 改用 orjson 解析；带参数调用或 orjson 无法解析时退回原方法"""
+    fallback = response.json
+
+    def json(**json_kwargs: Any) -> Any:
+        if not json_kwargs:
+            try:
+                return _orjson.loads(response.content)
+            except _orjson.JSONDecodeError:
+                pass
+        return fallback(**json_kwargs)
+
+    response.json = json
+    return response
+
+
+def _get_adapter() -> Any:
+    """返回进程内共享的 HTTPAdapter（urllib3 连接池线程安全，可供多个会话同时使用）"""
+    global _adapter
+    if _adapter is None:
+        with _adapter_lock:
+            if _adapter is None:
+                from requests.adapters import HTTPAdapter
+
+                _adapter = HTTPAdapter(
+                    pool_connections=_POOL_SIZE,
+                    pool_maxsize=_POOL_SIZE,
+                    max_retries=_MAX_RETRIES,
+                )
+    return _adapter
+
+
+def _create_session() -> Any:
+    """创建使用共享连接池、连接级重试及 orjson 响应钩子的 requests.Session"""
+    session = requests.Session()
+    adapter = _get_adapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if _orjson is not None:
+        session.hooks["response"].append(_use_orjson)
+    return session
+
+
+def get_shared_session() -> Optional[Any]:
+    """返回当前线程的 requests.Session（首次调用时创建，未安装requests时返回None）"""
+    if requests is None:
+        return None
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _create_session()
+        _local.session = session
+    return session
+
+
+def install_shared_session(package: Any, *names: str) -> None:
+    """
+    为接口函数所在的模块安装共享会话
+
+    按函数的 __module__ 找到模块，模块内的 requests 为原始 requests 模块时替换为 PooledRequests；
+    不存在的接口、已替换过或不直接使用 requests 的模块保持不变，重复调用无副作用
+
+    参数:
+        package: 接口函数所在的包（如 akshare）
+        names: 接口函数名（如 "stock_hsgt_hist_em"）
+    """
+    if requests is None:
+        return
+
+    with _install_lock:
+        for name in names:
+            module = sys.modules.get(getattr(getattr(package, name, None), "__module__", None) or "")
+            if module is None or getattr(module, "requests", None) is not requests:
+                continue
+            _patched[module.__name__] = module.requests
+            module.requests = PooledRequests(requests)
+            logger.debug(f"[http_session] {module.__name__} 已使用共享会话")
+
+
+def enable_shared_session(package: Any = None) -> bool:
+    """
+    为本项目使用的 akshare 接口启用共享会话
+
+    参数:
+        package: 接口函数所在的包，默认导入 akshare
+
+    返回:
+        是否已启用（未安装 akshare 或 requests 时返回 False）
+    """
+    if requests is None:
+        return False
+    if package is None:
+        try:
+            import akshare as package
+        except ImportError:
+            return False
+    install_shared_session(package, *AKSHARE_ENDPOINTS)
+    return True
+
+
+def enable_shared_session_if_configured() -> bool:
+    """配置项 SHARED_HTTP_SESSION 启用时调用 enable_shared_session，返回是否已启用"""
+    if not get_config().get_shared_http_session():
+        return False
+    return enable_shared_session()
+
+
+def disable_shared_session() -> None:
+    """恢复已替换模块内的原始 requests 引用"""
+    with _install_lock:
+        for module_name, original in _patched.items():
+            module = sys.modules.get(module_name)
+            if module is not None and isinstance(getattr(module, "requests", None), PooledRequests):
+                module.requests = original
+        _patched.clear()
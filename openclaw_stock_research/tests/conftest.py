@@ -45,6 +45,17 @@ def mock_env_vars(monkeypatch):
     return env_vars
 
 
+@pytest.fixture(scope='function')
+def file_cache_dir(monkeypatch, tmp_path):
+    """磁盘缓存（FileCache）指向临时目录，避免读取或写入开发者本地的 AKSHARE_DATA_PATH"""
+    from openclaw_stock.core.config import reset_config
+
+    monkeypatch.setenv('AKSHARE_DATA_PATH', str(tmp_path))
+    reset_config()
+    yield tmp_path
+    reset_config()
+
+
 @pytest.fixture(scope='function')
 def mock_akshare_data():
     """模拟 AkShare 返回的数据"""
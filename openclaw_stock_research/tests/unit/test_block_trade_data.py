@@ -0,0 +1,64 @@
+"""
+大宗交易测试文件
+
+替换akshare接口，离线测试 data.block_trade_data 的明细与统计汇总
+"""
+
+import pandas as pd
+import pytest
+
+from openclaw_stock.data import block_trade_data
+
+# 磁盘缓存指向临时目录，测试不读写本地 AKSHARE_DATA_PATH
+pytestmark = pytest.mark.usefixtures("file_cache_dir")
+
+
+def _clear_caches():
+    block_trade_data._fetch_market_trades.clear_cache()
+    block_trade_data._fetch_market_statistics.clear_cache()
+    block_trade_data.fetch_block_trade_data.clear_cache()
+
+
+class TestFetchBlockTradeData:
+    """测试大宗交易数据获取"""
+
+    def test_statistics_premium_skips_missing(self, monkeypatch):
+        """测试统计的平均折溢率跳过无法解析的值，成交总额缺失值按0合计"""
+        class FakeAk:
+            def stock_dzjy_mrmx(self, symbol, start_date, end_date):
+                return pd.DataFrame()
+
+            def stock_dzjy_mrtj(self, start_date, end_date):
+                return pd.DataFrame({
+                    "证券代码": ["600000", "600000", "600000", "000001"],
+                    "折溢率": [4.0, "-", 2.0, -9.0],
+                    "成交总额": [100.0, "-", 50.0, 1.0],
+                })
+
+        monkeypatch.setattr(block_trade_data, "ak", FakeAk())
+        _clear_caches()
+
+        statistics = block_trade_data.fetch_block_trade_data("600000")["statistics"]
+
+        assert statistics["avg_premium_rate"] == 3.0
+        assert statistics["total_amount"] == 150.0
+        assert statistics["trade_count"] == 3
+
+    def test_empty_market_frame_not_cached(self, monkeypatch):
+        """测试全市场明细返回空表时不缓存，数据源恢复后下一次调用重新拉取"""
+        calls = []
+        frames = [pd.DataFrame(), pd.DataFrame({"证券代码": ["600000"], "折溢率": [1.0]})]
+
+        class FakeAk:
+            def stock_dzjy_mrmx(self, symbol, start_date, end_date):
+                calls.append(start_date)
+                return frames[len(calls) - 1]
+
+        monkeypatch.setattr(block_trade_data, "ak", FakeAk())
+        _clear_caches()
+
+        assert block_trade_data._fetch_market_trades("20240101", "20240331").empty
+        assert len(block_trade_data._fetch_market_trades("20240101", "20240331")) == 1
+        block_trade_data._fetch_market_trades("20240101", "20240331")
+
+        assert len(calls) == 2
@@ -0,0 +1,478 @@
+"""
+筹码分析模块测试
+
+使用构造的筹码分布数据离线测试 chip_analysis 的计算逻辑
+"""
+
+import json
+import sys
+from types import SimpleNamespace
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from openclaw_stock.analysis import chip_analysis
+from openclaw_stock.core.config import reset_config
+from openclaw_stock.core.exceptions import CalculationError
+
+
+def _make_chip_df(n: int = 30, seed: int = 0) -> pd.DataFrame:
+    """构造与 ak.stock_cyq_em 返回结构一致的筹码分布数据"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "日期": pd.date_range("2024-01-01", periods=n).date,
+        "获利比例": rng.uniform(0, 1, n),
+        "平均成本": rng.uniform(9, 11, n),
+        "90成本-低": rng.uniform(8, 9, n),
+        "90成本-高": rng.uniform(11, 12, n),
+        "90集中度": rng.uniform(0.05, 0.5, n),
+        "70成本-低": rng.uniform(8.5, 9.5, n),
+        "70成本-高": rng.uniform(10.5, 11.5, n),
+        "70集中度": rng.uniform(0.03, 0.4, n),
+    })
+
+
+def _make_latest(winner_rate: float = 0.5, concentration_90: float = 0.3) -> chip_analysis.ChipLatest:
+    """构造最新一日筹码数据"""
+    return chip_analysis.ChipLatest(
+        date="2024-01-30", winner_rate=winner_rate, average_cost=10.0,
+        cost_90_low=8.5, cost_90_high=11.5, concentration_90=concentration_90,
+        cost_70_low=9.0, cost_70_high=11.0, concentration_70=0.1,
+        cost_90_range=3.0, cost_70_range=2.0,
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_result_memo():
+    """各测试使用独立的分析结果备忘（构造数据的日期与行数相同，备忘键会重合）"""
+    chip_analysis._result_memo.clear()
+    yield
+    chip_analysis._result_memo.clear()
+
+
+@pytest.fixture
+def patch_fetch(monkeypatch):
+    """替换网络获取函数，返回给定的DataFrame"""
+    def _patch(df):
+        monkeypatch.setattr(
+            chip_analysis, "fetch_chip_distribution", lambda symbol, adjust="qfq": df
+        )
+    return _patch
+
+
+@pytest.fixture
+def fake_akshare(monkeypatch):
+    """以给定的 stock_cyq_em 替换 akshare 模块，并清除已缓存的模块句柄"""
+    def _install(stock_cyq_em):
+        monkeypatch.setitem(sys.modules, "akshare", SimpleNamespace(stock_cyq_em=stock_cyq_em))
+        monkeypatch.setattr(chip_analysis, "_akshare", None)
+    return _install
+
+
+@pytest.fixture
+def chip_cache_dir(monkeypatch, tmp_path):
+    """磁盘缓存指向临时目录，并清空内存缓存"""
+    monkeypatch.setenv("AKSHARE_DATA_PATH", str(tmp_path))
+    reset_config()
+    chip_analysis.fetch_chip_distribution.clear_cache()
+    yield tmp_path
+    chip_analysis.fetch_chip_distribution.clear_cache()
+    reset_config()
+
+
+class TestFetchChipDistribution:
+    """测试筹码数据获取"""
+
+    def test_numeric_columns_coerced(self, fake_akshare, chip_cache_dir):
+        """测试接收数据时数值列统一转为float64，无法解析的值记为NaN"""
+        raw = _make_chip_df(n=6).astype({"90集中度": object})
+        raw.loc[2, "90集中度"] = "--"
+
+        fake_akshare(lambda symbol, adjust: raw.copy())
+
+        df = chip_analysis.fetch_chip_distribution("000001")
+
+        assert df["90集中度"].dtype == np.float64
+        assert np.isnan(df["90集中度"].iloc[2])
+
+    def test_disk_cache_reused(self, fake_akshare, chip_cache_dir):
+        """测试内存缓存失效后从磁盘缓存读取，不再请求接口"""
+        calls = []
+
+        def stock_cyq_em(symbol, adjust):
+            calls.append(symbol)
+            return _make_chip_df(n=6)
+
+        fake_akshare(stock_cyq_em)
+
+        first = chip_analysis.fetch_chip_distribution("000001")
+        chip_analysis.fetch_chip_distribution.clear_cache()
+        second = chip_analysis.fetch_chip_distribution("000001")
+
+        assert calls == ["000001"]
+        pd.testing.assert_frame_equal(first, second)
+        assert (chip_cache_dir / "chip" / "000001_qfq.pkl").exists()
+
+    def test_cached_frame_is_copy(self, fake_akshare, chip_cache_dir):
+        """测试调用方修改返回的数据不影响缓存"""
+        fake_akshare(lambda symbol, adjust: _make_chip_df(n=6))
+
+        fetched = chip_analysis.fetch_chip_distribution("000001")
+        fetched.loc[:, "平均成本"] = -999.0
+        raw = chip_analysis.ChipAnalyzer().get_raw_data("000001")
+        raw.loc[:, "平均成本"] = -999.0
+
+        assert (chip_analysis.fetch_chip_distribution("000001")["平均成本"] > 0).all()
+
+
+    def test_akshare_imported_lazily(self, fake_akshare, chip_cache_dir):
+        """测试模块句柄在首次获取数据时才导入并缓存"""
+        fake_akshare(lambda symbol, adjust: _make_chip_df(n=6))
+        assert chip_analysis._akshare is None
+
+        chip_analysis.fetch_chip_distribution("000001")
+
+        assert chip_analysis._akshare is sys.modules["akshare"]
+
+
+class TestChipLatest:
+    """测试最新一日筹码数据提取"""
+
+    def test_latest_values(self, patch_fetch):
+        """测试最新一日数据按4位小数提取"""
+        df = _make_chip_df()
+        patch_fetch(df)
+
+        result = chip_analysis.analyze_chip_distribution("000001")
+        latest = result["latest"]
+        row = df.iloc[-1]
+
+        assert latest["date"] == str(row["日期"])
+        assert latest["winner_rate"] == round(float(row["获利比例"]), 4)
+        assert latest["concentration_70"] == round(float(row["70集中度"]), 4)
+        assert latest["cost_90_range"] == round(latest["cost_90_high"] - latest["cost_90_low"], 2)
+
+    def test_latest_nan_values(self, patch_fetch):
+        """测试NaN数据记为0.0"""
+        df = _make_chip_df()
+        df.loc[df.index[-1], "70集中度"] = np.nan
+        patch_fetch(df)
+
+        latest = chip_analysis.analyze_chip_distribution("000001")["latest"]
+
+        assert latest["concentration_70"] == 0.0
+
+    def test_unparseable_values(self, patch_fetch):
+        """测试未经转换的object列中无法解析的值记为0.0，趋势分析跳过该值"""
+        df = _make_chip_df().astype({"90集中度": object})
+        df.loc[df.index[-1], "90集中度"] = "--"
+        patch_fetch(df)
+
+        result = chip_analysis.analyze_chip_distribution("000001")
+
+        assert result["latest"]["concentration_90"] == 0.0
+        assert result["trend"]["period_days"] == len(df)
+
+    def test_safe_floats(self):
+        """测试批量转换时非数值数据记为0.0"""
+        values = pd.Series([1.23456, np.nan, "--", None, "2.5"], dtype=object)
+
+        assert chip_analysis._safe_floats(values) == [1.2346, 0.0, 0.0, 0.0, 2.5]
+
+
+class TestChipTrend:
+    """测试筹码趋势分析"""
+
+    def test_short_history_default_trend(self, patch_fetch):
+        """测试历史不足5天时返回默认趋势，且结果互不共享"""
+        patch_fetch(_make_chip_df(n=3))
+
+        first = chip_analysis.analyze_chip_distribution("000001")["trend"]
+        first["interpretation"].append("x")
+        second = chip_analysis.analyze_chip_distribution("000001")["trend"]
+
+        assert second == chip_analysis._default_trend()
+        assert second["period_days"] == 0
+
+
+    def test_window_mean_matches_nanmean(self):
+        """测试前缀和窗口均值与nanmean一致（含NaN及整列NaN）"""
+        mat = _make_chip_df(n=20, seed=5)[chip_analysis._TREND_COLS].to_numpy(dtype=np.float64, copy=True)
+        mat[3, 0] = np.nan
+        mat[10:15, 3] = np.nan
+        csum, ccount = chip_analysis._prefix_sums(mat)
+
+        for start, end in [(0, 5), (5, 15), (15, 20), (0, 20)]:
+            np.testing.assert_allclose(
+                chip_analysis._window_mean(csum, ccount, start, end),
+                np.nanmean(mat[start:end], axis=0),
+            )
+        assert np.isnan(chip_analysis._window_mean(csum, ccount, 10, 15)[3])
+
+    def test_multi_period_matches_pandas(self, patch_fetch):
+        """测试多周期向量化结果与逐周期pandas计算一致（含数据不足两个周期的情况）"""
+        df = _make_chip_df(n=30, seed=2)
+        df.loc[20, "70集中度"] = np.nan
+        patch_fetch(df)
+
+        multi_period = chip_analysis.analyze_chip_distribution("000001")["trend"]["multi_period"]
+
+        assert list(multi_period) == ["short", "medium", "long"]
+        for name, period_len in chip_analysis._PERIODS:
+            recent = df.iloc[-period_len:]
+            earlier = df.iloc[-period_len * 2:-period_len] if len(df) >= period_len * 2 else df.iloc[:period_len]
+            result = multi_period[name]
+            for col, key in [("90集中度", "concentration_90_change_pct"),
+                             ("70集中度", "concentration_70_change_pct"),
+                             ("平均成本", "cost_center_change_pct")]:
+                expected = (recent[col].mean() - earlier[col].mean()) / earlier[col].mean() * 100
+                assert result[key] == pytest.approx(expected, abs=0.005)
+            assert result["days"] == period_len
+            assert result["recent_avg_cost"] == pytest.approx(recent["平均成本"].mean(), abs=0.005)
+
+    def test_calc_slope_matches_polyfit(self):
+        """测试闭式斜率与 np.polyfit 一次拟合一致"""
+        rng = np.random.default_rng(1)
+        for n in (2, 5, 10, 20):
+            y = rng.uniform(0.05, 0.5, n)
+            assert chip_analysis._calc_slope(y) == pytest.approx(np.polyfit(np.arange(n), y, 1)[0])
+        assert chip_analysis._calc_slope([0.3]) == 0.0
+        assert chip_analysis._calc_slope([0.3, np.nan, 0.2]) == 0.0
+
+    def test_nan_concentration_keeps_valid_json(self, patch_fetch):
+        """测试近20日90集中度含NaN时斜率回退为0，结果仍可序列化为合法JSON"""
+        df = _make_chip_df(n=30, seed=4)
+        df.loc[25, "90集中度"] = np.nan
+        patch_fetch(df)
+
+        details = chip_analysis.analyze_chip_distribution("000001")["trend"]["details"]
+
+        assert details["concentration_slope"] == 0.0
+        assert details["concentration_speed"] == "stable"
+        json.dumps(details, allow_nan=False)
+
+    def test_trend_kernel_matches_numpy(self):
+        """测试主趋势计算内核与NumPy向量化结果一致（含NaN）"""
+        mat = _make_chip_df(n=25, seed=3)[chip_analysis._TREND_COLS].to_numpy(dtype=np.float64, copy=True)
+        mat[-2, 0] = np.nan
+        mat[7, 1] = np.nan
+
+        recent, early, below, above = chip_analysis._trend_kernel(mat, 5, 5, 15)
+
+        np.testing.assert_allclose(recent, np.nanmean(mat[-5:, :3], axis=0))
+        np.testing.assert_allclose(early, np.nanmean(mat[5:15, :3], axis=0))
+        assert below.tolist() == (recent < early * chip_analysis._TREND_LOWER_SCALE
+                                  + chip_analysis._TREND_LOWER_SHIFT).tolist()
+        assert above.tolist() == (recent > early * chip_analysis._TREND_UPPER_SCALE
+                                  + chip_analysis._TREND_UPPER_SHIFT).tolist()
+
+
+    def test_score_kernel(self):
+        """测试主力行为打分：集中+获利下降+成本下移+获利极低+70%集中度收窄"""
+        below = chip_analysis._TREND_BELOW
+
+        accum, dist, fired = chip_analysis._score_kernel(below, below, below, 0.1, 0.08, 0.1, True)
+        messages = [m for i, m in enumerate(chip_analysis._SIGNAL_MESSAGES) if fired >> i & 1]
+
+        assert (accum, dist) == (3 + 2 + 1 + 2, 0)
+        assert messages == [chip_analysis._SIGNAL_MESSAGES[i] for i in (0, 1, 6, 7)]
+
+    def test_signal_table_matches_rules(self):
+        """测试信号1-6查找表覆盖全部27种趋势组合"""
+        stable, below, above = (chip_analysis._TREND_STABLE, chip_analysis._TREND_BELOW,
+                                chip_analysis._TREND_ABOVE)
+        codes = (stable, below, above)
+        for conc in codes:
+            for cost in codes:
+                for winner in codes:
+                    accum = dist = 0
+                    if conc == below:
+                        accum += 3 * (winner == below) + 2 * (cost == below) + (winner == above)
+                    if conc == above:
+                        dist += 3 * (winner == above) + 2 * (cost == above) + (winner == below)
+                        accum += winner == below
+
+                    result = chip_analysis._score_kernel(conc, cost, winner, 0.5, np.nan, np.nan, False)
+
+                    assert result[:2] == (accum, dist)
+
+    def test_score_kernel_per_thresholds(self):
+        """测试按阈值构建的打分内核：同一组阈值复用同一内核，阈值改变信号判定"""
+        below, stable = chip_analysis._TREND_BELOW, chip_analysis._TREND_STABLE
+        default = chip_analysis.ChipScoreThresholds()
+        loose = chip_analysis.ChipScoreThresholds(bottom_winner_rate=0.3)
+
+        assert chip_analysis._make_score_kernel(default) is chip_analysis._score_kernel
+        assert chip_analysis._make_score_kernel(chip_analysis.ChipScoreThresholds(0.3)) is \
+            chip_analysis._make_score_kernel(loose)
+
+        args = (stable, below, stable, 0.2, np.nan, np.nan, False)
+        assert chip_analysis._score_kernel(*args) == (0, 0, 0)
+        assert chip_analysis._make_score_kernel(loose)(*args) == (1, 0, 1 << 6)
+
+    def test_score_kernel_stable(self):
+        """测试趋势均稳定且70%集中度数据不足时不触发信号"""
+        stable = chip_analysis._TREND_STABLE
+
+        assert chip_analysis._score_kernel(stable, stable, stable, 0.5, np.nan, np.nan, False) == (0, 0, 0)
+
+
+class TestChipAssessment:
+    """测试筹码状态综合评估"""
+
+    @pytest.mark.parametrize("concentration_90, expected", [
+        (0.05, "highly_concentrated"),
+        (0.10, "concentrated"),
+        (0.20, "neutral"),
+        (0.40, "neutral"),
+        (0.41, "dispersed"),
+    ])
+    def test_chip_status_bins(self, concentration_90, expected):
+        """测试90集中度分档边界"""
+        assessment = chip_analysis._assess_chip_status(_make_latest(concentration_90=concentration_90), {})
+
+        assert assessment["chip_status"] == expected
+
+    @pytest.mark.parametrize("winner_rate, pressure, support", [
+        (0.05, "low", "low"),
+        (0.10, "low", "medium"),
+        (0.30, "medium", "medium"),
+        (0.70, "medium", "medium"),
+        (0.90, "medium_high", "medium"),
+        (0.95, "high", "medium"),
+    ])
+    def test_winner_rate_bins(self, winner_rate, pressure, support):
+        """测试获利比例分档边界"""
+        assessment = chip_analysis._assess_chip_status(_make_latest(winner_rate=winner_rate), {})
+
+        assert assessment["pressure_level"] == pressure
+        assert assessment["support_level"] == support
+
+
+class TestChipResult:
+    """测试筹码分析结果对象"""
+
+    def test_public_api_returns_dict(self, patch_fetch):
+        """测试对外接口返回可JSON序列化的普通字典"""
+        patch_fetch(_make_chip_df())
+
+        result = chip_analysis.analyze_chip_distribution("000001", 10.0)
+        analyzer = chip_analysis.ChipAnalyzer()
+
+        assert type(result) is dict and type(result["latest"]) is dict
+        assert json.loads(json.dumps(result)) == result
+        assert analyzer.analyze("000001", 10.0) == result
+        assert analyzer.analyze_many(["000001"], current_prices={"000001": 10.0}) == {"000001": result}
+
+    def test_to_dict(self, patch_fetch):
+        """测试转换为字典时结构与字段一致，成功时不含error"""
+        patch_fetch(_make_chip_df())
+
+        result = chip_analysis.analyze_chip_result("000001")
+        data = result.to_dict()
+
+        assert set(data) == {"latest", "trend", "assessment"}
+        assert list(data["latest"]) == list(chip_analysis.ChipLatest.__slots__)
+        assert data["latest"]["winner_rate"] == result.latest.winner_rate
+        assert data["trend"] is result.trend
+        assert "error" not in result
+        assert result.get("error") is None
+
+    def test_analyze_dataframe(self, monkeypatch):
+        """测试直接分析已有数据时不请求数据，结果与完整流程一致"""
+        df = _make_chip_df()
+        monkeypatch.setattr(chip_analysis, "fetch_chip_distribution", lambda symbol, adjust="qfq": df)
+        expected = chip_analysis.analyze_chip_distribution("000001", 10.0)
+
+        def fail_fetch(symbol, adjust="qfq"):
+            raise AssertionError("不应请求数据")
+
+        monkeypatch.setattr(chip_analysis, "fetch_chip_distribution", fail_fetch)
+        result = chip_analysis.analyze_chip_dataframe(df, 10.0)
+
+        assert result == expected
+        with pytest.raises(CalculationError):
+            chip_analysis.analyze_chip_dataframe(df.iloc[:0])
+
+    def test_memoized_result(self, patch_fetch, monkeypatch):
+        """测试数据未更新（最新日期与行数相同）且价格相同时复用结果，返回互不共享的副本；数据更新后重新计算"""
+        df = _make_chip_df()
+        patch_fetch(df)
+        first = chip_analysis.analyze_chip_result("000001", 10.0)
+        first.trend["interpretation"].append("x")
+
+        calls = []
+        monkeypatch.setattr(chip_analysis, "_assess_chip_status",
+                            lambda *args: calls.append(args) or {})
+        second = chip_analysis.analyze_chip_result("000001", 10.0)
+
+        assert calls == []
+        assert second.latest == first.latest
+        assert second.trend["interpretation"] == first.trend["interpretation"][:-1]
+
+        assert all(isinstance(blob, bytes) for blob in chip_analysis._result_memo.values())
+
+        patch_fetch(_make_chip_df(seed=1))
+        chip_analysis.analyze_chip_result("000001", 10.0)
+        assert calls == []
+
+        patch_fetch(_make_chip_df(n=31, seed=1))
+        chip_analysis.analyze_chip_distribution("000001", 10.0)
+        assert len(calls) == 1
+
+    def test_empty_result(self):
+        """测试失败结果支持字典式读取error"""
+        result = chip_analysis._empty_chip_result("接口超时")
+
+        assert result["error"] == "接口超时"
+        assert result.latest is None
+        assert result.to_dict()["latest"] == {}
+        assert result.to_dict()["assessment"]["chip_status"] == "unknown"
+        with pytest.raises(KeyError):
+            result["unknown"]
+
+
+class TestChipAnalyzer:
+    """测试筹码分析器类"""
+
+    def test_analyze_many(self, patch_fetch):
+        """测试批量分析按输入顺序返回结果"""
+        patch_fetch(_make_chip_df())
+        symbols = ["000001", "600000", "300750"]
+
+        results = chip_analysis.ChipAnalyzer().analyze_many(
+            symbols, current_prices={"600000": 10.0}
+        )
+
+        assert list(results) == symbols
+        assert all(r["latest"] for r in results.values())
+        assert any("平均成本" in s for s in results["600000"]["assessment"]["signals"])
+
+    def test_analyze_many_enables_shared_session(self, monkeypatch, patch_fetch):
+        """测试批量分析按配置启用共享会话"""
+        enabled = []
+        monkeypatch.setattr(chip_analysis, "enable_shared_session_if_configured", lambda: enabled.append(True))
+        patch_fetch(_make_chip_df())
+
+        chip_analysis.ChipAnalyzer().analyze_many(["000001"])
+
+        assert enabled == [True]
+
+    def test_analyze_many_cached_skip_pool(self, monkeypatch, fake_akshare, chip_cache_dir):
+        """测试已缓存的股票直接计算，只有未缓存的股票进入线程池"""
+        fake_akshare(lambda symbol, adjust: _make_chip_df())
+        pooled = []
+
+        class RecordingExecutor(chip_analysis.ThreadPoolExecutor):
+            def map(self, fn, items):
+                pooled.extend(items)
+                return super().map(fn, items)
+
+        monkeypatch.setattr(chip_analysis, "ThreadPoolExecutor", RecordingExecutor)
+        chip_analysis.fetch_chip_distribution("600000")
+
+        results = chip_analysis.ChipAnalyzer().analyze_many(["000001", "600000", "300750"])
+
+        assert list(results) == ["000001", "600000", "300750"]
+        assert pooled == ["000001", "300750"]
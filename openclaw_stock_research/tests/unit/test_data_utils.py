@@ -0,0 +1,105 @@
+"""
+数据工具函数测试文件
+
+测试 data.utils 中的DataFrame转换函数
+"""
+
+import numpy as np
+import pandas as pd
+
+from openclaw_stock.data.utils import (
+    coerce_numeric, filter_by_symbol, frame_to_records, has_rows, normalize_columns, numeric_column,
+)
+
+
+class TestFrameToRecords:
+    """测试按列转换记录"""
+
+    def test_matches_row_wise(self):
+        """测试与逐行str()/float()转换结果一致，键顺序按字段表"""
+        df = pd.DataFrame({
+            "交易日期": pd.to_datetime(["2024-01-02", "2024-01-03"]),
+            "成交价": [10.5, 9],
+            "买方营业部": ["机构专用", None],
+        }, index=[5, 7])
+        fields = (("date", "交易日期", str), ("trade_price", "成交价", float),
+                  ("buyer", "买方营业部", str))
+
+        records = frame_to_records(df, fields)
+
+        assert records == [
+            {"date": str(row["交易日期"]), "trade_price": float(row["成交价"]), "buyer": str(row["买方营业部"])}
+            for _, row in df.iterrows()
+        ]
+        assert list(records[0]) == ["date", "trade_price", "buyer"]
+
+    def test_missing_and_invalid_values(self):
+        """测试缺失列及无法解析的数值按默认值填充"""
+        df = pd.DataFrame({"派息": [1.2, np.nan, "-"]})
+
+        records = frame_to_records(df, (("cash_per_share", "派息", float), ("progress", "进度", str),
+                                        ("send_shares", "送股", float)))
+
+        assert [r["cash_per_share"] for r in records] == [1.2, 0.0, 0.0]
+        assert records[0]["progress"] == "" and records[0]["send_shares"] == 0.0
+
+    def test_int_fields(self):
+        """测试int列转换为Python int，缺失值为0"""
+        df = pd.DataFrame({"解禁股东数": [3, None], "股东户数-本次": ["1200", "-"]})
+
+        records = frame_to_records(df, (("shareholder_count", "解禁股东数", int),
+                                        ("holder_count", "股东户数-本次", int)))
+
+        assert records == [{"shareholder_count": 3, "holder_count": 1200},
+                           {"shareholder_count": 0, "holder_count": 0}]
+        assert type(records[0]["holder_count"]) is int
+
+
+class TestFilterBySymbol:
+    """测试按股票代码筛选"""
+
+    def test_matches_boolean_index(self):
+        """测试与布尔索引结果一致，保留原索引"""
+        df = pd.DataFrame({"证券代码": ["000001", "600000", "000001"], "成交价": [1.0, 2.0, 3.0]},
+                          index=[10, 11, 12])
+
+        pd.testing.assert_frame_equal(filter_by_symbol(df, "证券代码", "000001"), df[df["证券代码"] == "000001"])
+        assert filter_by_symbol(df, "证券代码", "300750").empty
+
+
+class TestHasRows:
+    """测试返回数据可用性判断"""
+
+    def test_none_empty_and_missing_column(self):
+        """测试None、空表、缺少代码列均视为不可用"""
+        df = pd.DataFrame({"代码": ["600000"]})
+
+        assert has_rows(df) and has_rows(df, "代码")
+        assert not has_rows(None, "代码") and not has_rows(df.iloc[0:0], "代码")
+        assert not has_rows(df, "证券代码")
+
+
+class TestNormalizeColumns:
+    """测试列名规范化"""
+
+    def test_dash_and_space_variants(self):
+        """测试全角/长破折号统一为半角，空白被去除；已规范时返回原对象"""
+        df = pd.DataFrame(columns=["送转股份－送股比例", "现金分红—股息率", " 报告期 ", "每股收益"])
+
+        assert list(normalize_columns(df).columns) == ["送转股份-送股比例", "现金分红-股息率", "报告期", "每股收益"]
+        clean = pd.DataFrame(columns=["报告期", "现金分红-股息率"])
+        assert normalize_columns(clean) is clean
+
+
+class TestCoerceNumeric:
+    """测试数值列预转换"""
+
+    def test_converted_once(self):
+        """测试转换后为float64且numeric_column结果不变，其余列与原数据不受影响"""
+        df = pd.DataFrame({"总市值": ["1.5e9", None, "-"], "名称": ["a", "b", "c"]}, dtype=object)
+
+        coerced = coerce_numeric(df, ["总市值", "换手率"])
+
+        assert coerced["总市值"].dtype == np.float64 and coerced["名称"].dtype == object
+        np.testing.assert_array_equal(numeric_column(coerced, "总市值"), numeric_column(df, "总市值"))
+        assert df["总市值"].dtype == object and coerce_numeric(df, ["换手率"]) is df
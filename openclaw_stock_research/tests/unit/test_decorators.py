@@ -0,0 +1,201 @@
+"""
+装饰器测试文件
+
+测试 utils.decorators 中的缓存及JIT编译装饰器
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from openclaw_stock.utils.decorators import cache_result, jit_compile, NUMBA_AVAILABLE, skip_cache
+
+
+class TestCacheResult:
+    """测试结果缓存装饰器"""
+
+    def test_positional_and_keyword_share_key(self):
+        """测试位置参数与关键字参数调用命中同一缓存"""
+        calls = []
+
+        @cache_result(ttl=60)
+        def fetch(symbol, adjust="qfq"):
+            calls.append((symbol, adjust))
+            return len(calls)
+
+        assert fetch("000001") == 1
+        assert fetch("000001", "qfq") == 1
+        assert fetch(symbol="000001", adjust="qfq") == 1
+        assert fetch("000001", adjust="hfq") == 2
+        assert len(calls) == 2
+
+    def test_maxsize_evicts_least_recently_used(self):
+        """测试超出maxsize时淘汰最久未使用的条目"""
+        calls = []
+
+        @cache_result(ttl=60, maxsize=2)
+        def fetch(symbol):
+            calls.append(symbol)
+            return symbol
+
+        fetch("a")
+        fetch("b")
+        fetch("a")      # a 成为最近使用
+        fetch("c")      # 淘汰 b
+        fetch("a")
+        fetch("b")
+
+        assert calls == ["a", "b", "c", "b"]
+
+    def test_ttl_expired(self):
+        """测试缓存过期后重新执行"""
+        calls = []
+
+        @cache_result(ttl=0)
+        def fetch(symbol):
+            calls.append(symbol)
+            return symbol
+
+        fetch("a")
+        fetch("a")
+
+        assert calls == ["a", "a"]
+
+    def test_daily_expires_across_days(self, monkeypatch):
+        """测试daily=True时前一天的缓存即使未超过ttl也失效"""
+        calls = []
+
+        @cache_result(ttl=3 * 86400, daily=True)
+        def fetch(symbol):
+            calls.append(symbol)
+            return symbol
+
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now - 86400)
+        fetch("a")
+        monkeypatch.setattr(time, "time", lambda: now)
+        fetch("a")
+        fetch("a")
+
+        assert calls == ["a", "a"]
+
+    def test_is_cached(self):
+        """测试查询缓存状态不执行函数"""
+        calls = []
+
+        @cache_result(ttl=60)
+        def fetch(symbol, adjust="qfq"):
+            calls.append(symbol)
+            return symbol
+
+        assert not fetch.is_cached("a")
+        fetch("a")
+
+        assert fetch.is_cached("a", adjust="qfq")
+        assert not fetch.is_cached("a", "hfq")
+        assert calls == ["a"]
+
+    def test_skip_cache(self):
+        """测试调用 skip_cache 的结果不缓存，嵌套的缓存函数互不影响"""
+        calls = []
+
+        @cache_result(ttl=60)
+        def inner(symbol):
+            calls.append(("inner", symbol))
+            return symbol
+
+        @cache_result(ttl=60)
+        def fetch(symbol, fail):
+            calls.append(("fetch", symbol))
+            if fail:
+                skip_cache()
+            return inner(symbol)
+
+        fetch("a", True)
+        fetch("a", True)
+        fetch("b", False)
+        fetch("b", False)
+
+        assert calls == [("fetch", "a"), ("inner", "a"), ("fetch", "a"), ("fetch", "b"), ("inner", "b")]
+        assert inner.is_cached("a") and not fetch.is_cached("a", True)
+
+    def test_copy_result(self):
+        """测试 copy_result 每次返回独立副本，调用方修改结果不影响缓存"""
+        @cache_result(ttl=60, copy_result=True)
+        def fetch(symbol):
+            return {"symbol": symbol, "records": [1, 2]}
+
+        first = fetch("a")
+        first["records"].append(3)
+        second = fetch("a")
+        second["records"].clear()
+
+        assert fetch("a") == {"symbol": "a", "records": [1, 2]}
+
+    def test_concurrent_misses_run_once(self):
+        """测试多线程同时未命中同一键时只执行一次，其余线程共享结果"""
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        @cache_result(ttl=60, copy_result=True)
+        def fetch(symbol):
+            calls.append(symbol)
+            started.set()
+            release.wait(5)
+            return {"symbol": symbol}
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            first = executor.submit(fetch, "a")
+            started.wait(5)
+            others = [executor.submit(fetch, "a") for _ in range(3)]
+            time.sleep(0.05)
+            release.set()
+            results = [first.result()] + [f.result() for f in others]
+
+        assert calls == ["a"]
+        assert results == [{"symbol": "a"}] * 4
+        assert len({id(r) for r in results}) == 4
+
+    def test_concurrent_waiters_share_exception(self):
+        """测试进行中的调用失败时，等待线程收到同一异常且结果不缓存"""
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        @cache_result(ttl=60)
+        def fetch(symbol):
+            calls.append(symbol)
+            started.set()
+            release.wait(5)
+            raise ValueError("boom")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(fetch, "a")
+            started.wait(5)
+            second = executor.submit(fetch, "a")
+            time.sleep(0.05)
+            release.set()
+            for future in (first, second):
+                with pytest.raises(ValueError):
+                    future.result()
+
+        assert calls == ["a"]
+        assert not fetch.is_cached("a")
+
+
+class TestJitCompile:
+    """测试可选的JIT编译装饰器"""
+
+    def test_result_unchanged(self):
+        """测试编译（或回退为纯Python）后计算结果不变"""
+        def add(a, b):
+            return a + b
+
+        compiled = jit_compile(cache=False)(add)
+
+        assert compiled(1.5, 2.0) == 3.5
+        if not NUMBA_AVAILABLE:
+            assert compiled is add
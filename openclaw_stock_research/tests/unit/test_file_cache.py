@@ -0,0 +1,155 @@
+"""
+磁盘缓存测试文件
+
+测试 utils.file_cache 中的 FileCache
+"""
+
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from openclaw_stock.core.config import reset_config
+from openclaw_stock.data import dividend_data, institution_data, northbound_data, shareholder_data
+from openclaw_stock.utils.file_cache import FileCache
+
+
+@pytest.fixture
+def cache_dir(monkeypatch, tmp_path):
+    """将 AKSHARE_DATA_PATH 指向临时目录"""
+    monkeypatch.setenv("AKSHARE_DATA_PATH", str(tmp_path))
+    reset_config()
+    yield tmp_path
+    reset_config()
+
+
+class TestFileCache:
+    """测试磁盘文件缓存"""
+
+    def test_set_and_get(self, cache_dir):
+        """测试写入后读取"""
+        cache = FileCache("demo")
+        cache.set("600000_qfq", {"a": 1})
+
+        assert cache.get("600000_qfq") == {"a": 1}
+        assert cache.get("missing") is None
+        assert cache.contains("600000_qfq")
+        assert not cache.contains("missing")
+
+    def test_ttl_expired(self, cache_dir):
+        """测试超过有效期后视为未命中"""
+        cache = FileCache("demo", ttl=60)
+        cache.set("key", [1, 2])
+        path = cache_dir / "demo" / "key.pkl"
+        old = time.time() - 120
+        os.utime(path, (old, old))
+
+        assert cache.get("key") is None
+        assert not cache.contains("key")
+
+    def test_daily_expired(self, cache_dir):
+        """测试daily缓存跨日后失效"""
+        cache = FileCache("demo", daily=True)
+        cache.set("key", "v")
+        path = cache_dir / "demo" / "key.pkl"
+        yesterday = time.time() - 86400
+        os.utime(path, (yesterday, yesterday))
+
+        assert cache.get("key") is None
+
+    def test_unsafe_key_and_clear(self, cache_dir):
+        """测试键中的特殊字符被替换，clear删除所有缓存"""
+        cache = FileCache("demo")
+        cache.set("a/b:c", 1)
+
+        assert cache.get("a/b:c") == 1
+        assert cache.clear() == 1
+        assert cache.get("a/b:c") is None
+
+    def test_disabled_without_path(self, monkeypatch):
+        """测试未设置 AKSHARE_DATA_PATH 时不启用缓存"""
+        monkeypatch.delenv("AKSHARE_DATA_PATH", raising=False)
+        reset_config()
+        cache = FileCache("demo")
+        cache.set("key", 1)
+
+        assert cache.get("key") is None
+        reset_config()
+
+
+class TestDividendFileCache:
+    """测试分红数据的磁盘缓存"""
+
+    def test_detail_and_history_cached_separately(self, cache_dir, monkeypatch):
+        """测试详情命中缓存后不再请求；历史为空时不写入缓存"""
+        calls = []
+
+        class FakeAk:
+            def stock_fhps_detail_em(self, symbol):
+                calls.append("detail")
+                return pd.DataFrame({"报告期": ["2023-12-31"], "现金分红-现金分红比例": [2.5]})
+
+            def stock_history_dividend_detail(self, symbol, indicator):
+                calls.append("history")
+                return pd.DataFrame()
+
+        monkeypatch.setattr(dividend_data, "ak", FakeAk())
+
+        for _ in range(2):
+            df = dividend_data._fetch_detail_frame("601127")
+            dividend_data._fetch_history_frame("601127")
+
+        assert df["现金分红-现金分红比例"].tolist() == [2.5]
+        assert calls == ["detail", "history", "history"]
+
+
+class TestInstitutionHoldFileCache:
+    """测试季度机构持仓的磁盘缓存"""
+
+    def test_quarter_reused_across_processes(self, cache_dir, monkeypatch):
+        """测试内存缓存清空后（模拟新进程）季度持仓从磁盘读取，索引保留"""
+        calls = []
+
+        class FakeAk:
+            def stock_institute_hold(self, symbol):
+                calls.append(symbol)
+                return pd.DataFrame({"证券代码": ["600000"], "机构数": [12]})
+
+        monkeypatch.setattr(institution_data, "ak", FakeAk())
+
+        for _ in range(2):
+            institution_data._fetch_quarter_holdings.clear_cache()
+            df = institution_data._fetch_quarter_holdings("20201")
+
+        assert calls == ["20201"]
+        assert "600000" in df.index and df.loc["600000", "机构数"] == 12
+        assert (cache_dir / "institution_hold" / "20201.pkl").exists()
+
+
+class TestDailySnapshotFileCache:
+    """测试按日快照类数据的磁盘缓存"""
+
+    def test_snapshots_reused(self, cache_dir, monkeypatch):
+        """测试股东户数与北向持股排行写入磁盘后不再请求接口"""
+        calls = []
+
+        class FakeAk:
+            def stock_zh_a_gdhs_detail_em(self, symbol):
+                calls.append(("gdhs", symbol))
+                return pd.DataFrame({"股东户数统计截止日": ["2024-03-31"], "股东户数-本次": [1000]})
+
+            def stock_hsgt_hold_stock_em(self, market, indicator):
+                calls.append(("hold", market))
+                return pd.DataFrame({"代码": ["600000"]})
+
+        monkeypatch.setattr(shareholder_data, "ak", FakeAk())
+        monkeypatch.setattr(northbound_data, "ak", FakeAk())
+
+        for _ in range(2):
+            northbound_data._fetch_hold_ranking.clear_cache()
+            shareholder_data._fetch_holder_detail("600000")
+            df = northbound_data._fetch_hold_ranking("沪股通")
+
+        assert calls == [("gdhs", "600000"), ("hold", "沪股通")]
+        assert df["代码"].tolist() == ["600000"]
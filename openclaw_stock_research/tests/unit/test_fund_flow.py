@@ -0,0 +1,62 @@
+"""
+资金流向测试文件
+
+离线测试 data.fund_flow 的记录转换
+"""
+
+import numpy as np
+import pandas as pd
+
+from openclaw_stock.data import fund_flow
+
+
+class TestFetchFundFlow:
+    """测试资金流向数据获取"""
+
+    def test_individual_records(self, monkeypatch):
+        """测试个股资金流向按列转换，日期保持原值，缺失值按0处理"""
+        monkeypatch.setattr(fund_flow, "_get_eastmoney_fund_flow_individual", lambda symbol: pd.DataFrame({
+            "日期": ["2024-01-02", "2024-01-03"], "主力净流入": [12.5, np.nan],
+            "超大单净流入": [3.0, -1.0], "中单净流入": ["-", 2.0], "小单净流入": [0.0, 1.0], "净流入": [15.5, 2.0],
+        }))
+
+        df = fund_flow.fetch_fund_flow(symbol="000001", days=5, flow_type="main")
+
+        assert df.to_dict(orient="records")[1] == {
+            "date": "2024-01-03", "symbol": "000001", "main_inflow": 0.0, "large_inflow": -1.0,
+            "medium_inflow": 2.0, "small_inflow": 1.0, "total_inflow": 2.0,
+        }
+        assert df["medium_inflow"].tolist() == [0.0, 2.0]
+
+
+class TestFetchCapitalFlow:
+    """测试个股资金流向汇总"""
+
+    def test_failed_fetch_not_cached(self, monkeypatch):
+        """测试数据源失败时的全0结果不缓存，恢复后重新获取"""
+        calls = []
+
+        def fetch_individual(symbol):
+            calls.append(symbol)
+            if len(calls) == 1:
+                raise ConnectionError("数据源故障")
+            return pd.DataFrame({"日期": ["2024-01-02"], "主力净流入": [12.5], "小单净流入": [-2.0]})
+
+        monkeypatch.setattr(fund_flow, "_get_eastmoney_fund_flow_individual", fetch_individual)
+        fund_flow.fetch_capital_flow.clear_cache()
+
+        assert fund_flow.fetch_capital_flow("000001")["main_inflow"] == 0
+        assert fund_flow.fetch_capital_flow("000001")["main_inflow"] == 12.5
+        assert fund_flow.fetch_capital_flow("000001")["retail_inflow"] == -2.0
+        assert len(calls) == 2
+
+    def test_result_is_copy(self, monkeypatch):
+        """测试调用方修改返回结果不影响缓存"""
+        monkeypatch.setattr(fund_flow, "_get_eastmoney_fund_flow_individual", lambda symbol: pd.DataFrame({
+            "日期": ["2024-01-02"], "主力净流入": [12.5],
+        }))
+        fund_flow.fetch_capital_flow.clear_cache()
+
+        fund_flow.fetch_capital_flow("000001")["main_inflow"] = -1.0
+
+        assert fund_flow.fetch_capital_flow("000001")["main_inflow"] == 12.5
@@ -0,0 +1,95 @@
+"""
+共享HTTP会话测试文件
+
+测试 utils.http_session 对接口模块 requests 引用的替换及响应解析
+"""
+
+import math
+import sys
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from openclaw_stock.core.config import reset_config
+from openclaw_stock.utils import http_session
+
+
+class TestInstallSharedSession:
+    """测试安装共享会话"""
+
+    def _fake_package(self, monkeypatch):
+        module = types.ModuleType("fake_akshare_api")
+        module.requests = requests
+        exec("def stock_demo():\n    return requests.get('https://example.com')", module.__dict__)
+        monkeypatch.setitem(sys.modules, module.__name__, module)
+        return module, types.SimpleNamespace(stock_demo=module.stock_demo)
+
+    def test_get_routed_to_shared_session(self, monkeypatch):
+        """测试接口模块的 get 走共享会话，其余属性透传，重复安装及缺失接口不受影响"""
+        module, package = self._fake_package(monkeypatch)
+
+        class FakeSession:
+            def get(self, url, **kwargs):
+                return f"pooled {url}"
+
+        monkeypatch.setattr(http_session, "get_shared_session", FakeSession)
+
+        http_session.install_shared_session(package, "stock_demo", "stock_missing")
+        pooled = module.requests
+        http_session.install_shared_session(package, "stock_demo")
+
+        assert module.stock_demo() == "pooled https://example.com"
+        assert module.requests is pooled and pooled.post is requests.post
+
+        http_session.disable_shared_session()
+        assert module.requests is requests
+
+    def test_opt_in_by_config(self, monkeypatch):
+        """测试未配置 SHARED_HTTP_SESSION 时不替换 requests，配置后才启用"""
+        module, package = self._fake_package(monkeypatch)
+        monkeypatch.setattr(http_session, "AKSHARE_ENDPOINTS", ("stock_demo",))
+        monkeypatch.setitem(sys.modules, "akshare", package)
+
+        monkeypatch.delenv("SHARED_HTTP_SESSION", raising=False)
+        reset_config()
+        assert http_session.enable_shared_session_if_configured() is False
+        assert module.requests is requests
+
+        monkeypatch.setenv("SHARED_HTTP_SESSION", "1")
+        reset_config()
+        try:
+            assert http_session.enable_shared_session_if_configured() is True
+            assert isinstance(module.requests, http_session.PooledRequests)
+        finally:
+            http_session.disable_shared_session()
+            reset_config()
+        assert module.requests is requests
+
+    def test_session_per_thread(self):
+        """测试各线程使用独立会话，同一线程复用会话，各会话共用同一连接池"""
+        main_session = http_session.get_shared_session()
+        assert http_session.get_shared_session() is main_session
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            thread_session = executor.submit(http_session.get_shared_session).result()
+        assert thread_session is not main_session
+        adapter = main_session.get_adapter("https://example.com")
+        assert adapter.max_retries.total == 2
+        assert thread_session.get_adapter("https://example.com") is adapter
+
+    def test_orjson_response_hook(self):
+        """测试响应 json() 改用 orjson 解析，orjson 无法解析时退回标准库"""
+        pytest.importorskip("orjson")
+
+        def response(body):
+            r = requests.Response()
+            r._content = body
+            r.encoding = "utf-8"
+            return http_session._use_orjson(r)
+
+        assert response('{"result": {"data": [{"代码": "600000", "值": 1.5}]}}'.encode()).json() == {
+            "result": {"data": [{"代码": "600000", "值": 1.5}]}
+        }
+        assert math.isnan(response(b'{"value": NaN}').json()["value"])
@@ -0,0 +1,136 @@
+"""
+行业对比测试文件
+
+离线测试 data.industry_compare_data 的超时保护与行业对比计算
+"""
+
+import concurrent.futures
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from openclaw_stock.data import industry_compare_data
+
+
+class TestFetchWithTimeout:
+    """测试带超时的调用"""
+
+    def test_timeout_returns_without_waiting(self):
+        """测试超时后立即返回，不等待仍在进行的请求"""
+        release = threading.Event()
+        start = time.monotonic()
+
+        try:
+            with pytest.raises(concurrent.futures.TimeoutError):
+                industry_compare_data._fetch_with_timeout(lambda: release.wait(5), timeout=0.2)
+            elapsed = time.monotonic() - start
+        finally:
+            release.set()
+
+        assert elapsed < 2
+        assert industry_compare_data._fetch_with_timeout(lambda symbol: symbol, symbol="电池") == "电池"
+
+    def test_hung_calls_do_not_block_later_calls(self):
+        """测试多个挂起的请求不会占满线程，之后的调用仍按时返回"""
+        release = threading.Event()
+        try:
+            for _ in range(6):
+                with pytest.raises(concurrent.futures.TimeoutError):
+                    industry_compare_data._fetch_with_timeout(lambda: release.wait(5), timeout=0.05)
+            assert industry_compare_data._fetch_with_timeout(lambda: "ok", timeout=1) == "ok"
+        finally:
+            release.set()
+
+    def test_exception_propagates(self):
+        """测试被调用函数的异常原样抛给调用方"""
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            industry_compare_data._fetch_with_timeout(fail)
+
+
+class TestFetchIndustryCompare:
+    """测试行业对比数据获取"""
+
+    def test_peers_from_frame(self, monkeypatch):
+        """测试个股信息与成分股按列转换，缺失值按0处理"""
+        class FakeAk:
+            def stock_individual_info_em(self, symbol):
+                return pd.DataFrame({"item": ["股票简称", "行业"], "value": ["宁德时代", "电池"]})
+
+            def stock_board_industry_cons_em(self, symbol):
+                return pd.DataFrame({
+                    "代码": ["300750", "002074"], "名称": ["宁德时代", "国轩高科"],
+                    "最新价": [200.0, None], "涨跌幅": [1.5, -0.5], "市盈率-动态": [25.0, 40.0],
+                    "市净率": [5.0, 2.0], "总市值": [9e11, 5e10], "换手率": [0.8, 2.1],
+                })
+
+        monkeypatch.setattr(industry_compare_data, "ak", FakeAk())
+        industry_compare_data.fetch_industry_compare_data.clear_cache()
+
+        result = industry_compare_data.fetch_industry_compare_data("300750")
+
+        assert result["stock_info"]["name"] == "宁德时代" and result["industry_name"] == "电池"
+        assert result["industry_peers"][1] == {
+            "code": "002074", "name": "国轩高科", "price": 0.0, "change_pct": -0.5,
+            "pe": 40.0, "pb": 2.0, "total_market_cap": 5e10, "turnover_rate": 2.1,
+        }
+        assert result["comparison"]["pe_rank"] == 1 and result["comparison"]["cap_rank"] == 1
+
+
+class TestCalculateComparison:
+    """测试行业对比计算"""
+
+    def test_ranks_with_ties(self):
+        """测试并列值的排名与中位数，无效PE/PB不参与统计"""
+        peers = industry_compare_data.IndustryPeers.from_frame(pd.DataFrame({
+            "代码": ["000001", "000002", "000003", "000004", "000005"],
+            "市盈率-动态": [10.0, 20.0, 20.0, -3.0, 1500.0],
+            "市净率": [1.0, 2.0, "-", 2.0, 3.0],
+            "涨跌幅": [1.0, 2.0, 3.0, 4.0, 5.0],
+            "总市值": [5e9, 8e9, 8e9, 0.0, 1e9],
+        }))
+
+        comparison = industry_compare_data._calculate_comparison("000002", peers)
+
+        assert comparison["industry_median_pe"] == 20.0 and comparison["industry_avg_pe"] == 16.67
+        assert comparison["pe_rank"] == 3 and comparison["pe_rank_pct"] == 100.0
+        assert comparison["pb_rank"] == 3 and comparison["cap_rank"] == 2
+        assert comparison["cap_rank_total"] == 4 and comparison["industry_avg_change"] == 3.0
+        assert industry_compare_data._calculate_comparison("600000", peers).keys() == {
+            "total_peers", "industry_avg_pe", "industry_median_pe",
+            "industry_avg_pb", "industry_median_pb", "industry_avg_change",
+        }
+
+    def test_kernel_matches_vectorized(self, monkeypatch):
+        """测试单指标统计内核与掩码向量化结果一致"""
+        values = np.random.default_rng(0).uniform(-50, 1200, 300)
+        monkeypatch.setattr(industry_compare_data, "NUMBA_AVAILABLE", False)
+
+        for target, ascending in ((35.5, True), (800.0, False)):
+            count, total, rank = industry_compare_data._metric_stats_kernel(values, 0.0, 1000.0, target, ascending)
+            expected = industry_compare_data._metric_stats(values, 0.0, 1000.0, target, ascending)
+            assert (count, total, rank) == expected
+
+    def test_average_rounding_boundary(self):
+        """测试均值恰在两位小数舍入边界时与逐条求和一致（ndarray.sum 的分块求和在此会少0.01）"""
+        change = [-7.35, 4.94, 8.85, -7.98, -9.39, -1.36, 3.58, -4.48, -2.6,
+                  -1.88, -0.76, -8.02, 5.58, 2.92, 3.95, 6.24, 6.64, 1.75]
+        peers = industry_compare_data.IndustryPeers.from_frame(pd.DataFrame({
+            "代码": [f"{i:06d}" for i in range(len(change))],
+            "市盈率-动态": [10.0 + v for v in change],
+            "市净率": [10.0 + v for v in change],
+            "涨跌幅": change,
+            "总市值": [1e9] * len(change),
+        }))
+
+        comparison = industry_compare_data._calculate_comparison("000000", peers)
+
+        assert round(float(np.array(change).sum()) / len(change), 2) == 0.03
+        assert comparison["industry_avg_change"] == round(sum(change) / len(change), 2) == 0.04
+        pe = [10.0 + v for v in change]
+        assert comparison["industry_avg_pe"] == round(sum(pe) / len(pe), 2)
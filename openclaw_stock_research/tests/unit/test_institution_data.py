@@ -0,0 +1,129 @@
+"""
+机构持仓测试文件
+
+替换akshare接口，离线测试 data.institution_data 的季度持仓获取与分析
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from openclaw_stock.data import institution_data
+
+
+class TestFetchInstitutionData:
+    """测试机构持仓获取"""
+
+    def test_quarter_table_shared_across_symbols(self, monkeypatch, file_cache_dir):
+        """测试同一季度的全市场持仓只拉取一次，各股票按代码索引取行"""
+        calls = []
+
+        class FakeAk:
+            def stock_institute_hold(self, symbol):
+                calls.append(symbol)
+                return pd.DataFrame({
+                    "证券代码": ["600000", "000001"], "机构数": [12, 60], "机构数变化": [3, -8],
+                    "持股比例": [5.5, 30.2], "持股比例增幅": [0.5, -1.0],
+                    "占流通股比例": [6.0, 32.0], "占流通股比例增幅": [0.4, -1.2],
+                })
+
+        monkeypatch.setattr(institution_data, "ak", FakeAk())
+        monkeypatch.setattr(institution_data, "_fetch_institution_research_direct", lambda symbol, days: [])
+        institution_data._fetch_quarter_holdings.clear_cache()
+        institution_data.fetch_institution_data.clear_cache()
+
+        first = institution_data.fetch_institution_data("600000")
+        second = institution_data.fetch_institution_data("000001")
+
+        assert len(calls) == 1
+        assert first["holding"]["institution_count"] == 12 and first["holding"]["quarter"] == calls[0]
+        assert second["holding"]["hold_ratio"] == 30.2
+        assert second["analysis"]["holding_trend"] == "机构大幅减持"
+        assert institution_data.fetch_institution_data("300750")["holding"] == {}
+        assert (file_cache_dir / "institution_hold" / f"{calls[0]}.pkl").exists()
+
+    def test_quarter_table_fetched_once_concurrently(self, monkeypatch, file_cache_dir):
+        """测试多只股票并发分析时，同一季度的全市场持仓也只拉取一次"""
+        calls = []
+
+        class FakeAk:
+            def stock_institute_hold(self, symbol):
+                calls.append(symbol)
+                time.sleep(0.1)
+                return pd.DataFrame({"证券代码": ["600000", "000001", "300750"], "机构数": [12, 60, 8]})
+
+        monkeypatch.setattr(institution_data, "ak", FakeAk())
+        monkeypatch.setattr(institution_data, "_fetch_institution_research_direct", lambda symbol, days: [])
+        institution_data._fetch_quarter_holdings.clear_cache()
+        institution_data.fetch_institution_data.clear_cache()
+
+        symbols = ["600000", "000001", "300750"]
+        with ThreadPoolExecutor(max_workers=len(symbols)) as executor:
+            results = list(executor.map(institution_data.fetch_institution_data, symbols))
+
+        assert len(calls) == 1
+        assert [r["holding"]["institution_count"] for r in results] == [12, 60, 8]
+
+    def test_empty_quarter_not_cached(self, monkeypatch, file_cache_dir):
+        """测试季度持仓返回空表时不缓存，下一次调用重新拉取"""
+        calls = []
+        frames = [pd.DataFrame(), pd.DataFrame({"证券代码": ["600000"], "机构数": [12]})]
+
+        class FakeAk:
+            def stock_institute_hold(self, symbol):
+                calls.append(symbol)
+                return frames[len(calls) - 1]
+
+        monkeypatch.setattr(institution_data, "ak", FakeAk())
+        institution_data._fetch_quarter_holdings.clear_cache()
+
+        assert institution_data._fetch_quarter_holdings("20201").empty
+        assert "600000" in institution_data._fetch_quarter_holdings("20201").index
+        institution_data._fetch_quarter_holdings("20201")
+
+        assert len(calls) == 2
+
+
+class TestFetchInstitutionResearch:
+    """测试机构调研获取"""
+
+    def test_uses_shared_session(self, monkeypatch):
+        """测试调研请求走共享会话，按连接/读取超时调用并解析记录"""
+        requests_made = []
+
+        payload = {"success": True, "result": {"data": [
+            {"SECURITY_NAME_ABBR": "浦发银行", "RECEIVE_OBJECT": "某基金",
+             "RECEIVE_START_DATE": "2024-03-01 00:00:00", "SUM": "3"},
+        ]}}
+
+        class FakeResponse:
+            content = json.dumps(payload).encode()
+
+            def json(self):
+                return payload
+
+        class FakeSession:
+            def get(self, url, params, timeout):
+                requests_made.append((params["filter"], timeout))
+                return FakeResponse()
+
+        monkeypatch.setattr(institution_data, "get_shared_session", FakeSession)
+
+        research = institution_data._fetch_institution_research_direct("600000")
+
+        assert requests_made == [('(NUMBERNEW="1")(IS_SOURCE="1")(SECURITY_CODE="600000")', (3, 10))]
+        assert research[0]["research_date"] == "2024-03-01" and research[0]["research_org_count"] == 3
+
+
+class TestRecentQuarters:
+    """测试候选季度"""
+
+    def test_crosses_year_boundary(self):
+        """测试从上一季度起向前取，跨年时年份递减"""
+        assert institution_data._recent_quarters(datetime(2024, 2, 1)) == [
+            "20234", "20233", "20232", "20231", "20224", "20223",
+        ]
+        assert institution_data._recent_quarters(datetime(2024, 12, 31), count=2) == ["20243", "20242"]
@@ -0,0 +1,66 @@
+"""
+龙虎榜测试文件
+
+替换akshare接口，离线测试 data.lhb_data 的记录转换与分析
+"""
+
+import pandas as pd
+
+from openclaw_stock.data import lhb_data
+
+
+class TestFetchLhbData:
+    """测试龙虎榜数据获取"""
+
+    def test_column_stats_match_records(self, monkeypatch):
+        """测试按列预先计算的统计量与逐条记录分析结果一致"""
+        class FakeAk:
+            def stock_lhb_detail_em(self, start_date, end_date):
+                return pd.DataFrame({
+                    "代码": ["600000", "000001", "600000"], "上榜日": ["2024-03-01", "2024-03-02", "2024-03-05"],
+                    "龙虎榜净买额": [1200.5, 99.0, -300.25], "上榜后1日": [2.5, 1.0, None],
+                    "上榜后5日": [-1.0, 0.0, 4.0],
+                })
+
+            def stock_lhb_jgmmtj_em(self, start_date, end_date):
+                return pd.DataFrame({"代码": ["600000", "600000"], "机构买入净额": [-80.0, 30.0], "买方机构数": [1, 2]})
+
+        monkeypatch.setattr(lhb_data, "ak", FakeAk())
+        lhb_data.fetch_lhb_data.clear_cache()
+
+        result = lhb_data.fetch_lhb_data("600000", days=30)
+
+        assert [r["date"] for r in result["records"]] == ["2024-03-01", "2024-03-05"]
+        assert result["institution_summary"] == {
+            "total_buy": 0.0, "total_sell": 0.0, "net_buy": -50.0,
+            "buy_institution_count": 3, "sell_institution_count": 0, "records_count": 2,
+        }
+        assert result["analysis"] == lhb_data._analyze_lhb(result)
+        assert result["analysis"]["summary"] == (
+            "近期上榜2次，龙虎榜累计净买入900.25万元，机构净卖出，上榜后1日平均涨跌1.25%"
+        )
+
+    def test_outage_not_cached(self, monkeypatch):
+        """测试接口故障时返回的空结果不缓存，恢复后重新获取"""
+        outage = [True]
+
+        class FakeAk:
+            def stock_lhb_detail_em(self, start_date, end_date):
+                if outage[0]:
+                    raise ConnectionError("outage")
+                return pd.DataFrame({"代码": ["600000"], "上榜日": ["2024-03-01"], "龙虎榜净买额": [100.0]})
+
+            def stock_lhb_jgmmtj_em(self, start_date, end_date):
+                if outage[0]:
+                    raise ConnectionError("outage")
+                return pd.DataFrame()
+
+        monkeypatch.setattr(lhb_data, "ak", FakeAk())
+        lhb_data.fetch_lhb_data.clear_cache()
+
+        assert lhb_data.fetch_lhb_data("600000", days=30)["records"] == []
+        outage[0] = False
+        first = lhb_data.fetch_lhb_data("600000", days=30)
+        first["records"].clear()
+
+        assert len(lhb_data.fetch_lhb_data("600000", days=30)["records"]) == 1
@@ -0,0 +1,82 @@
+"""
+融资融券测试文件
+
+替换akshare接口，离线测试 data.margin_data 的逐日明细获取与趋势分析
+"""
+
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from openclaw_stock.data import margin_data
+
+# 磁盘缓存指向临时目录，测试不读写本地 AKSHARE_DATA_PATH
+pytestmark = pytest.mark.usefixtures("file_cache_dir")
+
+
+class TestFetchMarginData:
+    """测试融资融券数据获取"""
+
+    def test_dates_fetched_concurrently(self, monkeypatch):
+        """测试各日期并发请求；非交易日（接口报错）跳过，记录按日期倒序"""
+        barrier = threading.Barrier(3, timeout=5)
+        today = datetime.now()
+        skipped = (today - timedelta(days=1)).strftime("%Y%m%d")
+
+        class FakeAk:
+            def stock_margin_detail_sse(self, date):
+                barrier.wait()
+                if date == skipped:
+                    raise ValueError("非交易日")
+                return pd.DataFrame({"标的证券代码": ["600000", "601127"], "融资余额": [int(date[-2:]) * 1e8, 1.0]})
+
+        monkeypatch.setattr(margin_data, "ak", FakeAk())
+        margin_data._fetch_sse_detail.clear_cache()
+        margin_data.fetch_margin_data.clear_cache()
+
+        result = margin_data.fetch_margin_data("600000", days=3)
+
+        dates = [r["date"] for r in result["trend"]]
+        assert dates == [today.strftime("%Y%m%d"), (today - timedelta(days=2)).strftime("%Y%m%d")]
+        assert all(r["margin_balance"] == int(r["date"][-2:]) * 1e8 for r in result["trend"])
+
+
+    def test_szse_fallback_indexed(self, monkeypatch):
+        """测试沪市无数据时使用深市明细，全市场明细按日期只拉取一次、按代码取行"""
+        calls = []
+
+        class FakeAk:
+            def stock_margin_detail_sse(self, date):
+                raise ValueError("无沪市数据")
+
+            def stock_margin_detail_szse(self, date):
+                calls.append(date)
+                return pd.DataFrame({"证券代码": ["000001", "300750"], "融资余额": [2e9, 5e9], "融券余量": [10.0, 20.0]})
+
+        monkeypatch.setattr(margin_data, "ak", FakeAk())
+        monkeypatch.setattr(margin_data._MARGIN_FILE_CACHE, "get", lambda key: None)
+        margin_data._fetch_sse_detail.clear_cache()
+        margin_data._fetch_szse_detail.clear_cache()
+        margin_data.fetch_margin_data.clear_cache()
+
+        latest = [margin_data.fetch_margin_data(s, days=2)["latest"] for s in ("300750", "000001", "000002")]
+
+        assert latest[0] == {"date": datetime.now().strftime("%Y%m%d"), "margin_balance": 5e9, "margin_buy": 0.0,
+                             "short_balance": 20.0, "short_sell": 0.0}
+        assert latest[1]["margin_balance"] == 2e9 and latest[2] == {} and len(calls) == 1
+
+class TestAnalyzeMargin:
+    """测试融资融券趋势分析"""
+
+    def test_change_thresholds(self):
+        """测试融资余额变化率按区间上界（含）划分趋势与信号"""
+        def classify(latest_balance):
+            data = {"latest": {"margin_balance": latest_balance},
+                    "trend": [{"margin_balance": latest_balance}, {"margin_balance": 100.0}]}
+            analysis = margin_data._analyze_margin(data)
+            return analysis["signal"], analysis["change_pct"]
+
+        assert [classify(b)[0] for b in (90.0, 95.0, 100.0, 105.0, 110.0)] == ["看空", "看空", "偏空", "偏多", "看多"]
+        assert classify(103.0) == ("偏多", 3.0)
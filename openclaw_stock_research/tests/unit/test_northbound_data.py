@@ -0,0 +1,85 @@
+"""
+北向资金测试文件
+
+替换akshare接口，离线测试 data.northbound_data 的持股与流向记录
+"""
+
+import pandas as pd
+import pytest
+
+from openclaw_stock.data import northbound_data
+
+# 磁盘缓存指向临时目录，测试不读写本地 AKSHARE_DATA_PATH
+pytestmark = pytest.mark.usefixtures("file_cache_dir")
+
+
+class TestFetchNorthboundData:
+    """测试北向资金数据获取"""
+
+    def test_individual_and_flow_records(self, monkeypatch):
+        """测试个股持股按字段表取值，缺失列按默认值；整体流向取最近10天"""
+        class FakeAk:
+            def stock_hsgt_hold_stock_em(self, market, indicator):
+                return pd.DataFrame({"代码": ["600000", "601127"], "名称": ["浦发银行", "赛力斯"],
+                                     "今日持股-占流通股比": [2.5, "-"], "日期": ["2024-03-01", "2024-03-01"]})
+
+            def stock_hsgt_hist_em(self, symbol):
+                return pd.DataFrame({"日期": [f"2024-03-{d:02d}" for d in range(1, 13)],
+                                     "当日成交净买额": [float(d) for d in range(1, 13)]})
+
+        monkeypatch.setattr(northbound_data, "ak", FakeAk())
+        northbound_data._fetch_hold_ranking.clear_cache()
+        northbound_data._fetch_flow_history.clear_cache()
+        northbound_data.fetch_northbound_data.clear_cache()
+
+        result = northbound_data.fetch_northbound_data("600000", market="sh")
+
+        individual = result["individual"]
+        assert list(individual) == [key for key, _, _ in northbound_data._HOLD_FIELDS]
+        assert individual["name"] == "浦发银行" and individual["hold_ratio_float"] == 2.5
+        assert individual["board"] == "" and individual["hold_value"] == 0.0
+        assert [r["date"] for r in result["overall_flow"]][0] == "2024-03-03"
+        assert result["overall_flow"][-1] == {"date": "2024-03-12", "net_buy": 12.0, "buy_amount": 0.0,
+                                              "sell_amount": 0.0, "cumulative": 0.0}
+
+    def test_hold_ranking_shared_across_symbols(self, monkeypatch):
+        """测试持股排行按市场只拉取一次，各股票按代码索引取行"""
+        calls = []
+
+        class FakeAk:
+            def stock_hsgt_hold_stock_em(self, market, indicator):
+                calls.append(market)
+                return pd.DataFrame({"代码": ["600000", "601127"], "名称": ["浦发银行", "赛力斯"]})
+
+            def stock_hsgt_hist_em(self, symbol):
+                return pd.DataFrame()
+
+        monkeypatch.setattr(northbound_data, "ak", FakeAk())
+        monkeypatch.setattr(northbound_data._NORTHBOUND_FILE_CACHE, "get", lambda key: None)
+        monkeypatch.setattr(northbound_data._NORTHBOUND_FILE_CACHE, "set", lambda key, df: None)
+        northbound_data._fetch_hold_ranking.clear_cache()
+        northbound_data.fetch_northbound_data.clear_cache()
+
+        names = [northbound_data.fetch_northbound_data(s, market="sh")["individual"].get("name")
+                 for s in ("601127", "600000", "688981")]
+
+        assert names == ["赛力斯", "浦发银行", None] and calls == ["沪股通"]
+
+    def test_empty_ranking_not_cached(self, monkeypatch):
+        """测试持股排行返回空表时不缓存，下一次调用重新拉取"""
+        calls = []
+        frames = [pd.DataFrame(), pd.DataFrame({"代码": ["600000"], "名称": ["浦发银行"]})]
+
+        class FakeAk:
+            def stock_hsgt_hold_stock_em(self, market, indicator):
+                calls.append(market)
+                return frames[len(calls) - 1]
+
+        monkeypatch.setattr(northbound_data, "ak", FakeAk())
+        northbound_data._fetch_hold_ranking.clear_cache()
+
+        assert northbound_data._fetch_hold_ranking("沪股通").empty
+        assert "600000" in northbound_data._fetch_hold_ranking("沪股通").index
+        northbound_data._fetch_hold_ranking("沪股通")
+
+        assert len(calls) == 2
@@ -0,0 +1,46 @@
+"""
+限售解禁测试文件
+
+替换akshare接口，离线测试 data.restricted_shares_data 的解禁计划与近期解禁判断
+"""
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from openclaw_stock.data import restricted_shares_data
+
+# 磁盘缓存指向临时目录，测试不读写本地 AKSHARE_DATA_PATH
+pytestmark = pytest.mark.usefixtures("file_cache_dir")
+
+
+class TestFetchRestrictedSharesData:
+    """测试限售解禁数据获取"""
+
+    def test_upcoming_releases(self, monkeypatch):
+        """测试只有可解析的未来日期计入近期解禁，按日期先后排列"""
+        today = datetime.now()
+        later = (today + timedelta(days=40)).strftime("%Y-%m-%d")
+        soon = (today + timedelta(days=10)).strftime("%Y-%m-%d")
+
+        class FakeAk:
+            def stock_restricted_release_queue_em(self, symbol):
+                return pd.DataFrame({
+                    "解禁时间": [later, "2020-01-01", soon, "待定"],
+                    "解禁股东数": [2, 1, 3, 1],
+                    "占流通市值比例": [4.0, 1.0, 12.0, 5.0],
+                })
+
+        # 绕过磁盘缓存，直接使用替换后的接口
+        fake = FakeAk()
+        monkeypatch.setattr(restricted_shares_data, "ak", fake)
+        monkeypatch.setattr(restricted_shares_data, "_fetch_release_queue", fake.stock_restricted_release_queue_em)
+        restricted_shares_data.fetch_restricted_shares_data.clear_cache()
+
+        result = restricted_shares_data.fetch_restricted_shares_data("600000")
+
+        assert len(result["schedule"]) == 4
+        assert [r["date"] for r in result["upcoming_list"]] == [soon, later]
+        assert result["upcoming"]["shareholder_count"] == 3
+        assert result["analysis"]["pressure_level"] == "高"
@@ -0,0 +1,304 @@
+"""
+个股综合分析测试文件
+
+替换各数据源获取函数，离线测试 analyze_stock 的并发获取与结果汇总
+"""
+
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from openclaw_stock import data
+from openclaw_stock.analysis import stock_analyzer
+from openclaw_stock.data import DATA_SOURCES
+
+
+# 只返回数据、互不依赖的9个新增数据源
+_DATA_SOURCES = {source.key: source.fetcher for source in DATA_SOURCES}
+
+
+@pytest.fixture
+def patch_sources(monkeypatch):
+    """替换所有数据源为离线实现；9个新增数据源需全部同时在途才能返回"""
+    barrier = threading.Barrier(len(_DATA_SOURCES), timeout=5)
+    calls = {}
+
+    def make_source(key):
+        def fetch(**kwargs):
+            calls[key] = kwargs
+            barrier.wait()
+            return {"source": key}
+        return fetch
+
+    for key, name in _DATA_SOURCES.items():
+        monkeypatch.setattr(data, name, make_source(key))
+
+    def fetch_news(symbol, stock_name, limit):
+        calls["news_analysis"] = stock_name
+        return {"news_count": 1, "news_list": ["n"], "summary": "s", "fetch_time": "t"}
+
+    def analyze_chip(**kwargs):
+        raise RuntimeError("筹码接口超时")
+
+    def calculate_fundamental(symbol):
+        raise RuntimeError("财务接口超时")
+
+    monkeypatch.setattr(stock_analyzer, "fetch_realtime_quote",
+                        lambda symbol, market: {"name": "平安银行", "price": 10.5})
+    monkeypatch.setattr(stock_analyzer, "fetch_market_data", lambda **kwargs: pd.DataFrame())
+    monkeypatch.setattr(stock_analyzer, "calculate_fundamental_indicators", calculate_fundamental)
+    monkeypatch.setattr(stock_analyzer, "fetch_capital_flow",
+                        lambda symbol, market, days: {"main_inflow": 100.0})
+    monkeypatch.setattr(stock_analyzer, "fetch_stock_news", fetch_news)
+    monkeypatch.setattr(stock_analyzer, "analyze_chip_distribution", analyze_chip)
+    return calls
+
+
+class TestAnalyzeStock:
+    """测试个股综合分析"""
+
+    def test_sources_fetched_concurrently(self, patch_sources):
+        """测试各数据源并发获取，结果写入对应字段"""
+        result = stock_analyzer.analyze_stock("000001", market="sz")
+
+        assert list(result) == ["symbol", "market", "analysis_time", *stock_analyzer._RESULT_SECTIONS]
+        for key in _DATA_SOURCES:
+            assert result[key] == {"source": key}
+        assert patch_sources["margin_analysis"] == {"symbol": "000001", "days": 30}
+        assert result["basic_info"]["current_price"] == 10.5
+        assert result["fund_flow_analysis"]["main_inflow_5d"] == 100.0
+        assert result["technical_analysis"] == {}
+
+    def test_dependent_and_failed_sources(self, patch_sources):
+        """测试新闻使用基本信息中的名称；失败的数据源保留默认值或写入失败说明"""
+        result = stock_analyzer.analyze_stock("000001", market="sz")
+
+        assert patch_sources["news_analysis"] == "平安银行"
+        assert result["news_analysis"]["news_count"] == 1
+        assert result["fundamental_analysis"] == {}
+        assert result["chip_analysis"]["error"] == "筹码接口超时"
+        assert result["chip_analysis"]["assessment"]["chip_status"] == "unknown"
+        assert "主力资金净流入" in result["prediction"]["key_factors"]
+
+    def test_registry_sources(self):
+        """测试注册的附加数据源均可解析，且结果字段已在结果骨架中"""
+        for source in DATA_SOURCES:
+            assert source.key in stock_analyzer._RESULT_SECTIONS
+            assert callable(source.resolve())
+        assert DATA_SOURCES[2].kwargs("000001", "sz") == {"symbol": "000001", "market": "sz"}
+
+    def test_fetch_data_sources_batch(self, monkeypatch):
+        """测试批量获取多只股票的附加数据，失败的数据源不写入"""
+        def fetch_lhb(symbol, days):
+            if symbol == "000002":
+                raise RuntimeError("接口超时")
+            return {"symbol": symbol, "days": days}
+
+        monkeypatch.setattr(data, "fetch_lhb_data", fetch_lhb)
+        monkeypatch.setattr(data, "fetch_northbound_data", lambda symbol, market: {"market": market})
+
+        results = data.fetch_data_sources(["000001", "000002"], market="sz", sources=DATA_SOURCES[:3:2])
+
+        assert results["000001"] == {"lhb_analysis": {"symbol": "000001", "days": 90},
+                                     "northbound_analysis": {"market": "sz"}}
+        assert list(results["000002"]) == ["northbound_analysis"]
+
+    def test_slow_source_times_out(self, patch_sources, monkeypatch):
+        """测试超过总时限仍未返回的数据源按失败处理，不阻塞分析"""
+        release = threading.Event()
+        monkeypatch.setattr(stock_analyzer, "_FETCH_TIMEOUT", 0.5)
+        monkeypatch.setattr(stock_analyzer, "analyze_chip_distribution", lambda **kwargs: release.wait(5))
+
+        try:
+            result = stock_analyzer.analyze_stock("000001", market="sz")
+        finally:
+            release.set()
+
+        assert "未返回" in result["chip_analysis"]["error"]
+        assert result["lhb_analysis"] == {"source": "lhb_analysis"}
+
+    def test_shared_date_window(self, patch_sources, monkeypatch):
+        """测试传入as_of时按同一截止时间计算行情窗口"""
+        windows = []
+        monkeypatch.setattr(stock_analyzer, "_analyze_technical",
+                            lambda **kwargs: windows.append((kwargs["start_date"], kwargs["end_date"])) or {})
+
+        stock_analyzer.analyze_stock("000001", market="sz", lookback_days=10,
+                                     as_of=datetime(2024, 3, 20))
+
+        assert windows == [("20240310", "20240320")]
+
+
+def _make_kline(n, seed=0):
+    """构造n个交易日的随机K线"""
+    rng = np.random.default_rng(seed)
+    close = 10 + rng.normal(0, 0.2, n).cumsum()
+    return pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=n),
+        "open": close, "high": close + 0.1, "low": close - 0.1,
+        "close": close, "volume": rng.uniform(1e5, 2e5, n),
+    })
+
+
+class TestAnalyzeStocks:
+    """测试批量分析"""
+
+    def test_matches_analyze_stock(self, patch_sources, monkeypatch):
+        """测试批量结果与逐只分析一致，K线按最新交易日右对齐"""
+        klines = {"000001": _make_kline(80), "000002": _make_kline(60, seed=1), "000003": pd.DataFrame()}
+        monkeypatch.setattr(stock_analyzer, "fetch_market_data", lambda symbol, **kwargs: klines[symbol])
+
+        batch = stock_analyzer.analyze_stocks(list(klines), market="sz")
+
+        assert batch["close"].shape == (3, 80)
+        assert batch["close"].dtype == np.float32
+        assert np.isnan(batch["close"][1, :20]).all() and not np.isnan(batch["close"][1, 20:]).any()
+        assert np.isnan(batch["close"][2]).all()
+        for i, symbol in enumerate(list(klines)):
+            single = stock_analyzer.analyze_stock(symbol, market="sz")
+            trend = single["technical_analysis"].get("trend", stock_analyzer._TREND_SIDEWAYS)
+            assert stock_analyzer._TREND_NAMES[batch["trend"][i]] == trend
+            risk = stock_analyzer._RISK_LEVEL_NAMES[batch["risk"][i]]
+            assert risk == single["risk_assessment"]["overall_risk"]
+            assert round(float(batch["probability"][i]), 2) == single["prediction"]["probability"]
+
+
+class TestAnalyzeTechnical:
+    """测试技术分析部分"""
+
+    def test_latest_indicators(self, monkeypatch):
+        """测试最新指标按最后一行读取，缺少的指标为None"""
+        df_kline = _make_kline(80)
+        # 多余的行情列不参与技术指标计算
+        monkeypatch.setattr(stock_analyzer, "fetch_market_data",
+                            lambda **kwargs: df_kline.assign(amount=1.0, turnover=None))
+
+        tech = stock_analyzer._analyze_technical("000001", "sz", "20240101", "20240320")
+        df_tech = stock_analyzer.calculate_technical_indicators(df_kline)
+
+        assert tech["current_price"] == df_tech["close"].iloc[-1]
+        for key, value in tech["indicators"].items():
+            if key in df_tech.columns:
+                assert value == pytest.approx(df_tech[key].iloc[-1], nan_ok=True)
+            else:
+                assert value is None
+        assert tech["trend"] in ("上升趋势", "下降趋势", "震荡整理")
+        assert stock_analyzer._TREND_NAMES[tech["trend_code"]] == tech["trend"]
+
+    def test_object_and_missing_columns(self, monkeypatch):
+        """测试字符串数值列按数值解析（无法解析的值为NaN），缺失的列补为NaN而不报错"""
+        df_kline = _make_kline(80)
+        df_raw = df_kline.drop(columns="volume").astype({"close": str})
+        df_raw.loc[0, "close"] = "-"
+        monkeypatch.setattr(stock_analyzer, "fetch_market_data", lambda **kwargs: df_raw)
+
+        df_tech, tech = stock_analyzer._fetch_technical_frame("000001", "sz", "20240101", "20240320")
+
+        assert df_tech["close"].dtype == np.float64 and np.isnan(df_tech["close"].iloc[0])
+        np.testing.assert_allclose(df_tech["close"].iloc[1:], df_kline["close"].iloc[1:])
+        assert df_tech["volume"].isna().all()
+        assert tech["current_price"] == pytest.approx(df_kline["close"].iloc[-1])
+
+    def test_float32_indicators(self):
+        """测试float32输入时指标列保持float32，且与float64结果接近"""
+        df_kline = _make_kline(250)
+        df64 = stock_analyzer.calculate_technical_indicators(df_kline)
+        df32 = stock_analyzer.calculate_technical_indicators(
+            df_kline.astype({col: np.float32 for col in ("open", "high", "low", "close", "volume")})
+        )
+
+        for col in ("ma20", "ma60", "rsi6", "macd_hist", "kdj_k", "boll_upper"):
+            assert df32[col].dtype == np.float32
+            np.testing.assert_allclose(df32[col], df64[col], rtol=1e-4, atol=1e-4)
+
+    def test_classify_trend_vec_matches_scalar(self):
+        """测试向量化趋势分类与逐只判断一致（含NaN）"""
+        close = np.array([12.0, 8.0, 10.0, 10.0, np.nan, 11.0])
+        ma20 = np.array([11.0, 9.0, 11.0, 10.0, 10.0, np.nan])
+        ma60 = np.array([10.0, 10.0, 10.0, 10.0, 9.0, 9.0])
+
+        result = stock_analyzer._classify_trend_vec(close, ma20, ma60)
+
+        assert result.tolist() == [
+            stock_analyzer._classify_trend(c, m20, m60) for c, m20, m60 in zip(close, ma20, ma60)
+        ]
+        assert result[:2].tolist() == ["上升趋势", "下降趋势"]
+
+
+class TestPredictionScore:
+    """测试后市预测打分"""
+
+    def test_encode_and_score(self):
+        """测试特征编码后的打分及关键因素与逐条判断一致"""
+        result = {
+            "technical_analysis": {"trend": "上升趋势", "trend_code": 1, "signals": {"overall": "buy"}},
+            "fund_flow_analysis": {"main_inflow_5d": -1.0},
+            "chip_analysis": {"latest": {"winner_rate": 0.05}},
+            "restricted_shares_analysis": {"analysis": {"pressure_level": "medium"}},
+        }
+
+        states = stock_analyzer._encode_prediction_features(result)
+        score = stock_analyzer._prediction_score_kernel(states, stock_analyzer._PREDICTION_WEIGHTS)
+
+        assert score == 0.5 + 0.2 + 0.15 - 0.1 - 0.02
+        assert stock_analyzer._prediction_key_factors(states) == [
+            "技术趋势向上", "技术指标买入信号", "主力资金净流出", "套牢盘较重", "近期有限售解禁",
+        ]
+
+    def test_batch_matches_single(self):
+        """测试批量打分与逐只打分一致"""
+        rng = np.random.default_rng(0)
+        states = rng.integers(0, 3, (20, len(stock_analyzer._PREDICTION_FEATURES))).astype(np.int8)
+        weights = stock_analyzer._PREDICTION_WEIGHTS
+
+        batch = stock_analyzer._prediction_score_batch(states, weights)
+
+        assert batch.tolist() == [stock_analyzer._prediction_score_kernel(row, weights) for row in states]
+
+
+class TestRiskAssessment:
+    """测试风险等级综合"""
+
+    def test_combine_risk_levels(self):
+        """测试单只与批量综合风险等级一致"""
+        levels = np.array([[2, 2, 0], [0, 1, 0], [2, 0, 1], [1, 1, 1]], dtype=np.int8)
+
+        combined = stock_analyzer._combine_risk_levels(levels)
+
+        assert combined.tolist() == [2, 0, 1, 1]
+        assert [int(stock_analyzer._combine_risk_levels(row)) for row in levels] == combined.tolist()
+
+
+class TestGenerateReport:
+    """测试报告生成"""
+
+    def test_sections_and_missing_fields(self):
+        """测试各章节按序输出，缺失字段显示为N/A"""
+        report = stock_analyzer.StockAnalyzer().generate_report({
+            "symbol": "000001",
+            "basic_info": {"name": "平安银行", "volume": 1234567},
+            "fundamental_analysis": {"valuation": {"pe_ttm": 8.5}},
+        })
+        lines = report.split("\n")
+
+        assert lines[1].strip() == "000001 (平安银行) 综合分析报告"
+        assert "【当前价格】N/A 元" in lines
+        assert "【成交量】1,234,567" in lines
+        assert "  PE(TTM): 8.5" in lines and "  PB: N/A" in lines
+        titles = [line for line in lines if line.startswith("【") and "、" in line]
+        assert titles[0] == "【一、技术面分析】" and titles[-1] == "【十六、后市预测】"
+        assert len(titles) == 16
+        assert lines[lines.index("【二、基本面分析】") - 2] == ""
+
+    def test_non_dict_signals_skipped(self):
+        """测试调用方构造的非字典 signals 跳过交易信号段，不抛异常"""
+        report = stock_analyzer.StockAnalyzer().generate_report({
+            "symbol": "000001",
+            "basic_info": {"name": "平安银行", "volume": 1000},
+            "technical_analysis": {"trend": "上涨", "signals": ["金叉"]},
+        })
+
+        assert "交易信号：" not in report